@@ -0,0 +1,160 @@
+import hashlib
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import numpy as np
+
+from metrics import metrics
+
+# 로컬 임베딩 차원 (문자 n-gram 해싱)
+EMBEDDING_DIM = 512
+_NON_WORD = re.compile(r'[\W_]+')
+_DIGITS = re.compile(r'\d+')
+# 유사 질문 비교에서 빼는 단어 (있고 없고가 질문의 뜻을 바꾸지 않는 것만)
+_STOPWORDS = frozenset({'a', 'an', 'the', 'is', 'are', 'of', 'to', 'please', 'me', 'can', 'you', '좀'})
+
+
+def article_set_key(articles: List[Dict[str, Any]]) -> str:
+    """기사 묶음의 해시 (순서와 무관하게 URL/제목으로 계산)"""
+    items = sorted(f"{a.get('url', '')}\0{a.get('title', '')}" for a in articles)
+    return hashlib.sha256("\n".join(items).encode('utf-8')).hexdigest()
+
+
+def article_list_key(articles: List[Dict[str, Any]]) -> str:
+    """기사 목록의 해시 (순서 포함 - 답변과 뉴스 컨텍스트가 "뉴스 N" 번호로 기사를 가리키므로)"""
+    items = [f"{a.get('url', '')}\0{a.get('title', '')}" for a in articles]
+    return hashlib.sha256("\n".join(items).encode('utf-8')).hexdigest()
+
+
+def normalize_question(question: str) -> str:
+    """질문 정규화 (대소문자, 공백, 문장부호 무시)"""
+    return _NON_WORD.sub('', question.casefold())
+
+
+def _stem(word: str) -> str:
+    # 한국어는 어미/조사가 붙으므로 앞 두 글자, 그 밖에는 앞 네 글자로 비교
+    return word[:2] if '\uac00' <= word[0] <= '\ud7a3' else word[:4]
+
+
+def question_terms(question: str) -> Tuple[Tuple[str, ...], FrozenSet[str]]:
+    """유사 질문이 같은 뜻인지 확인할 (숫자 목록, 내용어 어간 집합)
+
+    숫자("5번 기사", "2024년")는 순서까지 같아야 하고, 내용어는 어간이 모두 같아야 한다
+    ("증가했나요"/"감소했나요", "CEO"/"CFO"는 문자 n-gram이 비슷해도 다른 질문).
+    """
+    text = question.casefold()
+    words = _NON_WORD.split(_DIGITS.sub(' ', text))
+    return tuple(_DIGITS.findall(text)), frozenset(_stem(w) for w in words if w and w not in _STOPWORDS)
+
+
+def embed_question(normalized: str) -> np.ndarray:
+    """문자 1~3-gram을 해싱한 L2 정규화 벡터 (외부 모델 없이 한국어에도 동작)"""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    text = f' {normalized} '
+    for n in (1, 2, 3):
+        for i in range(len(text) - n + 1):
+            digest = hashlib.blake2b(text[i:i + n].encode('utf-8'), digest_size=4).digest()
+            vector[int.from_bytes(digest, 'little') % EMBEDDING_DIM] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class AnswerCache:
+    """기사 묶음 + 질문 기준 답변 캐시 (TTL + LRU)
+
+    정확히 같은 (정규화된) 질문을 먼저 찾고, semantic이 켜져 있으면 같은 기사 묶음에
+    대한 이전 질문 중 코사인 유사도가 threshold 이상이고 숫자와 내용어(question_terms)가
+    같은 가장 가까운 답변을 사용한다.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 3600.0, semantic: bool = False,
+                 threshold: float = 0.92):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.semantic = semantic
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        # (기사 묶음 키, 정규화된 질문) -> (답변, 생성 소요 시간, 저장 시각, 임베딩, 질문 숫자/내용어)
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[str, float, float, np.ndarray, Any]]" = OrderedDict()
+        # 기사 묶음 키 -> 해당 묶음의 정규화된 질문 목록 (유사도 검색용)
+        self._by_articles: Dict[str, List[str]] = {}
+        self._stats = {'exact_hits': 0, 'semantic_hits': 0, 'misses': 0, 'evictions': 0, 'saved_seconds': 0.0}
+
+    def lookup(self, articles_key: str, question: str) -> Optional[str]:
+        """캐시된 답변 조회 (없으면 None)"""
+        normalized = normalize_question(question)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get((articles_key, normalized))
+            if entry is not None and now - entry[2] < self.ttl:
+                self._entries.move_to_end((articles_key, normalized))
+                self._stats['exact_hits'] += 1
+                self._stats['saved_seconds'] += entry[1]
+                return entry[0]
+
+            if self.semantic:
+                match = self._nearest(articles_key, embed_question(normalized), question_terms(question), now)
+                if match is not None:
+                    self._entries.move_to_end(match)
+                    entry = self._entries[match]
+                    self._stats['semantic_hits'] += 1
+                    self._stats['saved_seconds'] += entry[1]
+                    return entry[0]
+
+            self._stats['misses'] += 1
+            return None
+
+    def _nearest(self, articles_key: str, vector: np.ndarray, terms: Any,
+                 now: float) -> Optional[Tuple[str, str]]:
+        """같은 기사 묶음에서 숫자/내용어가 같고 유사도가 가장 높은 유효한 질문 키 (lock 보유 상태에서 호출)"""
+        keys = [(articles_key, q) for q in self._by_articles.get(articles_key, [])
+                if now - self._entries[(articles_key, q)][2] < self.ttl
+                and self._entries[(articles_key, q)][4] == terms]
+        if not keys:
+            return None
+        matrix = np.stack([self._entries[key][3] for key in keys])
+        scores = matrix @ vector
+        best = int(np.argmax(scores))
+        return keys[best] if scores[best] >= self.threshold else None
+
+    def store(self, articles_key: str, question: str, answer: str, latency: float):
+        """생성된 답변 저장 (latency는 히트 시 절약된 시간 계산에 사용)"""
+        normalized = normalize_question(question)
+        key = (articles_key, normalized)
+        with self._lock:
+            if key not in self._entries:
+                self._by_articles.setdefault(articles_key, []).append(normalized)
+            self._entries[key] = (answer, latency, time.monotonic(), embed_question(normalized),
+                                  question_terms(question))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                (old_articles, old_question), _ = self._entries.popitem(last=False)
+                questions = self._by_articles[old_articles]
+                questions.remove(old_question)
+                if not questions:
+                    del self._by_articles[old_articles]
+                self._stats['evictions'] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """히트율과 절약된 LLM 호출 시간"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+        hits = stats['exact_hits'] + stats['semantic_hits']
+        lookups = hits + stats['misses']
+        stats['hit_ratio'] = hits / lookups if lookups else 0.0
+        return stats
+
+
+# 프로세스 전역 답변 캐시 (모든 세션이 공유)
+answer_cache = AnswerCache(
+    maxsize=int(os.getenv('ANSWER_CACHE_SIZE', '1024')),
+    ttl=float(os.getenv('ANSWER_CACHE_TTL', '3600')),
+    semantic=os.getenv('ANSWER_CACHE_SEMANTIC', '0') == '1',
+    threshold=float(os.getenv('ANSWER_CACHE_SIMILARITY', '0.92')),
+)
+metrics.register_collector('answer_cache', answer_cache.stats)
@@ -0,0 +1,110 @@
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+import numpy as np
+
+# 기사 전체가 뉴스 컨텍스트 예산을 넘을 때 질문마다 프롬프트에 넣을 최대 기사 수 (기본은 검색 한 번의 기사 수)
+RETRIEVAL_TOP_K = int(os.getenv('RETRIEVAL_TOP_K', os.getenv('NEWS_PAGE_SIZE', '10')))
+
+_WORD = re.compile(r'\w+')
+_HANGUL = re.compile(r'[가-힣]')
+# "10번 기사", "3번째", "뉴스 3", "기사 #2", "article 4"
+_ARTICLE_REFERENCE = re.compile(r'(?:뉴스|기사|article|news|#)\s*#?(\d+)|(\d+)\s*번', re.IGNORECASE)
+
+
+def tokenize(text: str) -> List[str]:
+    """검색용 토큰화 (한글 단어는 조사/어미가 붙어도 매칭되도록 글자 2-gram을 함께 사용)"""
+    tokens = []
+    for word in _WORD.findall(text.casefold()):
+        tokens.append(word)
+        if len(word) > 2 and _HANGUL.search(word):
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def referenced_articles(question: str, size: int) -> List[int]:
+    """질문에서 번호로 가리킨 기사 인덱스 (0부터, 언급 순서대로, 범위 밖 번호는 무시)"""
+    indices: List[int] = []
+    for match in _ARTICLE_REFERENCE.finditer(question):
+        index = int(match.group(1) or match.group(2)) - 1
+        if 0 <= index < size and index not in indices:
+            indices.append(index)
+    return indices
+
+
+class ArticleIndex:
+    """제목+설명에 대한 BM25 인덱스
+
+    포스팅은 CSR 형태의 numpy 배열(term_ptr, doc_ids, term_freqs)에 저장한다.
+    """
+
+    def __init__(self, articles: List[Dict[str, Any]], k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.size = len(articles)
+
+        vocabulary: Dict[str, int] = {}
+        doc_terms = []
+        doc_lengths = np.zeros(self.size, dtype=np.float32)
+        for doc_id, article in enumerate(articles):
+            # 제목은 두 번 넣어 가중치를 높임
+            title = article.get('title') or ''
+            text = f"{title} {title} {article.get('description') or ''}"
+            counts = Counter(tokenize(text))
+            doc_lengths[doc_id] = sum(counts.values())
+            doc_terms.append([(vocabulary.setdefault(term, len(vocabulary)), tf) for term, tf in counts.items()])
+
+        # 용어별 포스팅 길이 -> 시작 위치
+        postings_per_term = np.zeros(len(vocabulary) + 1, dtype=np.int32)
+        for terms in doc_terms:
+            for term_id, _ in terms:
+                postings_per_term[term_id + 1] += 1
+        term_ptr = np.cumsum(postings_per_term, dtype=np.int32)
+
+        doc_ids = np.empty(term_ptr[-1], dtype=np.int32)
+        term_freqs = np.empty(term_ptr[-1], dtype=np.float32)
+        cursor = term_ptr[:-1].copy()
+        for doc_id, terms in enumerate(doc_terms):
+            for term_id, tf in terms:
+                position = cursor[term_id]
+                doc_ids[position] = doc_id
+                term_freqs[position] = tf
+                cursor[term_id] += 1
+
+        self.vocabulary = vocabulary
+        self.term_ptr = term_ptr
+        self.doc_ids = doc_ids
+        self.term_freqs = term_freqs
+        average_length = float(doc_lengths.mean()) if self.size else 0.0
+        # BM25 분모의 문서 길이 정규화 항을 미리 계산
+        self._length_norm = k1 * (1 - b + b * doc_lengths / average_length) if average_length else doc_lengths
+
+    def idf(self, term_id: int) -> float:
+        document_frequency = self.term_ptr[term_id + 1] - self.term_ptr[term_id]
+        return math.log(1 + (self.size - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def scores(self, query: str) -> np.ndarray:
+        """모든 기사에 대한 BM25 점수"""
+        scores = np.zeros(self.size, dtype=np.float32)
+        for term in set(tokenize(query)):
+            term_id = self.vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = self.term_ptr[term_id], self.term_ptr[term_id + 1]
+            docs = self.doc_ids[start:end]
+            tf = self.term_freqs[start:end]
+            scores[docs] += self.idf(term_id) * tf * (self.k1 + 1) / (tf + self._length_norm[docs])
+        return scores
+
+    def rank(self, query: str) -> List[int]:
+        """모든 기사 인덱스를 관련도 순으로 (점수가 같으면 원래 순서)"""
+        return np.argsort(-self.scores(query), kind='stable').tolist()
+
+    def select(self, question: str, k: int = RETRIEVAL_TOP_K) -> List[int]:
+        """뉴스 컨텍스트에 넣을 기사 인덱스 (질문이 번호로 가리킨 기사, 관련도 순 기사 순서로 k개 이상)"""
+        referenced = referenced_articles(question, self.size)
+        ranked = referenced + [i for i in self.rank(question) if i not in referenced]
+        return ranked[:max(k, len(referenced))]
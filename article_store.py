@@ -0,0 +1,295 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from article_utils import canonical_url, normalize_title, published_timestamp
+
+# 기사 저장소 파일 (모든 세션과 감시 워커가 공유)
+ARTICLE_DB_PATH = os.getenv('ARTICLE_DB_PATH', os.path.join(tempfile.gettempdir(), 'news-chatbot-articles.db'))
+# 이 시간(초) 안에 검색한 키워드는 업스트림 API 없이 저장소에서 응답
+ARTICLE_STORE_FRESHNESS = float(os.getenv('ARTICLE_STORE_FRESHNESS', '900'))
+# 한 트랜잭션에 넣는 최대 기사 수
+UPSERT_BATCH_SIZE = 500
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    id INTEGER PRIMARY KEY,
+    url_key TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    image_url TEXT NOT NULL,
+    source TEXT NOT NULL,
+    published_at TEXT NOT NULL,
+    published_ts REAL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS articles_published ON articles(published_ts);
+
+-- 프로바이더/키워드 검색 결과에 포함된 기사 (키워드별 최신순 조회용)
+CREATE TABLE IF NOT EXISTS keyword_articles (
+    provider TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    article_id INTEGER NOT NULL REFERENCES articles(id) ON DELETE CASCADE,
+    published_ts REAL,
+    PRIMARY KEY (provider, keyword, article_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS keyword_articles_recent ON keyword_articles(provider, keyword, published_ts);
+
+-- 프로바이더/키워드별 마지막 업스트림 조회 시각
+CREATE TABLE IF NOT EXISTS searches (
+    provider TEXT NOT NULL,
+    keyword TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    PRIMARY KEY (provider, keyword)
+) WITHOUT ROWID;
+
+-- 기사 묶음별 일괄 요약 (article_set_key -> JSON)
+CREATE TABLE IF NOT EXISTS summaries (
+    article_set_key TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    created_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# 제목/요약 전문 검색 (trigram이라 한국어 부분 문자열도 찾음)
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, description, content='articles', content_rowid='id', tokenize='trigram'
+);
+CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, description ON articles
+WHEN old.title IS NOT new.title OR old.description IS NOT new.description BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, description)
+    VALUES ('delete', old.id, old.title, old.description);
+    INSERT INTO articles_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO articles (url_key, url, title, description, image_url, source, published_at, published_ts, fetched_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(url_key) DO UPDATE SET
+    url = excluded.url,
+    title = excluded.title,
+    description = excluded.description,
+    image_url = excluded.image_url,
+    source = excluded.source,
+    published_at = excluded.published_at,
+    published_ts = excluded.published_ts,
+    fetched_at = excluded.fetched_at
+"""
+
+_LINK = """
+INSERT OR IGNORE INTO keyword_articles (provider, keyword, article_id, published_ts)
+SELECT ?, ?, id, published_ts FROM articles WHERE url_key = ?
+"""
+
+_COLUMNS = 'a.url, a.title, a.description, a.image_url, a.source, a.published_at'
+
+
+def normalize_keyword(keyword: str) -> str:
+    """저장소 키워드 정규화 (검색 캐시 키와 같은 규칙)"""
+    return " ".join(keyword.split()).casefold()
+
+
+def _row_to_article(row: sqlite3.Row) -> Dict[str, Any]:
+    """저장된 행을 프로바이더 공통 기사 dict로 변환"""
+    return {
+        'title': row['title'],
+        'description': row['description'],
+        'url': row['url'],
+        'urlToImage': row['image_url'],
+        'source': {'name': row['source']},
+        'publishedAt': row['published_at'],
+    }
+
+
+class ArticleStore:
+    """SQLite 기사 저장소 (정규화 URL 기준 upsert, 키워드/기간/전문 검색)
+
+    스레드마다 연결을 따로 열고 WAL 모드로 읽기와 쓰기가 서로 막지 않게 한다.
+    파일과 스키마는 처음 사용할 때 만든다 (import만으로 디스크에 쓰지 않도록).
+    """
+
+    def __init__(self, path: str = ARTICLE_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._schema_lock = threading.Lock()
+        # 전문 검색 사용 여부 (스키마를 만들 때 결정, 그 전에는 None)
+        self._fts: Optional[bool] = None
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        with self._schema_lock:
+            if self._fts is not None:
+                return
+            with conn:
+                conn.executescript(_SCHEMA)
+                try:
+                    conn.executescript(_FTS_SCHEMA)
+                    fts = True
+                except sqlite3.OperationalError:
+                    # FTS5/trigram이 없는 SQLite에서는 LIKE 검색으로 대체
+                    fts = False
+            self._fts = fts
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute('PRAGMA foreign_keys=ON')
+            self._local.conn = conn
+            if self._fts is None:
+                self._create_schema(conn)
+        return conn
+
+    def upsert_articles(self, articles: Iterable[Dict[str, Any]], provider: Optional[str] = None,
+                        keyword: Optional[str] = None) -> int:
+        """기사 저장 (같은 정규화 URL이면 갱신), provider/keyword가 있으면 검색 결과로 연결"""
+        now = time.time()
+        rows = []
+        for article in articles:
+            url_key = canonical_url(article.get('url') or '')
+            if not url_key:
+                title_key = normalize_title(article)
+                if not title_key:
+                    continue
+                url_key = f'title:{title_key}'
+            published_ts = published_timestamp(article)
+            rows.append((
+                url_key,
+                article.get('url') or '',
+                article.get('title') or '',
+                article.get('description') or '',
+                article.get('urlToImage') or '',
+                (article.get('source') or {}).get('name') or '',
+                article.get('publishedAt') or '',
+                None if published_ts == float('-inf') else published_ts,
+                now,
+            ))
+
+        conn = self._conn()
+        normalized_keyword = normalize_keyword(keyword) if keyword is not None else None
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            batch = rows[start:start + UPSERT_BATCH_SIZE]
+            with conn:
+                conn.executemany(_UPSERT, batch)
+                if provider is not None and normalized_keyword is not None:
+                    conn.executemany(_LINK, [(provider, normalized_keyword, row[0]) for row in batch])
+        return len(rows)
+
+    def record_search(self, provider: str, keyword: str, articles: List[Dict[str, Any]]):
+        """업스트림 검색 결과를 저장하고 조회 시각 기록"""
+        self.upsert_articles(articles, provider, keyword)
+        with self._conn() as conn:
+            conn.execute(
+                'INSERT INTO searches (provider, keyword, fetched_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(provider, keyword) DO UPDATE SET fetched_at = excluded.fetched_at',
+                (provider, normalize_keyword(keyword), time.time()),
+            )
+
+    def last_fetched(self, provider: str, keyword: str) -> Optional[float]:
+        """마지막 업스트림 조회 시각 (없으면 None)"""
+        row = self._conn().execute(
+            'SELECT fetched_at FROM searches WHERE provider = ? AND keyword = ?',
+            (provider, normalize_keyword(keyword)),
+        ).fetchone()
+        return row['fetched_at'] if row else None
+
+    def newest_published(self, provider: str, keyword: str) -> Optional[str]:
+        """키워드 검색 결과 중 가장 최근 기사의 publishedAt"""
+        row = self._conn().execute(
+            'SELECT a.published_at FROM keyword_articles k JOIN articles a ON a.id = k.article_id '
+            'WHERE k.provider = ? AND k.keyword = ? AND k.published_ts IS NOT NULL '
+            'ORDER BY k.published_ts DESC LIMIT 1',
+            (provider, normalize_keyword(keyword)),
+        ).fetchone()
+        return row['published_at'] if row else None
+
+    def keyword_articles(self, provider: str, keyword: str, limit: int = 10, start: Optional[float] = None,
+                         end: Optional[float] = None) -> List[Dict[str, Any]]:
+        """키워드 검색 결과 기사를 최신순으로 조회 (start/end는 발행 시각 timestamp 범위)"""
+        sql = [f'SELECT {_COLUMNS} FROM keyword_articles k JOIN articles a ON a.id = k.article_id '
+               'WHERE k.provider = ? AND k.keyword = ?']
+        params: List[Any] = [provider, normalize_keyword(keyword)]
+        if start is not None:
+            sql.append('AND k.published_ts >= ?')
+            params.append(start)
+        if end is not None:
+            sql.append('AND k.published_ts < ?')
+            params.append(end)
+        sql.append('ORDER BY k.published_ts DESC LIMIT ?')
+        params.append(limit)
+        return [_row_to_article(row) for row in self._conn().execute(' '.join(sql), params)]
+
+    def search(self, query: str, limit: int = 50, start: Optional[float] = None,
+               end: Optional[float] = None) -> List[Dict[str, Any]]:
+        """저장된 모든 기사의 제목/요약 전문 검색 (최신순)"""
+        terms = query.split()
+        if not terms:
+            return []
+        conn = self._conn()
+        # trigram 인덱스는 3글자 이상만 찾을 수 있으므로 짧은 단어는 LIKE로 거름
+        fts_terms = [t for t in terms if len(t) >= 3] if self._fts else []
+        like_terms = [t for t in terms if t not in fts_terms]
+
+        sql = [f'SELECT {_COLUMNS} FROM articles a']
+        where = []
+        params: List[Any] = []
+        if fts_terms:
+            sql.append('JOIN articles_fts f ON f.rowid = a.id')
+            where.append('articles_fts MATCH ?')
+            params.append(' AND '.join('"{}"'.format(t.replace('"', '""')) for t in fts_terms))
+        for term in like_terms:
+            pattern = '%{}%'.format(term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_'))
+            where.append("(a.title LIKE ? ESCAPE '\\' OR a.description LIKE ? ESCAPE '\\')")
+            params.extend([pattern, pattern])
+        if start is not None:
+            where.append('a.published_ts >= ?')
+            params.append(start)
+        if end is not None:
+            where.append('a.published_ts < ?')
+            params.append(end)
+        sql.append('WHERE ' + ' AND '.join(where))
+        sql.append('ORDER BY a.published_ts DESC LIMIT ?')
+        params.append(limit)
+        return [_row_to_article(row) for row in conn.execute(' '.join(sql), params)]
+
+    def get_summary(self, set_key: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """저장된 기사 묶음 요약 (max_age초보다 오래됐거나 없으면 None)"""
+        row = self._conn().execute(
+            'SELECT summary, created_at FROM summaries WHERE article_set_key = ?', (set_key,)
+        ).fetchone()
+        if row is None or (max_age is not None and time.time() - row['created_at'] > max_age):
+            return None
+        return json.loads(row['summary'])
+
+    def put_summary(self, set_key: str, summary: Dict[str, Any]):
+        """기사 묶음 요약 저장 (같은 묶음이면 덮어씀)"""
+        with self._conn() as conn:
+            conn.execute(
+                'INSERT INTO summaries (article_set_key, summary, created_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(article_set_key) DO UPDATE SET summary = excluded.summary, created_at = excluded.created_at',
+                (set_key, json.dumps(summary, ensure_ascii=False), time.time()),
+            )
+
+    def count(self) -> int:
+        return self._conn().execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+
+
+# 프로세스 전역 기사 저장소 (처음 사용할 때 파일을 연다)
+article_store = ArticleStore()
@@ -0,0 +1,130 @@
+"""기사 묶음 일괄 요약
+
+검색 결과 하나에 대해 LLM 호출 한 번으로 기사별 한두 문장 요약과 전체 브리핑을 JSON으로 받아
+기사 묶음 키(article_set_key)에 캐시한다. 기사 묶음 키는 순서와 무관하므로 기사별 요약은 정규화한
+URL을 키로 저장하고, 세션에 넘길 때 그 세션의 기사 순서대로 풀어준다. 요약은 채팅 컨텍스트,
+뉴스 카드, 이메일 다이제스트에서 원문 설명 대신 사용한다.
+"""
+import json
+import os
+from typing import Any, Dict, List
+
+from article_store import article_store
+from article_utils import canonical_url
+from chat_context import count_tokens
+from metrics import metrics
+from news_cache import TTLCache
+from openai_clients import get_openai_client
+from rate_limit import rate_limiter
+
+# 검색 후 일괄 요약 생성 여부
+ARTICLE_SUMMARY_ENABLED = os.getenv('ARTICLE_SUMMARY_ENABLED', '1') == '1'
+# 요약 응답 최대 토큰 (기사 10개 기준 기사당 2문장 + 브리핑)
+ARTICLE_SUMMARY_MAX_TOKENS = int(os.getenv('ARTICLE_SUMMARY_MAX_TOKENS', '1500'))
+# 같은 기사 묶음의 요약을 재사용하는 시간(초)
+ARTICLE_SUMMARY_TTL = float(os.getenv('ARTICLE_SUMMARY_TTL', '86400'))
+# 요약 요청에 넣는 기사 설명 최대 길이
+SUMMARY_INPUT_CHARS = 500
+
+SUMMARY_MODEL = 'gpt-4o-mini'
+
+SUMMARY_SYSTEM_PROMPT = """당신은 뉴스 편집자입니다. 번호가 붙은 기사 목록을 읽고 다음 JSON 객체 하나만 출력하세요:
+{"brief": "전체 기사의 핵심 흐름을 3~4문장으로 정리한 브리핑",
+ "articles": [{"id": 기사 번호, "summary": "기사 핵심을 한두 문장(100자 안팎)으로 요약"}]}
+모든 기사에 대해 articles 항목을 기사 번호 순서대로 하나씩 작성하고, 기사에 없는 내용은 추측하지 마세요."""
+
+
+def _truncate(text: str, max_length: int) -> str:
+    if len(text) <= max_length:
+        return text
+    return text[:max_length-3] + "..."
+
+
+def build_summary_prompt(articles: List[Dict[str, Any]], keyword: str) -> str:
+    """요약 요청 본문 (기사 번호는 뉴스 목록 순서, 1부터)"""
+    lines = [f"키워드: {keyword}"]
+    for i, article in enumerate(articles, 1):
+        lines.append(
+            f"\n[{i}] {article.get('title') or '제목 없음'}\n"
+            f"출처: {(article.get('source') or {}).get('name') or '출처 불명'}\n"
+            f"내용: {_truncate(article.get('description') or '', SUMMARY_INPUT_CHARS)}"
+        )
+    return "\n".join(lines)
+
+
+def article_key(article: Dict[str, Any]) -> str:
+    """기사별 요약의 키 (정규화한 URL, URL이 없으면 제목)"""
+    url = article.get('url') or ''
+    return canonical_url(url) if url else f"title:{article.get('title') or ''}"
+
+
+def parse_summary(content: str, articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """JSON 응답을 {'brief': str, 'articles': {article_key: str}}로 변환 (요약이 빠진 기사는 제외)"""
+    data = json.loads(content)
+    summaries = {}
+    for item in data.get('articles') or []:
+        try:
+            index = int(item.get('id')) - 1
+        except (TypeError, ValueError):
+            continue
+        if 0 <= index < len(articles) and isinstance(item.get('summary'), str):
+            summaries[article_key(articles[index])] = item['summary'].strip()
+    brief = data.get('brief')
+    if not isinstance(brief, str) or not brief.strip():
+        raise ValueError('요약 응답에 브리핑이 없습니다')
+    return {'brief': brief.strip(), 'articles': summaries}
+
+
+def summaries_in_order(summary: Dict[str, Any], articles: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """캐시된 요약을 {'brief': str, 'summaries': [articles 순서대로 str]}로 (요약이 없는 기사는 빈 문자열)"""
+    by_article = summary['articles']
+    return {'brief': summary['brief'], 'summaries': [by_article.get(article_key(a), '') for a in articles]}
+
+
+def summarize_articles(articles: List[Dict[str, Any]], keyword: str, api_key: str) -> Dict[str, Any]:
+    """기사 묶음 전체를 LLM 호출 한 번으로 요약"""
+    client = get_openai_client(api_key)
+    prompt = build_summary_prompt(articles, keyword)
+    rate_limiter.acquire('openai', api_key)
+    with metrics.span('llm_summary'):
+        response = client.chat.completions.create(
+            model=SUMMARY_MODEL,
+            messages=[
+                {'role': 'system', 'content': SUMMARY_SYSTEM_PROMPT},
+                {'role': 'user', 'content': prompt},
+            ],
+            max_tokens=ARTICLE_SUMMARY_MAX_TOKENS,
+            temperature=0.3,
+            response_format={'type': 'json_object'},
+        )
+    content = response.choices[0].message.content or ''
+    usage = getattr(response, 'usage', None)
+    metrics.inc('llm_tokens_total', usage.prompt_tokens if usage else count_tokens(prompt), kind='summary_prompt')
+    metrics.inc('llm_tokens_total', usage.completion_tokens if usage else count_tokens(content), kind='summary_completion')
+    return parse_summary(content, articles)
+
+
+# 프로세스 전역 요약 캐시 (같은 기사 묶음의 동시 요청은 LLM 호출 하나로 합침)
+summary_cache = TTLCache(
+    maxsize=int(os.getenv('ARTICLE_SUMMARY_CACHE_SIZE', '256')),
+    ttl=ARTICLE_SUMMARY_TTL,
+    stale_ttl=0,
+)
+metrics.register_collector('summary_cache', summary_cache.stats)
+
+
+def get_summary(set_key: str, articles: List[Dict[str, Any]], keyword: str, api_key: str) -> Dict[str, Any]:
+    """기사 묶음 요약 (프로세스 캐시 -> 기사 저장소 -> LLM 순으로 조회, 새로 만들면 저장소에도 기록)
+
+    {'brief': str, 'summaries': [articles 순서대로 str]} 반환
+    """
+    def load() -> Dict[str, Any]:
+        stored = article_store.get_summary(set_key, ARTICLE_SUMMARY_TTL)
+        if stored is not None:
+            return stored
+        summary = summarize_articles(articles, keyword, api_key)
+        article_store.put_summary(set_key, summary)
+        return summary
+
+    return summaries_in_order(summary_cache.get_or_load(set_key, load), articles)
+
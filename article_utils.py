@@ -0,0 +1,52 @@
+"""기사 dict 공용 도우미 (중복 판정용 URL/제목 정규화, 발행 시각)
+
+news_providers와 article_store가 함께 쓰므로 둘 중 어디에도 의존하지 않는다.
+"""
+import re
+from datetime import datetime, timezone
+from typing import Any, Dict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+_TRACKING_PARAMS = re.compile(r'^(utm_\w+|fbclid|gclid|ref|cmpid)$', re.IGNORECASE)
+_NON_WORD = re.compile(r'[^\w]+')
+
+
+def canonical_url(url: str) -> str:
+    """중복 판정용 URL 정규화 (스킴/호스트 소문자, 추적 파라미터·fragment·끝 슬래시 제거)"""
+    if not url:
+        return ''
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        # 잘못된 URL("http://[broken/x")은 정규화하지 않고 그대로 비교
+        return url.strip()
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS.match(k)
+    ))
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(('https', host, path, query, ''))
+
+
+def normalize_title(article: Dict[str, Any]) -> str:
+    """중복 판정용 제목 정규화 (NewsAPI의 ' - 출처' 접미사, 문장부호 제거)"""
+    title = article.get('title') or ''
+    source_name = (article.get('source') or {}).get('name') or ''
+    if source_name and title.endswith(f' - {source_name}'):
+        title = title[:-len(source_name) - 3]
+    return _NON_WORD.sub(' ', title.casefold()).strip()
+
+
+def published_timestamp(article: Dict[str, Any]) -> float:
+    """publishedAt을 정렬용 timestamp로 변환 (없거나 잘못된 값은 가장 오래된 것으로)"""
+    published_at = article.get('publishedAt') or ''
+    try:
+        date_obj = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+    except ValueError:
+        return float('-inf')
+    if date_obj.tzinfo is None:
+        date_obj = date_obj.replace(tzinfo=timezone.utc)
+    return date_obj.timestamp()
@@ -0,0 +1,193 @@
+"""뉴스 검색/채팅/다이제스트 백엔드 API
+
+기본은 워커 프로세스 하나이며 세션은 프로세스 메모리에 둔다. 워커를 여러 개 띄우려면
+어느 워커든 같은 세션과 메일 작업을 이어서 처리하도록 SESSION_STORE_URL(Redis)이 필요하다.
+
+    $ python backend_api.py --port 8000
+    $ SESSION_STORE_URL=redis://localhost:6379/0 python backend_api.py --port 8000 --workers 4
+    $ BACKEND_URL=http://localhost:8000 streamlit run streamlit_app.py
+"""
+import argparse
+import base64
+import json
+import os
+import threading
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Header, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+import news_service
+from email_queue import email_queue
+from metrics import metrics
+from rate_limit import RateLimitExceeded
+from session_store import SESSION_STORE_URL, session_store
+from thumbnails import get_thumbnails
+from watch_worker import start_background_worker
+
+# 이메일 작업 상태 키 접두사 (다른 워커가 받은 작업도 조회할 수 있게 세션 저장소에 기록)
+JOB_KEY_PREFIX = 'job:'
+
+
+class SearchRequest(BaseModel):
+    keyword: str
+    search_all: bool = False
+
+
+class ChatRequest(BaseModel):
+    question: str
+    stream: bool = True
+
+
+class ThumbnailsRequest(BaseModel):
+    urls: List[Optional[str]]
+
+
+class DigestRequest(BaseModel):
+    articles: List[Dict[str, Any]]
+    keyword: str
+    recipients: List[str]
+    sender_email: str
+    sender_password: str = ''
+    summary: Optional[Dict[str, Any]] = None
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # WATCH_CONFIG가 있으면 감시 워커 실행 (워커 프로세스가 여럿이어도 파일 잠금을 잡은 한 곳에서만 돔)
+    if os.getenv('WATCH_CONFIG'):
+        start_background_worker()
+    yield
+
+
+app = FastAPI(title='뉴스 챗봇 백엔드', lifespan=lifespan)
+
+
+def _load_session(session_id: str) -> Dict[str, Any]:
+    return session_store.get(session_id) or news_service.new_session()
+
+
+def _openai_key(header_value: str) -> str:
+    """요청 헤더의 OpenAI 키 (없으면 서버 환경변수)"""
+    return header_value or os.getenv('OPENAI_API_KEY', '')
+
+
+@app.get('/health')
+def health():
+    return {'status': 'ok'}
+
+
+@app.get('/metrics', response_class=PlainTextResponse)
+def prometheus_metrics():
+    # 지표는 워커 프로세스별로 집계됨
+    return PlainTextResponse(metrics.render_prometheus(), media_type='text/plain; version=0.0.4; charset=utf-8')
+
+
+@app.get('/sessions/{session_id}')
+def get_session(session_id: str):
+    return _load_session(session_id)
+
+
+@app.post('/sessions/{session_id}/search')
+def search(session_id: str, request: SearchRequest, x_newsapi_key: str = Header(''),
+           x_guardian_key: str = Header('')):
+    api_keys = {'newsapi': x_newsapi_key, 'guardian': x_guardian_key}
+    articles, errors = news_service.search_news(request.keyword, api_keys, request.search_all)
+    state = news_service.apply_search(_load_session(session_id), request.keyword, articles, errors)
+    session_store.put(session_id, state)
+    return state
+
+
+@app.post('/sessions/{session_id}/summary')
+def summarize(session_id: str, x_openai_key: str = Header('')):
+    """기사별 요약과 전체 브리핑 (기사 묶음당 LLM 호출 한 번, 요약을 만들 수 없으면 null)"""
+    state = _load_session(session_id)
+    had_summary = state.get('summary') is not None
+    try:
+        summary = news_service.summarize_session(state, _openai_key(x_openai_key))
+    except RateLimitExceeded as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f'요약 생성에 실패했습니다: {e}')
+    if summary is not None and not had_summary:
+        session_store.put(session_id, state)
+    return {'summary': summary}
+
+
+@app.delete('/sessions/{session_id}/messages')
+def reset_messages(session_id: str):
+    state = _load_session(session_id)
+    state.update(messages=[], turn_stats=[])
+    session_store.put(session_id, state)
+    return state
+
+
+@app.post('/sessions/{session_id}/chat')
+async def chat(session_id: str, request: ChatRequest, x_openai_key: str = Header('')):
+    """질문 하나에 답변 (stream이면 NDJSON: {"delta": ...} 줄들, 마지막 줄 {"done": true, "stats": ...})"""
+    state = await run_in_threadpool(_load_session, session_id)
+    api_key = _openai_key(x_openai_key)
+    turn_stats: Dict[str, Any] = {}
+
+    if not request.stream:
+        answer = await news_service.aanswer_turn(state, request.question, api_key, turn_stats)
+        await run_in_threadpool(session_store.put, session_id, state)
+        return {'answer': answer, 'stats': turn_stats}
+
+    async def events():
+        async for delta in news_service.astream_turn(state, request.question, api_key, turn_stats):
+            yield json.dumps({'delta': delta}, ensure_ascii=False) + '\n'
+        await run_in_threadpool(session_store.put, session_id, state)
+        yield json.dumps({'done': True, 'stats': turn_stats}) + '\n'
+
+    return StreamingResponse(events(), media_type='application/x-ndjson')
+
+
+@app.post('/thumbnails')
+def thumbnails(request: ThumbnailsRequest):
+    """이미지 URL 목록 순서대로 300px 썸네일 (base64, 늦는 이미지는 자리표시 이미지로 먼저 응답)"""
+    images = get_thumbnails(request.urls)
+    return {'images': [base64.b64encode(images[url]).decode('ascii') for url in request.urls]}
+
+
+def _record_job_when_finished(job_id: str):
+    session_store.put(JOB_KEY_PREFIX + job_id, email_queue.wait(job_id))
+
+
+@app.post('/digests')
+def queue_digest(request: DigestRequest):
+    job_id = news_service.queue_digest(request.articles, request.keyword, request.recipients, request.sender_email,
+                                       request.sender_password, request.summary)
+    session_store.put(JOB_KEY_PREFIX + job_id, email_queue.status(job_id))
+    threading.Thread(target=_record_job_when_finished, args=(job_id,), name='digest-status', daemon=True).start()
+    return {'job_id': job_id}
+
+
+@app.get('/jobs/{job_id}')
+def job_status(job_id: str):
+    # 이 워커가 보내는 중이면 진행 상황, 아니면 저장소의 (접수 또는 완료 시점) 상태
+    job: Optional[Dict[str, Any]] = news_service.job_status(job_id) or session_store.get(JOB_KEY_PREFIX + job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail='작업을 찾을 수 없습니다')
+    return job
+
+
+def main():
+    parser = argparse.ArgumentParser(description='뉴스 챗봇 백엔드 API 서버')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1, help='워커 프로세스 수 (2 이상이면 SESSION_STORE_URL 필요)')
+    args = parser.parse_args()
+    if args.workers > 1 and not SESSION_STORE_URL:
+        parser.error('워커가 여럿이면 세션을 공유하도록 SESSION_STORE_URL(redis://...)을 설정해야 합니다.')
+
+    import uvicorn
+
+    uvicorn.run('backend_api:app', host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+import base64
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# 백엔드 API 주소 (비어 있으면 UI 프로세스 안에서 직접 처리)
+BACKEND_URL = os.getenv('BACKEND_URL', '')
+# (연결 타임아웃, 읽기 타임아웃) 초 - 읽기 타임아웃은 스트리밍 토큰 사이 간격에도 적용
+BACKEND_TIMEOUT = (
+    float(os.getenv('BACKEND_CONNECT_TIMEOUT', '3.05')),
+    float(os.getenv('BACKEND_READ_TIMEOUT', '120')),
+)
+
+
+class BackendError(Exception):
+    """백엔드 API 호출 실패"""
+
+
+class BackendClient:
+    """백엔드 API HTTP 클라이언트 (LocalBackend와 같은 인터페이스, keep-alive 커넥션 풀 사용)"""
+
+    def __init__(self, base_url: str, pool_maxsize: int = 10, timeout=BACKEND_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=0)
+        self._session.mount('https://', adapter)
+        self._session.mount('http://', adapter)
+
+    def _request(self, method: str, path: str, headers: Optional[Dict[str, str]] = None,
+                 **kwargs) -> requests.Response:
+        try:
+            response = self._session.request(method, self.base_url + path, headers=headers,
+                                             timeout=self.timeout, **kwargs)
+        except requests.RequestException as e:
+            raise BackendError(f'백엔드에 연결할 수 없습니다: {e}') from e
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get('detail', response.text)
+            except ValueError:
+                detail = response.text
+            response.close()
+            raise BackendError(f'백엔드 오류 {response.status_code}: {detail}')
+        return response
+
+    def get_session(self, session_id: str) -> Dict[str, Any]:
+        return self._request('GET', f'/sessions/{session_id}').json()
+
+    def search(self, session_id: str, keyword: str, api_keys: Dict[str, str],
+               search_all: bool = False) -> Dict[str, Any]:
+        headers = {'X-NewsAPI-Key': api_keys.get('newsapi') or '',
+                   'X-Guardian-Key': api_keys.get('guardian') or ''}
+        return self._request('POST', f'/sessions/{session_id}/search', headers=headers,
+                             json={'keyword': keyword, 'search_all': search_all}).json()
+
+    def summarize(self, session_id: str, openai_key: str) -> Optional[Dict[str, Any]]:
+        return self._request('POST', f'/sessions/{session_id}/summary',
+                             headers={'X-OpenAI-Key': openai_key or ''}).json()['summary']
+
+    def reset_messages(self, session_id: str) -> Dict[str, Any]:
+        return self._request('DELETE', f'/sessions/{session_id}/messages').json()
+
+    def chat(self, session_id: str, question: str, openai_key: str,
+             turn_stats: Optional[Dict[str, Any]] = None) -> str:
+        result = self._request('POST', f'/sessions/{session_id}/chat', headers={'X-OpenAI-Key': openai_key or ''},
+                               json={'question': question, 'stream': False}).json()
+        if turn_stats is not None:
+            turn_stats.update(result['stats'])
+        return result['answer']
+
+    def stream_chat(self, session_id: str, question: str, openai_key: str,
+                    turn_stats: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """NDJSON 스트림({"delta": ...} 줄들, 마지막에 {"done": true, "stats": ...})을 토큰 단위로 반환"""
+        response = self._request('POST', f'/sessions/{session_id}/chat', headers={'X-OpenAI-Key': openai_key or ''},
+                                 json={'question': question, 'stream': True}, stream=True)
+        with response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line:
+                    continue
+                event = json.loads(line)
+                if 'delta' in event:
+                    yield event['delta']
+                elif event.get('done') and turn_stats is not None:
+                    turn_stats.update(event['stats'])
+
+    def queue_digest(self, articles: List[Dict[str, Any]], keyword: str, recipients: List[str],
+                     sender_email: str, sender_password: str, summary: Optional[Dict[str, Any]] = None) -> str:
+        payload = {
+            'articles': articles,
+            'keyword': keyword,
+            'recipients': recipients,
+            'sender_email': sender_email,
+            'sender_password': sender_password,
+            'summary': summary,
+        }
+        return self._request('POST', '/digests', json=payload).json()['job_id']
+
+    def get_thumbnails(self, urls: List[Optional[str]]) -> Dict[Optional[str], bytes]:
+        urls = list(dict.fromkeys(urls))
+        images = self._request('POST', '/thumbnails', json={'urls': urls}).json()['images']
+        return {url: base64.b64decode(image) for url, image in zip(urls, images)}
+
+    def job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return self._request('GET', f'/jobs/{job_id}').json()
+        except BackendError:
+            return None
+
+    def wait_job(self, job_id: str, timeout: Optional[float] = None,
+                 poll_interval: float = 0.2) -> Optional[Dict[str, Any]]:
+        """작업이 끝날 때까지 상태를 주기적으로 조회"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.job_status(job_id)
+            if job is None or job['finished_at'] is not None:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(poll_interval)
+
+
+_backend_lock = threading.Lock()
+_backend = None
+
+
+def get_backend():
+    """프로세스 전역 백엔드 (BACKEND_URL이 있으면 HTTP 클라이언트, 없으면 인프로세스 백엔드)"""
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            if BACKEND_URL:
+                _backend = BackendClient(BACKEND_URL)
+            else:
+                # 인프로세스 백엔드를 쓸 때만 openai/smtplib 등 처리 모듈을 불러옴
+                from local_backend import LocalBackend
+
+                _backend = LocalBackend()
+        return _backend
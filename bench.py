@@ -0,0 +1,293 @@
+"""로컬 가짜 서버를 사용한 성능 측정 스크립트
+
+    $ python bench.py http --requests 200 --connect-latency 0.03
+    $ python bench.py chat --turns 20 --chunk-latency 0.02
+    $ python bench.py client --turns 50 --connect-latency 0.05
+    $ python bench.py index --articles 10 100 1000 10000
+    $ python bench.py digest --recipients 5000
+    $ python bench.py ui --turns 5
+    $ python bench.py store --articles 200000
+"""
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, List
+
+import openai
+import requests
+
+from article_index import ArticleIndex
+from digest import build_digest_message, prepare_digest, render_digest
+from http_client import ProviderHTTPClient
+from openai_clients import OpenAIClientRegistry
+from stub_servers import fake_newsapi_articles, run_stub_server
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """정렬된 표본에서 백분위 값 (nearest-rank)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(name: str, samples: List[float]) -> Dict[str, float]:
+    """지연 시간 표본 요약 (ms)"""
+    return {
+        'name': name,
+        'count': len(samples),
+        'mean_ms': statistics.fmean(samples) * 1000 if samples else 0.0,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+    }
+
+
+def print_summary(summary: Dict[str, float], extra: str = ''):
+    print(f"{summary['name']:<24} n={summary['count']:<5} mean={summary['mean_ms']:8.2f}ms "
+          f"p50={summary['p50_ms']:8.2f}ms p95={summary['p95_ms']:8.2f}ms "
+          f"p99={summary['p99_ms']:8.2f}ms {extra}")
+
+
+def time_calls(fn: Callable[[], object], count: int) -> List[float]:
+    """fn을 count번 호출하며 각 호출의 소요 시간 측정"""
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def bench_http(args):
+    """매 요청 새 연결(requests.get) vs 공용 커넥션 풀(ProviderHTTPClient)"""
+    with run_stub_server(latency=args.latency, connect_latency=args.connect_latency) as server:
+        url = f'{server.base_url}/v2/everything'
+        params = {'q': '인공지능', 'language': 'ko', 'pageSize': 10}
+
+        samples = time_calls(lambda: requests.get(url, params=params, timeout=10).json(), args.requests)
+        print_summary(summarize('requests.get', samples), f'connections={server.connections}')
+
+        server.connections = 0
+        client = ProviderHTTPClient()
+        samples = time_calls(lambda: client.get_json(url, params=params), args.requests)
+        print_summary(summarize('ProviderHTTPClient', samples), f'connections={server.connections}')
+        client.close()
+
+
+def bench_chat(args):
+    """블로킹 응답 vs 스트리밍 응답의 첫 토큰 시간(TTFT)과 전체 시간"""
+    with run_stub_server(latency=args.latency, chunk_latency=args.chunk_latency,
+                         reply_tokens=args.tokens) as server:
+        client = openai.OpenAI(api_key='stub', base_url=f'{server.base_url}/v1')
+        messages = [{'role': 'user', 'content': '요약해줘'}]
+
+        ttft, total = [], []
+        for _ in range(args.turns):
+            start = time.perf_counter()
+            client.chat.completions.create(model='gpt-4o-mini', messages=messages)
+            ttft.append(time.perf_counter() - start)
+            total.append(ttft[-1])
+        print_summary(summarize('blocking ttft', ttft))
+        print_summary(summarize('blocking total', total))
+
+        ttft, total = [], []
+        for _ in range(args.turns):
+            start = time.perf_counter()
+            first = None
+            for chunk in client.chat.completions.create(model='gpt-4o-mini', messages=messages, stream=True):
+                if first is None and chunk.choices and chunk.choices[0].delta.content:
+                    first = time.perf_counter() - start
+            ttft.append(first or 0.0)
+            total.append(time.perf_counter() - start)
+        print_summary(summarize('streaming ttft', ttft))
+        print_summary(summarize('streaming total', total))
+        client.close()
+
+
+def bench_client(args):
+    """메시지마다 OpenAI 클라이언트 생성 vs 레지스트리에서 재사용 (턴당 지연 시간)"""
+    with run_stub_server(latency=args.latency, connect_latency=args.connect_latency,
+                         reply_tokens=args.tokens) as server:
+        base_url = f'{server.base_url}/v1'
+        messages = [{'role': 'user', 'content': '요약해줘'}]
+
+        def new_client_turn():
+            client = openai.OpenAI(api_key='stub', base_url=base_url)
+            client.chat.completions.create(model='gpt-4o-mini', messages=messages)
+
+        samples = time_calls(new_client_turn, args.turns)
+        print_summary(summarize('new client per turn', samples), f'connections={server.connections}')
+
+        server.connections = 0
+        registry = OpenAIClientRegistry()
+        samples = time_calls(
+            lambda: registry.get('stub', base_url).chat.completions.create(model='gpt-4o-mini', messages=messages),
+            args.turns
+        )
+        print_summary(summarize('client registry', samples), f'connections={server.connections}')
+        registry.close_all()
+
+
+def synthetic_articles(count: int) -> List[Dict[str, object]]:
+    """인덱스 측정용 한국어/영어 혼합 기사"""
+    topics = ['인공지능', '반도체', '경제', '부동산', '스포츠', '기후', '전기차', '금리']
+    words = ['정부는', '발표했다', '시장', '전망', '투자자들이', '증가', '감소', '기업', 'AI', 'chip', 'market']
+    return [
+        {
+            'title': f'{topics[i % len(topics)]} 관련 뉴스 {i} {words[i % len(words)]}',
+            'description': ' '.join(words[(i + j) % len(words)] for j in range(30)) + f' {topics[(i * 7) % len(topics)]}'
+        }
+        for i in range(count)
+    ]
+
+
+def bench_index(args):
+    """기사 수에 따른 BM25 인덱스 생성/질의 시간"""
+    queries = ['인공지능 반도체 전망은?', '금리 인상이 부동산에 미치는 영향', 'AI chip market', '3번 기사와 비슷한 뉴스는?']
+    for count in args.articles:
+        articles = synthetic_articles(count)
+        start = time.perf_counter()
+        index = ArticleIndex(articles)
+        build = time.perf_counter() - start
+        samples = time_calls(lambda: [index.select(q) for q in queries], args.queries)
+        print(f'articles={count:<7} build={build * 1000:8.2f}ms terms={len(index.vocabulary):<6} '
+              f'query p50={percentile(samples, 50) / len(queries) * 1000:7.3f}ms '
+              f'p95={percentile(samples, 95) / len(queries) * 1000:7.3f}ms')
+
+
+def bench_digest(args):
+    """수신자별 다이제스트 렌더링 처리량 (messages/sec)"""
+    articles = fake_newsapi_articles('인공지능', args.articles)
+    recipients = [f'user{i}@example.com' for i in range(args.recipients)]
+
+    start = time.perf_counter()
+    prepared = prepare_digest(articles, '인공지능')
+    for recipient in recipients:
+        render_digest(prepared, recipient)
+    elapsed = time.perf_counter() - start
+    print(f'render only      recipients={args.recipients:<6} {args.recipients / elapsed:10.0f} messages/sec')
+
+    start = time.perf_counter()
+    for recipient in recipients:
+        build_digest_message(prepared, recipient, 'sender@example.com').as_bytes()
+    elapsed = time.perf_counter() - start
+    print(f'MIME serialized  recipients={args.recipients:<6} {args.recipients / elapsed:10.0f} messages/sec')
+
+
+def bench_store(args):
+    """기사 저장소 적재 처리량과 키워드/기간/전문 검색 지연 시간"""
+    from article_store import ArticleStore
+
+    keywords = ['인공지능', '반도체', '경제', '부동산', '스포츠', '기후', '전기차', '금리']
+    articles = synthetic_articles(args.articles)
+    base = time.time() - args.articles * 60
+    for i, article in enumerate(articles):
+        article['url'] = f'https://news.example.com/{i}?utm_source=bench'
+        article['publishedAt'] = time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(base + i * 60))
+
+    with tempfile.TemporaryDirectory() as directory:
+        store = ArticleStore(os.path.join(directory, 'articles.db'))
+        start = time.perf_counter()
+        for i in range(0, len(articles), args.batch):
+            batch = articles[i:i + args.batch]
+            store.upsert_articles(batch, 'bench', keywords[(i // args.batch) % len(keywords)])
+        elapsed = time.perf_counter() - start
+        print(f'ingest    articles={args.articles:<7} {args.articles / elapsed:10.0f} articles/sec')
+
+        start = time.perf_counter()
+        store.upsert_articles(articles[:args.batch], 'bench', keywords[0])
+        print(f're-upsert batch={args.batch:<9} {(time.perf_counter() - start) * 1000:10.2f} ms')
+
+        day_start = base + args.articles * 30
+        print_summary(summarize('keyword latest', time_calls(lambda: store.keyword_articles('bench', '경제'), args.queries)))
+        print_summary(summarize('keyword + range', time_calls(
+            lambda: store.keyword_articles('bench', '경제', start=day_start, end=day_start + 86400), args.queries)))
+        # 드문 단어(기사 번호)와 거의 모든 기사에 있는 단어
+        rare = f'뉴스 {args.articles // 2}'
+        print_summary(summarize('full text (rare)', time_calls(lambda: store.search(rare, limit=20), args.queries)))
+        print_summary(summarize('full text (common)', time_calls(lambda: store.search('market', limit=20), args.queries)))
+        print_summary(summarize('full text + range', time_calls(
+            lambda: store.search('market', limit=20, start=day_start, end=day_start + 86400), args.queries)))
+
+
+def bench_ui(args):
+    """채팅 턴마다 전체 페이지 재실행(이전 방식) vs 채팅 패널 fragment만 재실행한 시간"""
+    from streamlit.testing.v1 import AppTest
+
+    with run_stub_server(reply_tokens=args.tokens) as server:
+        os.environ['OPENAI_BASE_URL'] = f'{server.base_url}/v1'
+        app = AppTest.from_file(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py'),
+                                default_timeout=60)
+        app.secrets['OPENAI_API_KEY'] = 'stub'
+        app.run()
+        next(t for t in app.sidebar.text_input if t.label.startswith('관심')).input('인공지능')
+        app.sidebar.button[0].click().run()
+
+        page, panel = [], []
+        for turn in range(args.turns):
+            app.chat_input[0].set_value(f'질문 {turn}').run()
+            # 답변 생성 시간을 빼고 화면을 다시 그리는 비용만 측정
+            app.run()
+            page.append(app.session_state.page_run_seconds)
+            panel.append(app.session_state.chat_panel_seconds)
+        print_summary(summarize('full page rerun', page))
+        print_summary(summarize('chat fragment rerun', panel))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    http_parser = subparsers.add_parser('http', help='프로바이더 HTTP 클라이언트 지연 시간 비교')
+    http_parser.add_argument('--requests', type=int, default=200)
+    http_parser.add_argument('--latency', type=float, default=0.0, help='요청당 서버 지연 (초)')
+    http_parser.add_argument('--connect-latency', type=float, default=0.03,
+                             help='새 연결마다 추가되는 핸드셰이크 지연 (초)')
+    http_parser.set_defaults(func=bench_http)
+
+    chat_parser = subparsers.add_parser('chat', help='챗봇 블로킹/스트리밍 응답 지연 시간 비교')
+    chat_parser.add_argument('--turns', type=int, default=20)
+    chat_parser.add_argument('--latency', type=float, default=0.2, help='첫 토큰 전 서버 지연 (초)')
+    chat_parser.add_argument('--chunk-latency', type=float, default=0.02, help='토큰 간 지연 (초)')
+    chat_parser.add_argument('--tokens', type=int, default=50, help='답변 토큰 수')
+    chat_parser.set_defaults(func=bench_chat)
+
+    client_parser = subparsers.add_parser('client', help='OpenAI 클라이언트 재사용 전후 턴당 지연 시간 비교')
+    client_parser.add_argument('--turns', type=int, default=50)
+    client_parser.add_argument('--latency', type=float, default=0.0, help='요청당 서버 지연 (초)')
+    client_parser.add_argument('--connect-latency', type=float, default=0.05,
+                               help='새 연결마다 추가되는 핸드셰이크 지연 (초)')
+    client_parser.add_argument('--tokens', type=int, default=20, help='답변 토큰 수')
+    client_parser.set_defaults(func=bench_client)
+
+    index_parser = subparsers.add_parser('index', help='기사 수에 따른 인덱스 생성/질의 시간')
+    index_parser.add_argument('--articles', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    index_parser.add_argument('--queries', type=int, default=50, help='기사 수마다 반복할 질의 묶음 수')
+    index_parser.set_defaults(func=bench_index)
+
+    digest_parser = subparsers.add_parser('digest', help='다이제스트 렌더링 처리량')
+    digest_parser.add_argument('--recipients', type=int, default=5000)
+    digest_parser.add_argument('--articles', type=int, default=10)
+    digest_parser.set_defaults(func=bench_digest)
+
+    ui_parser = subparsers.add_parser('ui', help='채팅 턴당 스크립트 실행 시간 (전체 페이지 vs 채팅 fragment)')
+    ui_parser.add_argument('--turns', type=int, default=5)
+    ui_parser.add_argument('--tokens', type=int, default=20, help='답변 토큰 수')
+    ui_parser.set_defaults(func=bench_ui)
+
+    store_parser = subparsers.add_parser('store', help='기사 저장소 적재/조회 시간')
+    store_parser.add_argument('--articles', type=int, default=200000)
+    store_parser.add_argument('--batch', type=int, default=1000, help='한 번에 저장하는 기사 수')
+    store_parser.add_argument('--queries', type=int, default=200)
+    store_parser.set_defaults(func=bench_store)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
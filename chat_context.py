@@ -0,0 +1,133 @@
+import os
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from metrics import metrics
+
+# 시스템 프롬프트 + 뉴스 + 대화 기록 전체 토큰 예산 (답변 max_tokens 제외)
+CHAT_TOKEN_BUDGET = int(os.getenv('CHAT_TOKEN_BUDGET', '6000'))
+# 뉴스 컨텍스트에 쓸 수 있는 최대 토큰
+NEWS_CONTEXT_TOKENS = int(os.getenv('NEWS_CONTEXT_TOKENS', '2500'))
+# 메시지 하나당 역할/구분자 오버헤드
+MESSAGE_OVERHEAD_TOKENS = 4
+# 생략된 대화 요약에 남겨두는 토큰
+SUMMARY_TOKENS = 100
+
+
+@lru_cache(maxsize=1)
+def _get_encoder() -> Optional[Callable[[str], List[int]]]:
+    """tiktoken이 설치되어 있으면 gpt-4o 계열 토크나이저 사용"""
+    try:
+        import tiktoken
+        return tiktoken.get_encoding('o200k_base').encode
+    except Exception:
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """텍스트 토큰 수 (tiktoken이 없으면 영문 4자당 1토큰, 한글 등은 글자당 1토큰으로 추정)"""
+    if not text:
+        return 0
+    encode = _get_encoder()
+    if encode is not None:
+        return len(encode(text))
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def count_message_tokens(message: Dict[str, str]) -> int:
+    """API 메시지 하나의 토큰 수"""
+    return count_tokens(message.get('content', '')) + MESSAGE_OVERHEAD_TOKENS
+
+
+def _truncate(text: str, max_length: int) -> str:
+    if len(text) <= max_length:
+        return text
+    return text[:max_length-3] + "..."
+
+
+@metrics.timed('chat_context_build', step='news_context')
+def build_news_context(articles: List[Dict[str, Any]], max_tokens: Optional[int] = NEWS_CONTEXT_TOKENS,
+                       indices: Optional[List[int]] = None, summary: Optional[Dict[str, Any]] = None) -> str:
+    """검색 결과로 뉴스 컨텍스트 생성 (indices가 있으면 해당 기사만 그 순서로, 토큰 예산을 넘는 기사는 제외)
+
+    max_tokens가 None이면 예산 없이 모든 기사를 넣는다. 기사 번호는 뉴스 목록의 순서를 그대로 따른다. 일괄 요약(summary)이 있으면 전체 브리핑을 앞에 두고
+    기사 내용 대신 기사별 요약을 넣어 같은 예산에 더 많은 기사를 담는다.
+    """
+    parts = []
+    used = 0
+    summaries = (summary or {}).get('summaries') or []
+    if summary and summary.get('brief'):
+        part = f"전체 브리핑:\n{summary['brief']}\n"
+        parts.append(part)
+        used += count_tokens(part)
+    for i in (range(len(articles)) if indices is None else indices):
+        article = articles[i]
+        article_summary = summaries[i] if i < len(summaries) else ''
+        part = (
+            f"\n뉴스 {i+1}:\n"
+            f"제목: {article.get('title', '')}\n"
+            f"출처: {(article.get('source') or {}).get('name', '')}\n"
+            + (f"요약: {article_summary}\n" if article_summary
+               else f"내용: {_truncate(article.get('description') or '', 200)}\n")
+        )
+        tokens = count_tokens(part)
+        if max_tokens is not None and used + tokens > max_tokens:
+            break
+        parts.append(part)
+        used += tokens
+    return "".join(parts)
+
+
+@metrics.timed('chat_context_build', step='fit_messages')
+def fit_messages(system_prompt: str, messages: List[Dict[str, str]],
+                 budget: int = CHAT_TOKEN_BUDGET) -> Tuple[List[Dict[str, str]], int]:
+    """시스템 프롬프트와 최근 대화를 토큰 예산에 맞춰 구성
+
+    가장 최근 메시지부터 예산이 허락하는 만큼 포함하고, 잘려나간 오래된 대화는
+    이전 질문 목록으로 짧게 요약한다. (API 메시지 목록, 토큰 수) 반환
+    """
+    system_message = {"role": "system", "content": system_prompt}
+    used = count_message_tokens(system_message)
+
+    kept: List[Dict[str, str]] = []
+    for index in range(len(messages) - 1, -1, -1):
+        tokens = count_message_tokens(messages[index])
+        # 마지막 사용자 메시지는 예산을 넘더라도 항상 포함, 이전 대화 요약 자리는 남겨둠
+        if kept and used + tokens > budget - (SUMMARY_TOKENS if index else 0):
+            dropped = messages[:index + 1]
+            break
+        kept.append(messages[index])
+        used += tokens
+    else:
+        dropped = []
+    kept.reverse()
+
+    api_messages = [system_message]
+    if dropped:
+        questions = [_truncate(m['content'], 80) for m in dropped if m['role'] == 'user']
+        summary = {
+            "role": "system",
+            "content": _truncate(f"(이전 대화 {len(dropped)}개 생략) 이전 질문: " + " / ".join(questions),
+                                 SUMMARY_TOKENS)
+        }
+        summary_tokens = count_message_tokens(summary)
+        if used + summary_tokens <= budget:
+            api_messages.append(summary)
+            used += summary_tokens
+    api_messages.extend(kept)
+    return api_messages, used
+
+
+def build_chat_messages(messages: List[Dict[str, str]], news_context: str) -> Tuple[List[Dict[str, str]], int]:
+    """시스템 프롬프트와 대화 기록을 토큰 예산에 맞춰 API 메시지로 구성 (메시지, 토큰 수)"""
+    # 시스템 프롬프트 생성
+    system_prompt = f"""당신은 뉴스 분석 전문가입니다. 다음 뉴스 정보를 바탕으로 사용자의 질문에 답변해주세요:
+
+{news_context}
+
+위 뉴스들을 참고하여 정확하고 유용한 정보를 제공하며, 출처를 명시해주세요. 
+뉴스에 없는 내용에 대해서는 일반적인 지식을 바탕으로 도움이 되는 답변을 해주세요."""
+
+    # 메시지 구성 (오래된 대화는 토큰 예산에 맞춰 생략)
+    return fit_messages(system_prompt, messages)
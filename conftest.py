@@ -0,0 +1 @@
+"""pytest 설정 (최상위 모듈을 tests/에서 import할 수 있도록 저장소 루트를 sys.path에 추가)"""
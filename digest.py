@@ -0,0 +1,188 @@
+import html
+import re
+from datetime import datetime
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+_PLACEHOLDER = re.compile(r'\{\{(\w+)\}\}')
+
+
+class CompiledTemplate:
+    """{{name}} 자리표시자를 가진 템플릿 (import 시 한 번 분해하고 렌더링은 join 한 번)"""
+
+    def __init__(self, source: str):
+        parts = _PLACEHOLDER.split(source)
+        # 짝수 인덱스는 고정 문자열, 홀수 인덱스는 필드 이름
+        self._literals = parts[0::2]
+        self._fields = parts[1::2]
+
+    def render(self, values: Dict[str, str]) -> str:
+        out = [self._literals[0]]
+        for field, literal in zip(self._fields, self._literals[1:]):
+            out.append(values[field])
+            out.append(literal)
+        return ''.join(out)
+
+
+HTML_TEMPLATE = CompiledTemplate("""
+<html>
+<head>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; }
+        .header { background-color: #f4f4f4; padding: 20px; text-align: center; }
+        .news-item { border: 1px solid #ddd; margin: 15px 0; padding: 15px; border-radius: 5px; }
+        .news-title { font-size: 18px; font-weight: bold; color: #2c3e50; margin-bottom: 10px; }
+        .news-source { color: #7f8c8d; font-size: 14px; margin-bottom: 5px; }
+        .news-date { color: #95a5a6; font-size: 12px; margin-bottom: 10px; }
+        .news-description { margin-bottom: 10px; }
+        .news-link { color: #3498db; text-decoration: none; }
+        .brief { background-color: #eef6fb; padding: 15px; margin: 15px 0; border-radius: 5px; }
+        .footer { background-color: #f4f4f4; padding: 15px; text-align: center; margin-top: 20px; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>📰 뉴스 요약 리포트</h1>
+        <p>{{greeting}}</p>
+        <p>키워드: <strong>{{keyword}}</strong></p>
+        <p>생성일시: {{generated_at}}</p>
+    </div>
+{{brief}}
+{{items}}
+    <div class="footer">
+        <p>이 뉴스 요약은 뉴스 챗봇에서 자동 생성되었습니다.</p>
+        <p>더 자세한 정보는 각 뉴스의 원문을 확인해주세요.</p>
+    </div>
+</body>
+</html>
+""")
+
+HTML_ITEM_TEMPLATE = CompiledTemplate("""
+    <div class="news-item">
+        <div class="news-title">{{number}}. {{title}}</div>
+        <div class="news-source">📰 출처: {{source}}</div>
+        <div class="news-date">🕒 {{date}}</div>
+        <div class="news-description">{{description}}</div>
+        <a href="{{url}}" class="news-link" target="_blank">원문 보기 →</a>
+    </div>
+""")
+
+TEXT_TEMPLATE = CompiledTemplate("""📰 뉴스 요약 리포트
+{{greeting}}
+키워드: {{keyword}}
+생성일시: {{generated_at}}
+{{brief}}{{items}}
+이 뉴스 요약은 뉴스 챗봇에서 자동 생성되었습니다.
+더 자세한 정보는 각 뉴스의 원문을 확인해주세요.
+""")
+
+HTML_BRIEF_TEMPLATE = CompiledTemplate("""
+    <div class="brief">
+        <strong>📝 오늘의 브리핑</strong>
+        <p>{{brief}}</p>
+    </div>
+""")
+
+TEXT_BRIEF_TEMPLATE = CompiledTemplate("""
+📝 오늘의 브리핑
+{{brief}}
+""")
+
+TEXT_ITEM_TEMPLATE = CompiledTemplate("""
+{{number}}. {{title}}
+출처: {{source}} | {{date}}
+{{description}}
+원문 보기: {{url}}
+""")
+
+
+@lru_cache(maxsize=4096)
+def format_published_at(published_at: str) -> str:
+    """publishedAt을 'YYYY-MM-DD HH:MM'으로 변환 (같은 값은 한 번만 파싱)"""
+    if not published_at:
+        return ''
+    try:
+        date_obj = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
+        return date_obj.strftime('%Y-%m-%d %H:%M')
+    except ValueError:
+        return published_at
+
+
+def _truncate(text: str, max_length: int) -> str:
+    if len(text) <= max_length:
+        return text
+    return text[:max_length-3] + "..."
+
+
+def _safe_url(url: str) -> str:
+    """http(s) 링크만 허용 (javascript: 등은 '#'으로 대체)"""
+    return url if url.startswith(('http://', 'https://')) else '#'
+
+
+def prepare_digest(articles: List[Dict[str, Any]], keyword: str,
+                   summary: Optional[Dict[str, Any]] = None) -> Dict[str, str]:
+    """수신자와 무관한 부분(기사 목록, 제목 등)을 미리 렌더링 (기사 내용은 HTML 이스케이프)
+
+    일괄 요약(summary)이 있으면 브리핑을 기사 목록 앞에 넣고 기사 설명 대신 기사별 요약을 쓴다.
+    """
+    html_items = []
+    text_items = []
+    summaries = (summary or {}).get('summaries') or []
+    for i, article in enumerate(articles, 1):
+        fields = {
+            'number': str(i),
+            'title': article.get('title') or '제목 없음',
+            'source': (article.get('source') or {}).get('name') or '출처 불명',
+            'date': format_published_at(article.get('publishedAt') or ''),
+            'description': (summaries[i - 1] if i <= len(summaries) else '')
+                           or _truncate(article.get('description') or '내용 없음', 200),
+            'url': _safe_url(article.get('url') or ''),
+        }
+        text_items.append(TEXT_ITEM_TEMPLATE.render(fields))
+        html_items.append(HTML_ITEM_TEMPLATE.render({k: html.escape(v) for k, v in fields.items()}))
+
+    brief = (summary or {}).get('brief') or ''
+    return {
+        'subject': f"[뉴스 요약] '{keyword}' 관련 최신 뉴스 {len(articles)}개",
+        'keyword': keyword,
+        'generated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'html_items': ''.join(html_items),
+        'text_items': ''.join(text_items),
+        'html_brief': HTML_BRIEF_TEMPLATE.render({'brief': html.escape(brief)}) if brief else '',
+        'text_brief': TEXT_BRIEF_TEMPLATE.render({'brief': brief}) if brief else '',
+    }
+
+
+def render_digest(prepared: Dict[str, str], recipient_email: str) -> Tuple[str, str, str]:
+    """수신자별 (제목, 텍스트 본문, HTML 본문) 렌더링"""
+    greeting = f"{recipient_email}님을 위한 뉴스 요약입니다."
+    text_body = TEXT_TEMPLATE.render({
+        'greeting': greeting,
+        'keyword': prepared['keyword'],
+        'generated_at': prepared['generated_at'],
+        'brief': prepared['text_brief'],
+        'items': prepared['text_items'],
+    })
+    html_body = HTML_TEMPLATE.render({
+        'greeting': html.escape(greeting),
+        'keyword': html.escape(prepared['keyword']),
+        'generated_at': prepared['generated_at'],
+        'brief': prepared['html_brief'],
+        'items': prepared['html_items'],
+    })
+    return prepared['subject'], text_body, html_body
+
+
+def build_digest_message(prepared: Dict[str, str], recipient_email: str, sender_email: str) -> MIMEMultipart:
+    """텍스트/HTML 두 파트를 가진 이메일 메시지 생성"""
+    subject, text_body, html_body = render_digest(prepared, recipient_email)
+    msg = MIMEMultipart('alternative')
+    msg['From'] = sender_email
+    msg['To'] = recipient_email
+    msg['Subject'] = subject
+    # 메일 클라이언트는 마지막 파트(HTML)를 우선 표시
+    msg.attach(MIMEText(text_body, 'plain', 'utf-8'))
+    msg.attach(MIMEText(html_body, 'html', 'utf-8'))
+    return msg
@@ -0,0 +1,218 @@
+import os
+import queue
+import random
+import smtplib
+import threading
+import time
+import uuid
+from email.message import Message
+from typing import Any, Dict, List, Optional, Tuple
+
+from metrics import metrics
+
+# 이 시간(초) 이상 쓰지 않은 SMTP 연결은 닫음
+SMTP_IDLE_TIMEOUT = float(os.getenv('SMTP_IDLE_TIMEOUT', '60'))
+SMTP_TIMEOUT = float(os.getenv('SMTP_TIMEOUT', '30'))
+SMTP_MAX_RETRIES = int(os.getenv('SMTP_MAX_RETRIES', '3'))
+# 발송 SMTP 서버 (서버 설정으로만 정함 - 요청마다 받으면 임의 호스트로 연결하는 통로가 됨)
+SMTP_SERVER = os.getenv('SMTP_SERVER', 'smtp.gmail.com')
+SMTP_PORT = int(os.getenv('SMTP_PORT', '587'))
+# STARTTLS 사용 여부 (TLS 없는 로컬 릴레이/테스트 서버는 0)
+SMTP_USE_TLS = os.getenv('SMTP_USE_TLS', '1') != '0'
+# 끝난 작업 상태를 보관하는 시간(초)
+JOB_RETENTION = 3600
+
+# (서버, 포트, 사용자, TLS 사용 여부)
+SMTPKey = Tuple[str, int, str, bool]
+
+
+class SMTPConnectionPool:
+    """서버/계정별로 로그인된 SMTP 연결을 유지하고 끊기면 다시 연결"""
+
+    def __init__(self, idle_timeout: float = SMTP_IDLE_TIMEOUT, timeout: float = SMTP_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        # key -> (연결, 마지막 사용 시각)
+        self._connections: Dict[SMTPKey, Tuple[smtplib.SMTP, float]] = {}
+
+    def get(self, key: SMTPKey, password: str) -> smtplib.SMTP:
+        """살아있는 연결 반환 (오래됐거나 끊긴 연결은 새로 맺음)"""
+        entry = self._connections.get(key)
+        if entry is not None:
+            server, last_used = entry
+            if time.monotonic() - last_used < self.idle_timeout:
+                try:
+                    if server.noop()[0] == 250:
+                        return server
+                except smtplib.SMTPException:
+                    pass
+            self.discard(key)
+
+        host, port, username, use_tls = key
+        server = smtplib.SMTP(host, port, timeout=self.timeout)
+        try:
+            if use_tls:
+                server.starttls()
+            if password:
+                server.login(username, password)
+        except BaseException:
+            server.close()
+            raise
+        self._connections[key] = (server, time.monotonic())
+        return server
+
+    def touch(self, key: SMTPKey):
+        """연결 사용 시각 갱신"""
+        if key in self._connections:
+            self._connections[key] = (self._connections[key][0], time.monotonic())
+
+    def discard(self, key: SMTPKey):
+        """연결 종료 (이미 끊겼으면 무시)"""
+        entry = self._connections.pop(key, None)
+        if entry is None:
+            return
+        try:
+            entry[0].quit()
+        except (smtplib.SMTPException, OSError):
+            entry[0].close()
+
+    def close_idle(self):
+        """idle_timeout이 지난 연결 정리"""
+        now = time.monotonic()
+        for key, (_, last_used) in list(self._connections.items()):
+            if now - last_used >= self.idle_timeout:
+                self.discard(key)
+
+
+def _is_retryable(error: Exception) -> bool:
+    """연결 끊김, 타임아웃, 4xx 일시 오류만 재시도"""
+    # SMTPException도 OSError의 하위 클래스이므로 응답 코드가 있는 오류를 먼저 판단
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class EmailQueue:
+    """백그라운드 이메일 발송 큐
+
+    작업(job) 하나는 같은 SMTP 계정으로 보낼 여러 메시지 묶음이며, 하나의 연결로
+    순서대로 전송한다. submit()이 반환한 job id로 status()를 조회한다.
+    """
+
+    def __init__(self, max_retries: int = SMTP_MAX_RETRIES, backoff_base: float = 1.0,
+                 backoff_max: float = 30.0, pool: Optional[SMTPConnectionPool] = None):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._pool = pool or SMTPConnectionPool()
+        self._queue: "queue.Queue[str]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._payloads: Dict[str, Tuple[SMTPKey, str, List[Message]]] = {}
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, messages: List[Message], smtp_server: str, smtp_port: int, username: str,
+               password: str, use_tls: bool = SMTP_USE_TLS) -> str:
+        """메시지 묶음을 큐에 넣고 job id 반환"""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            expired = [k for k, job in self._jobs.items()
+                       if job['finished_at'] is not None and time.time() - job['finished_at'] > JOB_RETENTION]
+            for k in expired:
+                del self._jobs[k]
+            self._jobs[job_id] = {
+                'status': 'queued',
+                'total': len(messages),
+                'sent': 0,
+                'failed': 0,
+                'errors': [],
+                'created_at': time.time(),
+                'finished_at': None,
+            }
+            self._payloads[job_id] = ((smtp_server, smtp_port, username, use_tls), password, messages)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name='email-queue', daemon=True)
+                self._worker.start()
+        self._queue.put(job_id)
+        return job_id
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """작업 상태 조회 (queued / sending / done / partial / failed)"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job, errors=list(job['errors'])) if job else None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """작업이 끝날 때까지 대기 후 상태 반환"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.status(job_id)
+            if job is None or job['finished_at'] is not None:
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(0.05)
+
+    def _update(self, job_id: str, **changes):
+        with self._lock:
+            self._jobs[job_id].update(changes)
+
+    def _run(self):
+        while True:
+            try:
+                job_id = self._queue.get(timeout=self._pool.idle_timeout)
+            except queue.Empty:
+                self._pool.close_idle()
+                continue
+            try:
+                self._process(job_id)
+            except Exception as e:
+                with self._lock:
+                    self._jobs[job_id]['errors'].append(str(e))
+                self._update(job_id, status='failed', finished_at=time.time())
+            finally:
+                self._queue.task_done()
+
+    def _process(self, job_id: str):
+        with self._lock:
+            key, password, messages = self._payloads.pop(job_id)
+        self._update(job_id, status='sending')
+
+        sent = failed = 0
+        for message in messages:
+            error = self._send_with_retry(key, password, message)
+            if error is None:
+                sent += 1
+            else:
+                failed += 1
+                with self._lock:
+                    self._jobs[job_id]['errors'].append(f"{message.get('To', '')}: {error}")
+            self._update(job_id, sent=sent, failed=failed)
+
+        status = 'done' if not failed else ('failed' if not sent else 'partial')
+        self._update(job_id, status=status, finished_at=time.time())
+
+    def _send_with_retry(self, key: SMTPKey, password: str, message: Message) -> Optional[str]:
+        """메시지 하나 전송 (일시 오류는 지터 지수 백오프로 재시도), 실패 시 오류 메시지 반환"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                with metrics.span('smtp_send'):
+                    server = self._pool.get(key, password)
+                    server.send_message(message)
+                self._pool.touch(key)
+                return None
+            except Exception as e:
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    return str(e)
+                metrics.inc('smtp_retries_total')
+                # 4xx 응답은 연결을 그대로 쓰고, 끊김/타임아웃이면 다음 시도는 새 연결로
+                if not isinstance(e, smtplib.SMTPResponseException):
+                    self._pool.discard(key)
+                time.sleep(random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt))))
+        return None
+
+
+# 프로세스 전역 이메일 발송 큐
+email_queue = EmailQueue()
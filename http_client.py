@@ -0,0 +1,123 @@
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import metrics
+
+# (연결 타임아웃, 읽기 타임아웃) 초
+DEFAULT_TIMEOUT = (
+    float(os.getenv('PROVIDER_CONNECT_TIMEOUT', '3.05')),
+    float(os.getenv('PROVIDER_READ_TIMEOUT', '10')),
+)
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Retry-After 헤더(초 또는 HTTP 날짜)를 대기 시간(초)으로 변환"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (retry_at - now).total_seconds())
+
+
+class ProviderHTTPClient:
+    """뉴스 프로바이더 공용 HTTP 클라이언트
+
+    keep-alive 커넥션 풀(호스트당 연결 수 제한), 연결/읽기 타임아웃,
+    429/5xx 및 연결 오류에 대한 지터 지수 백오프 재시도를 제공한다.
+    """
+
+    def __init__(self, pool_maxsize: int = 10, timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 8.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+        self._pool_maxsize = pool_maxsize
+        self._lock = threading.Lock()
+        self._session: Optional[requests.Session] = None
+
+    @property
+    def session(self) -> requests.Session:
+        """커넥션 풀을 가진 세션 (처음 사용할 때 생성)"""
+        with self._lock:
+            if self._session is None:
+                session = requests.Session()
+                # pool_block=True: 호스트당 pool_maxsize 이상 연결을 열지 않고 대기
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self._pool_maxsize,
+                                      pool_block=True, max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+            return self._session
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """재시도 대기 시간 (Retry-After가 있으면 우선, 없으면 full jitter 지수 백오프)"""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def get(self, url: str, params: Optional[Dict[str, Any]] = None,
+            timeout: Optional[Union[float, Tuple[float, float]]] = None, **kwargs) -> requests.Response:
+        """재시도를 포함한 GET 요청 (최종 응답이 오류면 HTTPError 발생)"""
+        host = urlsplit(url).netloc
+        with metrics.span('provider_http_request', host=host):
+            attempt = 0
+            while True:
+                try:
+                    response = self.session.get(url, params=params, timeout=timeout or self.timeout, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt >= self.max_retries:
+                        raise
+                    metrics.inc('provider_http_retries_total', host=host)
+                    self._sleep(self.backoff_delay(attempt))
+                    attempt += 1
+                    continue
+
+                if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                    retry_after = parse_retry_after(response.headers.get('Retry-After'))
+                    response.close()
+                    metrics.inc('provider_http_retries_total', host=host)
+                    self._sleep(self.backoff_delay(attempt, retry_after))
+                    attempt += 1
+                    continue
+
+                response.raise_for_status()
+                return response
+
+    def get_json(self, url: str, params: Optional[Dict[str, Any]] = None, **kwargs) -> Any:
+        """GET 요청 후 JSON 본문 반환"""
+        return self.get(url, params=params, **kwargs).json()
+
+    def close(self):
+        """커넥션 풀 정리"""
+        with self._lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+
+# 프로세스 전역 프로바이더 클라이언트 (모든 세션이 커넥션 풀을 공유)
+provider_client = ProviderHTTPClient(
+    pool_maxsize=int(os.getenv('PROVIDER_POOL_SIZE', '10')),
+    max_retries=int(os.getenv('PROVIDER_MAX_RETRIES', '3')),
+)
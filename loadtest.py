@@ -0,0 +1,270 @@
+"""로컬 가짜 서버(NewsAPI/Guardian/OpenAI/SMTP)를 상대로 한 부하 테스트
+
+앱 함수를 지정한 동시성으로 반복 호출하여 초당 처리량과 지연 시간 백분위를 측정하고,
+기준값 파일과 비교해 성능 저하를 알려준다 (저하가 있으면 종료 코드 1).
+
+    $ python loadtest.py                                   # 모든 시나리오, 기준값과 비교
+    $ python loadtest.py search chat --concurrency 16 --requests 400
+    $ python loadtest.py --latency 0.05 --error-rate 0.05  # 지연/오류 주입
+    $ python loadtest.py chat email --http                 # 백엔드 API(uvicorn)를 거쳐 측정
+    $ python loadtest.py --save-baseline                   # 현재 결과를 기준값으로 저장
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, List
+
+from bench import percentile
+from stub_servers import fake_newsapi_articles, run_stub_server, run_stub_smtp_server
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'loadtest_baseline.json')
+SCENARIOS = ['search', 'fanout', 'chat', 'chat-stream', 'email', 'session']
+
+
+def run_load(call: Callable[[int], bool], requests: int, concurrency: int) -> Dict[str, Any]:
+    """call(i)을 requests번, 최대 concurrency개씩 동시에 실행 (call은 성공 여부 반환, 예외는 실패)"""
+    counter = itertools.count()
+    samples: List[float] = []
+    errors = 0
+    lock = threading.Lock()
+
+    def worker():
+        nonlocal errors
+        while True:
+            i = next(counter)
+            if i >= requests:
+                return
+            start = time.perf_counter()
+            try:
+                ok = call(i)
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                samples.append(elapsed)
+                errors += not ok
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - start
+    return {
+        'requests': len(samples),
+        'errors': errors,
+        'rps': len(samples) / wall if wall else 0.0,
+        'p50_ms': percentile(samples, 50) * 1000,
+        'p95_ms': percentile(samples, 95) * 1000,
+        'p99_ms': percentile(samples, 99) * 1000,
+    }
+
+
+@contextmanager
+def run_backend_server():
+    """백엔드 API를 이 프로세스의 스레드에서 uvicorn으로 실행 (가짜 서버 설정과 캐시를 공유)"""
+    import socket
+
+    import uvicorn
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config('backend_api:app', host='127.0.0.1', port=port, log_level='warning'))
+    thread = threading.Thread(target=server.run, name='backend-api', daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    try:
+        yield f'http://127.0.0.1:{port}'
+    finally:
+        server.should_exit = True
+        thread.join()
+
+
+def build_scenarios(args, api_server, backend) -> Dict[str, Callable[[int], bool]]:
+    """시나리오 이름 -> 요청 하나를 실행하는 함수 (가짜 서버 주소를 설정한 뒤 앱 모듈을 불러옴)"""
+    import news_providers
+    import news_service
+    from session_store import session_store
+
+    news_providers.NEWSAPI_BASE_URL = api_server.base_url
+    news_providers.GUARDIAN_BASE_URL = api_server.base_url
+    api_keys = {'newsapi': 'stub', 'guardian': 'stub'}
+    articles = fake_newsapi_articles('인공지능', 10)
+    keyword_pool = max(1, args.keywords)
+
+    def keyword(i: int) -> str:
+        # keywords개 키워드를 돌려 쓰므로 1이면 대부분 캐시 히트, 요청 수 이상이면 모두 업스트림 호출
+        return f'부하 테스트 {i % keyword_pool}'
+
+    # 채팅 요청마다 기사 묶음이 다른 세션을 미리 만들어 답변 캐시를 거치지 않고 LLM까지 호출
+    for prefix in ('chat', 'chat-stream'):
+        for i in range(args.requests):
+            state = news_service.new_session()
+            news_service.apply_search(state, f'{prefix} {i}', fake_newsapi_articles(f'{prefix} {i}', 10), {})
+            session_store.put(f'loadtest-{prefix}-{i}', state)
+
+    def search(i: int) -> bool:
+        return bool(news_providers.search_provider('newsapi', keyword(i), 'stub'))
+
+    def fanout(i: int) -> bool:
+        results, errors = news_providers.fan_out_search(keyword(i), api_keys)
+        return bool(results) and not errors
+
+    def chat(i: int) -> bool:
+        turn_stats: Dict[str, Any] = {}
+        backend.chat(f'loadtest-chat-{i}', f'질문 {i}', 'stub', turn_stats)
+        return not turn_stats.get('error')
+
+    def chat_stream(i: int) -> bool:
+        turn_stats: Dict[str, Any] = {}
+        for _ in backend.stream_chat(f'loadtest-chat-stream-{i}', f'질문 {i}', 'stub', turn_stats):
+            pass
+        return not turn_stats.get('error')
+
+    def email(i: int) -> bool:
+        job_id = backend.queue_digest(articles, '인공지능', [f'user{i}@example.com'], 'sender@example.com', '')
+        job = backend.wait_job(job_id)
+        return job is not None and job['status'] == 'done'
+
+    app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'streamlit_app.py')
+
+    def session(i: int) -> bool:
+        """AppTest로 세션 하나를 처음부터 실행 (페이지 로드 -> 검색 -> 질문 한 번)"""
+        from streamlit.testing.v1 import AppTest
+
+        at = AppTest.from_file(app_path, default_timeout=60)
+        at.secrets['OPENAI_API_KEY'] = 'stub'
+        at.secrets['NEWS_API_KEY'] = 'stub'
+        at.run()
+        next(t for t in at.sidebar.text_input if t.label.startswith('관심')).input(keyword(i))
+        at.sidebar.button[0].click().run()
+        at.chat_input[0].set_value('요약해줘').run()
+        return not at.exception and not at.session_state.turn_stats[-1].get('error')
+
+    return {'search': search, 'fanout': fanout, 'chat': chat, 'chat-stream': chat_stream,
+            'email': email, 'session': session}
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Dict[str, Any]], tolerance: float) -> List[str]:
+    """기준값 대비 p95가 tolerance 이상 늘거나 처리량이 tolerance 이상 줄어든 시나리오"""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        if result['p95_ms'] > base['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{name}: p95 {base['p95_ms']:.1f}ms -> {result['p95_ms']:.1f}ms")
+        if result['rps'] < base['rps'] * (1 - tolerance):
+            regressions.append(f"{name}: {base['rps']:.1f} req/s -> {result['rps']:.1f} req/s")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('scenarios', nargs='*', metavar='scenario',
+                        help=f"실행할 시나리오 ({', '.join(SCENARIOS)}, 기본: session을 뺀 전부)")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=200,
+                        help='시나리오별 요청 수 (session은 1/10, 동시성 1로 실행)')
+    parser.add_argument('--keywords', type=int, default=20, help='검색에 돌려 쓰는 키워드 수')
+    parser.add_argument('--latency', type=float, default=0.02, help='HTTP 가짜 서버 응답 지연 (초)')
+    parser.add_argument('--connect-latency', type=float, default=0.0, help='새 연결마다 추가 지연 (초)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='HTTP 가짜 서버 503 비율')
+    parser.add_argument('--chunk-latency', type=float, default=0.005, help='OpenAI 토큰 간격 (초)')
+    parser.add_argument('--tokens', type=int, default=20, help='OpenAI 답변 토큰 수')
+    parser.add_argument('--smtp-latency', type=float, default=0.01, help='SMTP 메시지당 지연 (초)')
+    parser.add_argument('--smtp-error-rate', type=float, default=0.0, help='SMTP 451 응답 비율')
+    parser.add_argument('--http', action='store_true', help='인프로세스 백엔드 대신 백엔드 API를 HTTP로 호출')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='기준값 파일')
+    parser.add_argument('--save-baseline', action='store_true', help='결과를 기준값 파일에 저장')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='허용하는 성능 저하 비율')
+    args = parser.parse_args()
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"알 수 없는 시나리오: {', '.join(sorted(unknown))}")
+    names = args.scenarios or [name for name in SCENARIOS if name != 'session']
+    # 기준값은 같은 부하 조건에서만 비교
+    params = {k: v for k, v in vars(args).items()
+              if k not in ('scenarios', 'baseline', 'save_baseline', 'tolerance')}
+
+    # 앱 모듈을 불러오기 전에 설정 (기사 저장소는 임시 파일, 재시도 대기는 짧게)
+    workdir = tempfile.mkdtemp(prefix='news-loadtest-')
+    os.environ['ARTICLE_DB_PATH'] = os.path.join(workdir, 'articles.db')
+    os.environ['SMTP_USE_TLS'] = '0'
+    os.environ.setdefault('OPENAI_API_KEY', 'stub')
+    # 모든 요청이 같은 가짜 API 키를 쓰므로 키별 요청 한도는 끔 (처리량 측정 대상이 아님)
+    os.environ.setdefault('RATE_LIMITS', '')
+
+    with ExitStack() as stack:
+        api_server = stack.enter_context(run_stub_server(
+            latency=args.latency, connect_latency=args.connect_latency, error_rate=args.error_rate,
+            chunk_latency=args.chunk_latency, reply_tokens=args.tokens))
+        smtp_server = stack.enter_context(run_stub_smtp_server(latency=args.smtp_latency,
+                                                               error_rate=args.smtp_error_rate))
+        os.environ['OPENAI_BASE_URL'] = f'{api_server.base_url}/v1'
+        # 메일은 서버 설정의 SMTP 서버로만 보내므로 가짜 SMTP 서버를 설정으로 지정
+        os.environ['SMTP_SERVER'] = smtp_server.host
+        os.environ['SMTP_PORT'] = str(smtp_server.port)
+        if args.http:
+            from backend_client import BackendClient
+
+            backend = BackendClient(stack.enter_context(run_backend_server()), pool_maxsize=args.concurrency)
+        else:
+            from local_backend import LocalBackend
+
+            backend = LocalBackend()
+        scenarios = build_scenarios(args, api_server, backend)
+        from news_cache import search_cache
+
+        results = {}
+        for name in names:
+            requests, concurrency = args.requests, args.concurrency
+            if name == 'session':
+                # AppTest는 스크립트를 같은 프로세스에서 컴파일/실행하므로 스레드 간에 안전하지 않음
+                requests, concurrency = max(1, args.requests // 10), 1
+            # 시나리오마다 빈 검색 캐시에서 시작 (기사 저장소는 유지)
+            search_cache.invalidate()
+            result = run_load(scenarios[name], requests, concurrency)
+            results[name] = result
+            print(f"{name:<12} n={result['requests']:<5} errors={result['errors']:<4} "
+                  f"{result['rps']:8.1f} req/s  p50={result['p50_ms']:8.2f}ms "
+                  f"p95={result['p95_ms']:8.2f}ms p99={result['p99_ms']:8.2f}ms", flush=True)
+
+    baseline = {'params': params, 'results': {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    if args.save_baseline:
+        if baseline['params'] != params:
+            baseline = {'params': params, 'results': {}}
+        baseline['results'].update(results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write('\n')
+        print(f'기준값 저장: {args.baseline}')
+        return
+
+    if not baseline['results']:
+        return
+    if baseline['params'] != params:
+        print('기준값과 부하 조건이 달라 비교하지 않습니다 (--save-baseline으로 새 기준값 저장)')
+        return
+    regressions = compare(results, baseline['results'], args.tolerance)
+    for line in regressions:
+        print(f'⚠️  성능 저하 {line}')
+    if regressions:
+        sys.exit(1)
+    print('기준값 대비 성능 저하 없음')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+from typing import Any, Dict, Iterator, List, Optional
+
+import news_service
+from session_store import session_store
+from thumbnails import get_thumbnails
+
+
+class LocalBackend:
+    """BACKEND_URL이 없을 때 쓰는 인프로세스 백엔드 (백엔드 API와 같은 인터페이스/동작)"""
+
+    def __init__(self, store=session_store):
+        self._store = store
+
+    def get_session(self, session_id: str) -> Dict[str, Any]:
+        """세션 상태 (없으면 빈 세션)"""
+        return self._store.get(session_id) or news_service.new_session()
+
+    def search(self, session_id: str, keyword: str, api_keys: Dict[str, str],
+               search_all: bool = False) -> Dict[str, Any]:
+        """뉴스 검색 후 세션을 검색 결과로 갱신하여 반환"""
+        articles, errors = news_service.search_news(keyword, api_keys, search_all)
+        state = news_service.apply_search(self.get_session(session_id), keyword, articles, errors)
+        self._store.put(session_id, state)
+        return state
+
+    def summarize(self, session_id: str, openai_key: str) -> Optional[Dict[str, Any]]:
+        """세션 기사 묶음의 일괄 요약 (기사별 요약 + 전체 브리핑, 만들 수 없으면 None)"""
+        state = self.get_session(session_id)
+        had_summary = state.get('summary') is not None
+        summary = news_service.summarize_session(state, openai_key)
+        if summary is not None and not had_summary:
+            self._store.put(session_id, state)
+        return summary
+
+    def reset_messages(self, session_id: str) -> Dict[str, Any]:
+        """대화 기록 초기화 (검색 결과는 유지)"""
+        state = self.get_session(session_id)
+        state.update(messages=[], turn_stats=[])
+        self._store.put(session_id, state)
+        return state
+
+    def chat(self, session_id: str, question: str, openai_key: str,
+             turn_stats: Optional[Dict[str, Any]] = None) -> str:
+        """질문 하나에 대한 답변 (대화 기록은 세션에 저장)"""
+        state = self.get_session(session_id)
+        answer = news_service.answer_turn(state, question, openai_key, turn_stats)
+        self._store.put(session_id, state)
+        return answer
+
+    def stream_chat(self, session_id: str, question: str, openai_key: str,
+                    turn_stats: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+        """답변을 토큰 단위로 반환 (끝까지 읽으면 대화 기록을 세션에 저장)"""
+        state = self.get_session(session_id)
+        yield from news_service.stream_turn(state, question, openai_key, turn_stats)
+        self._store.put(session_id, state)
+
+    def queue_digest(self, articles: List[Dict[str, Any]], keyword: str, recipients: List[str],
+                     sender_email: str, sender_password: str, summary: Optional[Dict[str, Any]] = None) -> str:
+        """뉴스 요약 이메일을 발송 큐에 넣고 job id 반환 (SMTP 서버는 서버 설정)"""
+        return news_service.queue_digest(articles, keyword, recipients, sender_email, sender_password, summary)
+
+    def get_thumbnails(self, urls: List[Optional[str]]) -> Dict[Optional[str], bytes]:
+        """이미지 URL별 썸네일 (오래 걸리는 이미지는 자리표시 이미지, 다운로드는 계속)"""
+        return get_thumbnails(urls)
+
+    def job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """이메일 발송 작업 상태"""
+        return news_service.job_status(job_id)
+
+    def wait_job(self, job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """이메일 발송 작업이 끝날 때까지 대기 후 상태 반환"""
+        return news_service.wait_job(job_id, timeout)
@@ -0,0 +1,238 @@
+import bisect
+import functools
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# METRICS_ENABLED=1이면 측정 (꺼져 있으면 span/inc/observe는 속성 확인 한 번만 하고 돌아감)
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '0') == '1'
+# Prometheus 텍스트 형식을 제공할 로컬 포트 (0이면 서버를 띄우지 않음)
+METRICS_PORT = int(os.getenv('METRICS_PORT', '9464'))
+# 사이드바 개발자 패널 표시 여부
+METRICS_DEV_PANEL = os.getenv('METRICS_DEV_PANEL', '0') == '1'
+
+# 지연 시간 히스토그램 버킷 (초)
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# 백분위 계산에 쓰는 최근 표본 수
+RECENT_SAMPLES = 1024
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + '}'
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Histogram:
+    """누적 버킷(Prometheus 내보내기용)과 최근 표본(p50/p95/p99 표시용)을 함께 보관"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.recent: "deque[float]" = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+        self.recent.append(value)
+
+    def percentiles(self) -> Dict[str, float]:
+        ordered = sorted(self.recent)
+        return {'p50': _percentile(ordered, 50), 'p95': _percentile(ordered, 95), 'p99': _percentile(ordered, 99)}
+
+
+class _Span:
+    """with 블록 소요 시간을 {name}_seconds 히스토그램에 기록 (예외가 나면 {name}_errors_total 증가)"""
+
+    __slots__ = ('_registry', '_name', '_labels', '_start')
+
+    def __init__(self, registry: 'MetricsRegistry', name: str, labels: Dict[str, Any]):
+        self._registry = registry
+        self._name = name
+        self._labels = labels
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._registry.observe(f'{self._name}_seconds', time.perf_counter() - self._start, **self._labels)
+        if exc_type is not None:
+            self._registry.inc(f'{self._name}_errors_total', **self._labels)
+        return False
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class MetricsRegistry:
+    """프로세스 전역 카운터/히스토그램 모음과 Prometheus 텍스트 출력"""
+
+    def __init__(self, enabled: bool = METRICS_ENABLED):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[LabelKey, float]] = {}
+        self._histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        # 이름 -> 호출 시점의 값 dict를 반환하는 함수 (캐시 통계 등 이미 집계된 값)
+        self._collectors: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any):
+        """카운터 증가"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def observe(self, name: str, seconds: float, **labels: Any):
+        """지연 시간 표본 기록"""
+        if not self.enabled:
+            return
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(seconds)
+
+    def span(self, name: str, **labels: Any):
+        """with metrics.span('name'): ... 형태로 블록 소요 시간 측정 (name_seconds 히스토그램)"""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return _Span(self, name, labels)
+
+    def timed(self, name: str, **labels: Any):
+        """함수 소요 시간을 측정하는 데코레이터 (비활성 상태면 바로 원래 함수 호출)"""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                with _Span(self, name, labels):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def register_collector(self, prefix: str, collect: Callable[[], Dict[str, Any]]):
+        """출력할 때마다 collect()의 숫자 값을 {prefix}_{key} 게이지로 내보냄"""
+        self._collectors[prefix] = collect
+
+    def snapshot(self) -> Dict[str, Any]:
+        """개발자 패널용 요약 (히스토그램 백분위, 카운터, 수집기 값)"""
+        with self._lock:
+            histograms = [
+                dict(name=name, labels=dict(key), count=h.count, **h.percentiles())
+                for name, series in sorted(self._histograms.items())
+                for key, h in series.items()
+            ]
+            counters = [
+                {'name': name, 'labels': dict(key), 'value': value}
+                for name, series in sorted(self._counters.items())
+                for key, value in series.items()
+            ]
+        collected = {prefix: collect() for prefix, collect in self._collectors.items()}
+        return {'histograms': histograms, 'counters': counters, 'collected': collected}
+
+    def render_prometheus(self) -> str:
+        """Prometheus 텍스트 형식 (version 0.0.4)"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f'# TYPE {name} counter')
+                for key, value in series.items():
+                    lines.append(f'{name}{_format_labels(key)} {value:g}')
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f'# TYPE {name} histogram')
+                for key, h in series.items():
+                    cumulative = 0
+                    for bound, count in zip(h.buckets, h.counts):
+                        cumulative += count
+                        lines.append(f'{name}_bucket{_format_labels(key, ("le", f"{bound:g}"))} {cumulative}')
+                    lines.append(f'{name}_bucket{_format_labels(key, ("le", "+Inf"))} {h.count}')
+                    lines.append(f'{name}_sum{_format_labels(key)} {h.sum:.6f}')
+                    lines.append(f'{name}_count{_format_labels(key)} {h.count}')
+        for prefix, collect in sorted(self._collectors.items()):
+            for key, value in sorted(collect().items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    lines.append(f'# TYPE {prefix}_{key} gauge')
+                    lines.append(f'{prefix}_{key} {value:g}')
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# 프로세스 전역 지표 레지스트리
+metrics = MetricsRegistry()
+
+
+class MetricsHandler(BaseHTTPRequestHandler):
+    """GET /metrics 에 Prometheus 텍스트 응답"""
+
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = metrics.render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server_lock = threading.Lock()
+_server_started = False
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server(port: int = METRICS_PORT, host: str = '127.0.0.1') -> Optional[ThreadingHTTPServer]:
+    """프로세스당 한 번 /metrics 서버를 데몬 스레드로 시작 (포트가 사용 중이면 None)"""
+    global _server, _server_started
+    with _server_lock:
+        if not _server_started and port:
+            _server_started = True
+            try:
+                _server = ThreadingHTTPServer((host, port), MetricsHandler)
+            except OSError:
+                return None
+            _server.daemon_threads = True
+            threading.Thread(target=_server.serve_forever, name='metrics-server', daemon=True).start()
+        return _server
@@ -0,0 +1,155 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from metrics import metrics
+
+
+def make_key(provider: str, keyword: str, **params: Any) -> Tuple[Hashable, ...]:
+    """프로바이더/키워드/파라미터로 정규화된 캐시 키 생성"""
+    normalized_keyword = " ".join(keyword.split()).casefold()
+    return (provider, normalized_keyword, tuple(sorted(params.items())))
+
+
+class _InFlight:
+    """진행 중인 조회 하나를 여러 호출자가 기다릴 수 있도록 보관"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """TTL + LRU 캐시 (동일 요청 병합, 만료 직후에는 이전 값을 주면서 백그라운드 갱신)
+
+    - ttl 이내: 캐시 값 반환
+    - ttl ~ ttl + stale_ttl: 이전 값을 즉시 반환하고 백그라운드에서 한 번만 갱신
+    - 그 이후: 새로 조회 (같은 키의 동시 요청은 하나의 조회로 합침)
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0, stale_ttl: float = 600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._in_flight: Dict[Hashable, _InFlight] = {}
+        self._stats = {
+            'hits': 0,
+            'stale_hits': 0,
+            'misses': 0,
+            'coalesced': 0,
+            'evictions': 0,
+            'refresh_errors': 0,
+        }
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """캐시에서 값을 찾고, 없으면 loader로 조회하여 저장"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = self._clock() - stored_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['hits'] += 1
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._stats['stale_hits'] += 1
+                    if key not in self._in_flight:
+                        self._in_flight[key] = _InFlight()
+                        threading.Thread(
+                            target=self._load, args=(key, loader), daemon=True
+                        ).start()
+                    return value
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is not None:
+                self._stats['coalesced'] += 1
+                leader = False
+            else:
+                self._stats['misses'] += 1
+                in_flight = self._in_flight[key] = _InFlight()
+                leader = True
+
+        if leader:
+            self._load(key, loader)
+        else:
+            in_flight.event.wait()
+
+        if in_flight.error is not None:
+            raise in_flight.error
+        return in_flight.value
+
+    def _load(self, key: Hashable, loader: Callable[[], Any]):
+        """loader를 실행하고 결과를 저장한 뒤 대기 중인 호출자를 깨움"""
+        with self._lock:
+            in_flight = self._in_flight[key]
+        try:
+            value = loader()
+        except BaseException as e:
+            in_flight.error = e
+            with self._lock:
+                # 갱신 실패 시 이전 값은 그대로 둔다
+                if key in self._entries:
+                    self._stats['refresh_errors'] += 1
+                del self._in_flight[key]
+        else:
+            in_flight.value = value
+            with self._lock:
+                self._set(key, value)
+                del self._in_flight[key]
+        finally:
+            in_flight.event.set()
+
+    def _set(self, key: Hashable, value: Any):
+        """값 저장 (lock 보유 상태에서 호출), 용량 초과 시 LRU 제거"""
+        self._entries[key] = (value, self._clock())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """통계/LRU 순서에 영향 없이 저장된 값 조회 (만료 여부 무관, 없으면 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry[0] if entry is not None else None
+
+    def put(self, key: Hashable, value: Any):
+        """값을 직접 저장 (백그라운드 작업이 캐시를 미리 채울 때 사용)"""
+        with self._lock:
+            self._set(key, value)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """특정 키 또는 전체 캐시 삭제"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """히트/미스/제거 카운터와 현재 크기"""
+        with self._lock:
+            stats = dict(self._stats)
+            stats['size'] = len(self._entries)
+            stats['maxsize'] = self.maxsize
+        lookups = stats['hits'] + stats['stale_hits'] + stats['misses'] + stats['coalesced']
+        stats['hit_ratio'] = (stats['hits'] + stats['stale_hits']) / lookups if lookups else 0.0
+        return stats
+
+
+# 프로세스 전역 뉴스 검색 캐시 (모든 세션이 공유)
+search_cache = TTLCache(
+    maxsize=int(os.getenv('NEWS_CACHE_SIZE', '256')),
+    ttl=float(os.getenv('NEWS_CACHE_TTL', '300')),
+    stale_ttl=float(os.getenv('NEWS_CACHE_STALE_TTL', '600')),
+)
+metrics.register_collector('news_cache', search_cache.stats)
@@ -0,0 +1,255 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from article_store import ARTICLE_STORE_FRESHNESS, article_store
+from article_utils import canonical_url, normalize_title, published_timestamp
+from http_client import provider_client
+from news_cache import make_key, search_cache
+from rate_limit import INTERACTIVE, SingleFlight, rate_limiter
+
+# 뉴스 API 주소 (로컬 테스트 서버로 바꿀 수 있음)
+NEWSAPI_BASE_URL = os.getenv('NEWSAPI_BASE_URL', 'https://newsapi.org')
+GUARDIAN_BASE_URL = os.getenv('GUARDIAN_BASE_URL', 'https://content.guardianapis.com')
+
+# 프로바이더별 요청 기사 수 (NewsAPI 최대 100, Guardian 최대 50)
+NEWS_PAGE_SIZE = int(os.getenv('NEWS_PAGE_SIZE', '10'))
+
+# 동시 검색 기본 마감 시간 (초)
+DEFAULT_DEADLINE = float(os.getenv('NEWS_FANOUT_DEADLINE', '3'))
+
+# 제목 단어 집합의 자카드 유사도가 이 값 이상이면 같은 기사로 간주
+TITLE_SIMILARITY = 0.8
+
+# 이름 -> {'fetch': (keyword, api_key, since=None) -> articles, 'language': ...}
+PROVIDERS: Dict[str, Dict[str, Any]] = {}
+
+# 마감 시간이 지나도 남은 조회는 계속 실행되어 캐시를 채운다
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='news-fanout')
+
+
+def register_provider(name: str, fetch: Callable[..., List[Dict[str, Any]]],
+                      language: Optional[str] = None):
+    """뉴스 프로바이더 등록
+
+    fetch(keyword, api_key, since=None)는 공통 기사 dict 목록을 반환하고 오류는 예외로 전달한다.
+    since(ISO 8601)가 주어지면 그 이후 기사만 요청한다.
+    """
+    PROVIDERS[name] = {'fetch': fetch, 'language': language}
+
+
+def fetch_newsapi(keyword: str, api_key: str, since: Optional[str] = None, language: str = 'ko') -> List[Dict[str, Any]]:
+    """NewsAPI 호출 (오류는 호출자에게 전달)"""
+    url = f"{NEWSAPI_BASE_URL}/v2/everything"
+    params = {
+        'q': keyword,
+        'language': language,
+        'sortBy': 'publishedAt',
+        'pageSize': min(NEWS_PAGE_SIZE, 100),
+        'apiKey': api_key
+    }
+    if since:
+        params['from'] = since
+
+    data = provider_client.get_json(url, params=params)
+    return data.get('articles', [])
+
+
+def fetch_guardian(keyword: str, api_key: str, since: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Guardian API 호출 (오류는 호출자에게 전달)"""
+    url = f"{GUARDIAN_BASE_URL}/search"
+    params = {
+        'q': keyword,
+        'page-size': min(NEWS_PAGE_SIZE, 50),
+        'show-fields': 'thumbnail,trailText,headline',
+        'api-key': api_key
+    }
+    if since:
+        # Guardian은 날짜 단위로만 거를 수 있으므로 최신순으로 받아 호출자가 다시 거른다
+        params['from-date'] = since[:10]
+        params['order-by'] = 'newest'
+
+    data = provider_client.get_json(url, params=params)
+    articles = []
+
+    for item in data.get('response', {}).get('results', []):
+        article = {
+            'title': item.get('webTitle', ''),
+            'description': item.get('fields', {}).get('trailText', ''),
+            'url': item.get('webUrl', ''),
+            'urlToImage': item.get('fields', {}).get('thumbnail', ''),
+            'source': {'name': 'The Guardian'},
+            'publishedAt': item.get('webPublicationDate', '')
+        }
+        articles.append(article)
+
+    return articles
+
+
+register_provider('newsapi', fetch_newsapi, language='ko')
+register_provider('guardian', fetch_guardian, language='en')
+
+
+def mock_articles(keyword: str) -> List[Dict[str, Any]]:
+    """API 키가 없을 때 사용할 모의 뉴스 데이터"""
+    templates = [
+        {
+            'title': f'{keyword} 관련 최신 뉴스 1',
+            'description': f'{keyword}에 대한 중요한 소식이 전해졌습니다. 관련 업계에서는 이번 발표가 향후 시장에 큰 영향을 미칠 것으로 예상한다고 밝혔습니다.',
+            'url': 'https://example.com/news1',
+            'urlToImage': 'https://via.placeholder.com/300x200?text=News+1',
+            'source': {'name': '뉴스 소스 1'},
+            'publishedAt': '2024-01-15T10:00:00Z'
+        },
+        {
+            'title': f'{keyword} 관련 최신 뉴스 2',
+            'description': f'{keyword} 분야의 새로운 동향이 발표되었습니다. 전문가들은 이러한 변화가 긍정적인 결과를 가져올 것이라고 전망하고 있습니다.',
+            'url': 'https://example.com/news2',
+            'urlToImage': 'https://via.placeholder.com/300x200?text=News+2',
+            'source': {'name': '뉴스 소스 2'},
+            'publishedAt': '2024-01-15T09:30:00Z'
+        },
+        {
+            'title': f'{keyword} 관련 최신 뉴스 3',
+            'description': f'{keyword}와 관련된 정책 변화가 논의되고 있습니다. 이번 변화는 많은 사람들에게 직접적인 영향을 미칠 것으로 예상됩니다.',
+            'url': 'https://example.com/news3',
+            'urlToImage': 'https://via.placeholder.com/300x200?text=News+3',
+            'source': {'name': '뉴스 소스 3'},
+            'publishedAt': '2024-01-15T09:00:00Z'
+        }
+    ]
+    
+    # 키워드에 따라 10개까지 확장
+    extended_articles = []
+    for i in range(10):
+        article = templates[i % len(templates)].copy()
+        article['title'] = f'{keyword} 관련 최신 뉴스 {i+1}'
+        article['description'] = f'{keyword}에 대한 뉴스 {i+1}번입니다. ' + article['description'][:80] + '...'
+        article['urlToImage'] = f'https://via.placeholder.com/300x200?text=News+{i+1}'
+        extended_articles.append(article)
+    
+    return extended_articles
+
+
+def provider_cache_key(name: str, keyword: str):
+    """프로바이더 검색 결과의 캐시 키"""
+    return make_key(name, keyword, language=PROVIDERS[name]['language'])
+
+
+def search_provider(name: str, keyword: str, api_key: str) -> List[Dict[str, Any]]:
+    """등록된 프로바이더 하나를 프로세스 전역 캐시를 거쳐 검색"""
+    key = provider_cache_key(name, keyword)
+    articles = search_cache.get_or_load(key, lambda: load_from_store(name, keyword, api_key))
+    return list(articles)
+
+
+def load_from_store(name: str, keyword: str, api_key: str) -> List[Dict[str, Any]]:
+    """로컬 기사 저장소 우선 조회
+
+    최근 ARTICLE_STORE_FRESHNESS초 안에 검색한 키워드는 저장소에서 바로 응답하고, 그보다
+    오래됐으면 저장된 가장 최근 기사 이후 부분만 업스트림에서 받아 채운다.
+    """
+    fetched_at = article_store.last_fetched(name, keyword)
+    if fetched_at is None or time.time() - fetched_at >= ARTICLE_STORE_FRESHNESS:
+        since = article_store.newest_published(name, keyword) if fetched_at is not None else None
+        fetch_new_articles(name, keyword, api_key, since)
+    return article_store.keyword_articles(name, keyword, limit=NEWS_PAGE_SIZE)
+
+
+# 프로세스 전역 업스트림 조회 합치기 (검색 캐시를 거치지 않는 감시 워커 조회와 사용자 검색이 겹칠 때)
+fetch_flight = SingleFlight('provider_fetch')
+
+
+def fetch_new_articles(name: str, keyword: str, api_key: str, since: Optional[str],
+                       priority: str = INTERACTIVE) -> List[Dict[str, Any]]:
+    """since 이후 발행된 기사만 조회하여 기사 저장소에 기록 (since가 없으면 전체 조회)
+
+    API 키별 요청 한도(rate_limiter)를 지키고, 같은 키/키워드/since/우선순위로 진행 중인 조회가
+    있으면 새로 요청하지 않고 그 결과를 함께 받는다 (대화형 요청이 백그라운드 요청의 대기 줄에
+    묶이지 않도록 우선순위가 다르면 합치지 않음).
+    """
+    def fetch() -> List[Dict[str, Any]]:
+        rate_limiter.acquire(name, api_key, priority)
+        articles = PROVIDERS[name]['fetch'](keyword, api_key, since=since)
+        if since:
+            watermark = published_timestamp({'publishedAt': since})
+            articles = [a for a in articles if published_timestamp(a) > watermark]
+        article_store.record_search(name, keyword, articles)
+        return articles
+
+    return fetch_flight.do((name, keyword, api_key, since, priority), fetch)
+
+
+def warm_cache(name: str, keyword: str, new_articles: List[Dict[str, Any]], complete: bool = False):
+    """새로 받은 기사를 검색 캐시에 반영
+
+    complete=True면 new_articles가 전체 검색 결과이므로 그대로 저장하고, 아니면 이미 캐시된
+    결과가 있을 때만 앞쪽에 합친다 (일부 기사만으로 캐시를 채우지 않도록).
+    """
+    key = provider_cache_key(name, keyword)
+    if complete:
+        search_cache.put(key, new_articles)
+        return
+    cached = search_cache.peek(key)
+    if cached is not None and new_articles:
+        search_cache.put(key, merge_articles([new_articles, cached])[:max(len(cached), NEWS_PAGE_SIZE)])
+
+
+def _similar_titles(a: frozenset, b: frozenset) -> bool:
+    """정규화된 두 제목(단어 집합)이 거의 같은지 판정 (숫자가 다르면 다른 기사)"""
+    if a == b:
+        return True
+    if {t for t in a if t.isdigit()} != {t for t in b if t.isdigit()}:
+        return False
+    return len(a & b) / len(a | b) >= TITLE_SIMILARITY
+
+
+def merge_articles(article_lists: Iterable[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """여러 프로바이더 결과를 합쳐 URL/유사 제목 중복을 제거하고 최신순 정렬"""
+    merged = []
+    seen_urls = set()
+    seen_titles: List[frozenset] = []
+    for articles in article_lists:
+        for article in articles:
+            url_key = canonical_url(article.get('url', ''))
+            if url_key and url_key in seen_urls:
+                continue
+            title_key = frozenset(normalize_title(article).split())
+            if title_key and any(_similar_titles(title_key, seen) for seen in seen_titles):
+                continue
+            if url_key:
+                seen_urls.add(url_key)
+            if title_key:
+                seen_titles.append(title_key)
+            merged.append(article)
+    merged.sort(key=published_timestamp, reverse=True)
+    return merged
+
+
+def fan_out_search(keyword: str, api_keys: Dict[str, str], deadline: float = DEFAULT_DEADLINE,
+                   providers: Optional[Iterable[str]] = None) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """API 키가 있는 프로바이더를 동시에 검색하여 마감 시간 안에 도착한 결과만 병합
+
+    (기사 목록, {프로바이더: 오류 메시지}) 반환
+    """
+    names = [name for name in (providers or PROVIDERS) if api_keys.get(name)]
+    futures = {
+        _executor.submit(search_provider, name, keyword, api_keys[name]): name
+        for name in names
+    }
+    done, not_done = wait(futures, timeout=deadline)
+
+    results = {}
+    errors = {}
+    for future in done:
+        name = futures[future]
+        try:
+            results[name] = future.result()
+        except Exception as e:
+            errors[name] = str(e)
+    for future in not_done:
+        errors[futures[future]] = f'{deadline:g}초 안에 응답하지 않았습니다.'
+
+    # 등록 순서대로 병합해 중복 시 앞선 프로바이더의 기사를 유지
+    return merge_articles(results[name] for name in names if name in results), errors
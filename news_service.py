@@ -0,0 +1,364 @@
+"""검색/채팅/다이제스트 처리 (API 서버와 인프로세스 백엔드가 함께 사용)
+
+세션 상태는 JSON으로 직렬화할 수 있는 dict이며 session_store에 보관한다. 여기 함수들은
+상태 dict만 다루므로 어느 프로세스에서 실행해도 결과가 같다.
+"""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+
+from answer_cache import answer_cache, article_list_key, article_set_key
+from article_index import ArticleIndex
+from article_summary import ARTICLE_SUMMARY_ENABLED, get_summary
+from chat_context import NEWS_CONTEXT_TOKENS, build_chat_messages, build_news_context, count_tokens
+from digest import build_digest_message, prepare_digest
+from email_queue import SMTP_PORT, SMTP_SERVER, email_queue
+from metrics import metrics
+from news_providers import fan_out_search, mock_articles, search_provider
+from openai_clients import get_async_openai_client, get_openai_client
+from rate_limit import SingleFlight, rate_limiter
+
+# OpenAI chat.completions 호출 인자 (stream 제외)
+CHAT_COMPLETION_PARAMS = {
+    'model': 'gpt-4o-mini',
+    'max_tokens': 1000,
+    'temperature': 0.7,
+}
+
+# 일괄 요약을 답변 캐시에 미리 넣어두는 질문 (같은 첫 질문은 LLM 호출 없이 요약으로 답함)
+SUMMARY_QUESTION = '뉴스 요약해줘'
+
+MISSING_OPENAI_KEY_MESSAGE = "OpenAI API 키가 설정되지 않았습니다. 사이드바에서 API 키를 입력하거나 환경변수 OPENAI_API_KEY를 설정해주세요."
+
+# 기사 묶음별 뉴스 컨텍스트와 BM25 인덱스 (같은 검색 결과를 보는 모든 세션이 공유)
+_ARTICLE_VIEWS_SIZE = 256
+_views_lock = threading.Lock()
+_article_views: "OrderedDict[Tuple[str, bool], Tuple[str, ArticleIndex]]" = OrderedDict()
+
+
+def new_session() -> Dict[str, Any]:
+    """빈 세션 상태"""
+    return {
+        'keyword': '',
+        'articles': [],
+        'article_set_key': article_set_key([]),
+        'errors': {},
+        'summary': None,
+        'messages': [],
+        'turn_stats': [],
+    }
+
+
+def search_news(keyword: str, api_keys: Dict[str, str],
+                search_all: bool = False) -> Tuple[List[Dict[str, Any]], Dict[str, str]]:
+    """키워드 검색 (기사 목록, {프로바이더: 오류 메시지})
+
+    search_all이면 키가 있는 모든 프로바이더를 동시에, 아니면 NewsAPI만 검색하고
+    키가 하나도 없으면 모의 뉴스를 반환한다.
+    """
+    if search_all and any(api_keys.values()):
+        return fan_out_search(keyword, api_keys)
+    if api_keys.get('newsapi'):
+        try:
+            return search_provider('newsapi', keyword, api_keys['newsapi']), {}
+        except Exception as e:
+            return [], {'newsapi': str(e)}
+    return mock_articles(keyword), {}
+
+
+def apply_search(state: Dict[str, Any], keyword: str, articles: List[Dict[str, Any]],
+                 errors: Dict[str, str]) -> Dict[str, Any]:
+    """검색 결과로 세션 갱신 (새 검색이면 대화 초기화)"""
+    state.update(
+        keyword=keyword,
+        articles=articles,
+        article_set_key=article_set_key(articles),
+        errors=errors,
+        summary=None,
+        messages=[],
+        turn_stats=[],
+    )
+    return state
+
+
+def _article_view(state: Dict[str, Any]) -> Tuple[Optional[str], ArticleIndex]:
+    """세션 기사 목록의 (뉴스 컨텍스트, BM25 인덱스), 기사 목록(요약 전/후)당 한 번만 생성
+
+    기사 전체가 뉴스 컨텍스트 예산을 넘으면 컨텍스트는 None (질문마다 기사를 골라 구성)
+    """
+    summary = state.get('summary')
+    # 컨텍스트의 "뉴스 N" 번호가 기사 순서를 따르므로 순서까지 같은 목록끼리만 공유
+    key = (article_list_key(state['articles']), summary is not None)
+    with _views_lock:
+        view = _article_views.get(key)
+        if view is not None:
+            _article_views.move_to_end(key)
+            return view
+    news_context: Optional[str] = build_news_context(state['articles'], max_tokens=None, summary=summary)
+    if count_tokens(news_context) > NEWS_CONTEXT_TOKENS:
+        news_context = None
+    view = (news_context, ArticleIndex(state['articles']))
+    with _views_lock:
+        _article_views[key] = view
+        while len(_article_views) > _ARTICLE_VIEWS_SIZE:
+            _article_views.popitem(last=False)
+    return view
+
+
+def prepare_turn(state: Dict[str, Any], question: str) -> Dict[str, Any]:
+    """질문 하나에 대한 API 메시지 구성
+
+    {'api_messages', 'prompt_tokens', 'cached_answer'} 반환. 첫 질문은 같은 기사 묶음에 대한
+    캐시된 답변이 있으면 cached_answer에 담는다.
+    """
+    news_context, index = _article_view(state)
+    if news_context is None:
+        # 기사 전체가 예산을 넘으면 질문이 번호로 가리킨 기사, 관련도 높은 기사 순으로 예산만큼 포함
+        news_context = build_news_context(state['articles'], indices=index.select(question),
+                                          summary=state.get('summary'))
+
+    cached_answer = None
+    if not state['messages']:
+        cached_answer = answer_cache.lookup(article_list_key(state['articles']), question)
+
+    messages = state['messages'] + [{'role': 'user', 'content': question}]
+    api_messages, prompt_tokens = build_chat_messages(messages, news_context)
+    return {'api_messages': api_messages, 'prompt_tokens': prompt_tokens, 'cached_answer': cached_answer}
+
+
+def format_summary_answer(state: Dict[str, Any]) -> str:
+    """일괄 요약을 채팅 답변 형식으로 (브리핑 + 기사별 요약 목록)"""
+    summary = state['summary']
+    lines = [summary['brief'], '']
+    for i, (article, text) in enumerate(zip(state['articles'], summary['summaries']), 1):
+        source = (article.get('source') or {}).get('name') or '출처 불명'
+        lines.append(f"{i}. **{article.get('title') or '제목 없음'}** ({source})" + (f" - {text}" if text else ''))
+    return '\n'.join(lines)
+
+
+def summarize_session(state: Dict[str, Any], api_key: str) -> Optional[Dict[str, Any]]:
+    """세션 기사 묶음의 일괄 요약을 만들어 세션에 저장 (이미 있으면 그대로, 만들 수 없으면 None)
+
+    같은 기사 묶음은 프로세스 캐시와 기사 저장소를 통해 세션/워커 간에 한 번만 요약한다.
+    """
+    if state.get('summary') is not None:
+        return state['summary']
+    if not ARTICLE_SUMMARY_ENABLED or not state['articles'] or not api_key:
+        return None
+    start = time.perf_counter()
+    state['summary'] = get_summary(state['article_set_key'], state['articles'], state['keyword'], api_key)
+    # "요약해줘" 류의 첫 질문은 요약으로 바로 답함
+    answer_cache.store(article_list_key(state['articles']), SUMMARY_QUESTION, format_summary_answer(state),
+                       time.perf_counter() - start)
+    return state['summary']
+
+
+def complete_turn(state: Dict[str, Any], question: str, answer: str,
+                  turn_stats: Dict[str, Any]) -> Dict[str, Any]:
+    """답변을 대화 기록에 추가 (오류 없이 새로 생성한 첫 답변은 답변 캐시에 저장)"""
+    if not state['messages'] and not turn_stats.get('cached') and not turn_stats.get('error'):
+        answer_cache.store(article_list_key(state['articles']), question, answer, turn_stats.get('total', 0.0))
+    state['messages'].extend([
+        {'role': 'user', 'content': question},
+        {'role': 'assistant', 'content': answer},
+    ])
+    state['turn_stats'].append(turn_stats)
+    return state
+
+
+def error_answer(error: Exception) -> str:
+    """OpenAI 호출 실패 시 사용자에게 보여줄 답변"""
+    return f"죄송합니다. 응답 생성 중 오류가 발생했습니다: {str(error)}"
+
+
+def record_llm_metrics(mode: str, turn_stats: Dict[str, Any], completion_tokens: int):
+    """LLM 호출 한 번의 지연 시간/토큰 수 기록"""
+    metrics.observe('llm_request_seconds', turn_stats.get('total', 0.0), mode=mode)
+    if 'ttft' in turn_stats and mode == 'stream':
+        metrics.observe('llm_ttft_seconds', turn_stats['ttft'])
+    metrics.inc('llm_tokens_total', turn_stats.get('prompt_tokens', 0), kind='prompt')
+    metrics.inc('llm_tokens_total', completion_tokens, kind='completion')
+    if turn_stats.get('error'):
+        metrics.inc('llm_request_errors_total', mode=mode)
+
+
+def _start_turn(state: Dict[str, Any], question: str, api_key: str,
+                turn_stats: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+    """(프롬프트 구성 결과, OpenAI를 부르지 않고 바로 쓸 답변) - 키가 없거나 캐시 히트면 답변이 있음"""
+    turn = prepare_turn(state, question)
+    if turn['cached_answer'] is not None:
+        turn_stats['cached'] = True
+        return turn, turn['cached_answer']
+    if not api_key:
+        turn_stats['error'] = True
+        return turn, MISSING_OPENAI_KEY_MESSAGE
+    turn_stats['prompt_tokens'] = turn['prompt_tokens']
+    return turn, None
+
+
+# 프로세스 전역 LLM 호출 합치기 (같은 프롬프트의 블로킹 호출이 동시에 들어오면 호출 하나로 처리)
+completion_flight = SingleFlight('llm_completion')
+
+
+def _completion_key(api_key: str, api_messages: List[Dict[str, str]]) -> str:
+    payload = json.dumps([api_key, api_messages], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _parse_completion(response) -> Tuple[str, int]:
+    answer = response.choices[0].message.content
+    usage = getattr(response, 'usage', None)
+    return answer, usage.completion_tokens if usage else count_tokens(answer or '')
+
+
+def _complete(api_key: str, api_messages: List[Dict[str, str]]) -> Tuple[str, int]:
+    """블로킹 chat 호출 (API 키 요청 한도 대기, 같은 요청이 진행 중이면 그 결과를 받음) -> (답변, 완성 토큰 수)"""
+    def call() -> Tuple[str, int]:
+        rate_limiter.acquire('openai', api_key)
+        return _parse_completion(get_openai_client(api_key).chat.completions.create(
+            messages=api_messages, **CHAT_COMPLETION_PARAMS))
+
+    return completion_flight.do(_completion_key(api_key, api_messages), call)
+
+
+async def _acomplete(api_key: str, api_messages: List[Dict[str, str]]) -> Tuple[str, int]:
+    """_complete의 비동기 버전"""
+    async def call() -> Tuple[str, int]:
+        await rate_limiter.aacquire('openai', api_key)
+        return _parse_completion(await get_async_openai_client(api_key).chat.completions.create(
+            messages=api_messages, **CHAT_COMPLETION_PARAMS))
+
+    return await completion_flight.ado(_completion_key(api_key, api_messages), call)
+
+
+def answer_turn(state: Dict[str, Any], question: str, api_key: str,
+                turn_stats: Optional[Dict[str, Any]] = None) -> str:
+    """질문 하나에 답하고 대화 기록에 추가 (turn_stats에 소요 시간/프롬프트 토큰 수 기록)"""
+    turn_stats = {} if turn_stats is None else turn_stats
+    start = time.perf_counter()
+    turn, answer = _start_turn(state, question, api_key, turn_stats)
+    completion_tokens = 0
+    if answer is None:
+        try:
+            answer, completion_tokens = _complete(api_key, turn['api_messages'])
+        except Exception as e:
+            turn_stats['error'] = True
+            answer = error_answer(e)
+    turn_stats['ttft'] = turn_stats['total'] = time.perf_counter() - start
+    if 'prompt_tokens' in turn_stats:
+        record_llm_metrics('blocking', turn_stats, completion_tokens)
+    complete_turn(state, question, answer, turn_stats)
+    return answer
+
+
+def stream_turn(state: Dict[str, Any], question: str, api_key: str,
+                turn_stats: Optional[Dict[str, Any]] = None) -> Iterator[str]:
+    """질문 하나에 대한 답변을 토큰 단위로 반환하고, 끝까지 읽으면 대화 기록에 추가"""
+    turn_stats = {} if turn_stats is None else turn_stats
+    start = time.perf_counter()
+    turn, answer = _start_turn(state, question, api_key, turn_stats)
+    chunks: List[str] = []
+    if answer is not None:
+        chunks.append(answer)
+        yield answer
+    else:
+        try:
+            # 스트리밍은 토큰을 받는 즉시 보여줘야 하므로 합치지 않고 요청 한도만 지킴
+            rate_limiter.acquire('openai', api_key)
+            stream = get_openai_client(api_key).chat.completions.create(
+                messages=turn['api_messages'], stream=True, **CHAT_COMPLETION_PARAMS)
+            for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if not chunks:
+                        turn_stats['ttft'] = time.perf_counter() - start
+                    chunks.append(delta)
+                    yield delta
+        except Exception as e:
+            turn_stats['error'] = True
+            chunks.append(error_answer(e))
+            yield chunks[-1]
+    turn_stats['total'] = time.perf_counter() - start
+    turn_stats.setdefault('ttft', turn_stats['total'])
+    if 'prompt_tokens' in turn_stats:
+        # 스트리밍 청크 하나가 대략 토큰 하나
+        record_llm_metrics('stream', turn_stats, len(chunks))
+    complete_turn(state, question, ''.join(chunks), turn_stats)
+
+
+async def aanswer_turn(state: Dict[str, Any], question: str, api_key: str,
+                       turn_stats: Optional[Dict[str, Any]] = None) -> str:
+    """answer_turn의 비동기 버전 (AsyncOpenAI 클라이언트 사용)"""
+    turn_stats = {} if turn_stats is None else turn_stats
+    start = time.perf_counter()
+    turn, answer = _start_turn(state, question, api_key, turn_stats)
+    completion_tokens = 0
+    if answer is None:
+        try:
+            answer, completion_tokens = await _acomplete(api_key, turn['api_messages'])
+        except Exception as e:
+            turn_stats['error'] = True
+            answer = error_answer(e)
+    turn_stats['ttft'] = turn_stats['total'] = time.perf_counter() - start
+    if 'prompt_tokens' in turn_stats:
+        record_llm_metrics('blocking', turn_stats, completion_tokens)
+    complete_turn(state, question, answer, turn_stats)
+    return answer
+
+
+async def astream_turn(state: Dict[str, Any], question: str, api_key: str,
+                       turn_stats: Optional[Dict[str, Any]] = None) -> AsyncIterator[str]:
+    """stream_turn의 비동기 버전 (AsyncOpenAI 클라이언트 사용)"""
+    turn_stats = {} if turn_stats is None else turn_stats
+    start = time.perf_counter()
+    turn, answer = _start_turn(state, question, api_key, turn_stats)
+    chunks: List[str] = []
+    if answer is not None:
+        chunks.append(answer)
+        yield answer
+    else:
+        try:
+            await rate_limiter.aacquire('openai', api_key)
+            stream = await get_async_openai_client(api_key).chat.completions.create(
+                messages=turn['api_messages'], stream=True, **CHAT_COMPLETION_PARAMS)
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    if not chunks:
+                        turn_stats['ttft'] = time.perf_counter() - start
+                    chunks.append(delta)
+                    yield delta
+        except Exception as e:
+            turn_stats['error'] = True
+            chunks.append(error_answer(e))
+            yield chunks[-1]
+    turn_stats['total'] = time.perf_counter() - start
+    turn_stats.setdefault('ttft', turn_stats['total'])
+    if 'prompt_tokens' in turn_stats:
+        record_llm_metrics('stream', turn_stats, len(chunks))
+    complete_turn(state, question, ''.join(chunks), turn_stats)
+
+
+def queue_digest(articles: List[Dict[str, Any]], keyword: str, recipients: List[str], sender_email: str,
+                 sender_password: str, summary: Optional[Dict[str, Any]] = None) -> str:
+    """수신자별 뉴스 요약 이메일을 백그라운드 발송 큐에 넣고 job id 반환 (summary가 있으면 요약본으로)
+
+    SMTP 서버는 서버 설정(SMTP_SERVER/SMTP_PORT)을 쓴다.
+    """
+    # 기사 목록은 한 번만 렌더링하고 수신자별로는 인사말만 채움
+    prepared = prepare_digest(articles, keyword, summary)
+    messages = [build_digest_message(prepared, recipient, sender_email) for recipient in recipients]
+    return email_queue.submit(messages, SMTP_SERVER, SMTP_PORT, sender_email, sender_password)
+
+
+def job_status(job_id: str) -> Optional[Dict[str, Any]]:
+    """이메일 발송 작업 상태"""
+    return email_queue.status(job_id)
+
+
+def wait_job(job_id: str, timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+    """이메일 발송 작업이 끝날 때까지 대기 후 상태 반환"""
+    return email_queue.wait(job_id, timeout)
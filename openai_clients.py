@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Set, Tuple
+
+import openai
+
+# 이 시간(초) 동안 사용되지 않은 클라이언트는 커넥션 풀을 닫고 제거
+IDLE_TIMEOUT = float(os.getenv('OPENAI_CLIENT_IDLE_TIMEOUT', '600'))
+
+
+class OpenAIClientRegistry:
+    """API 키별 OpenAI 클라이언트를 프로세스 안에서 재사용 (세션/rerun 간 커넥션 풀 공유)"""
+
+    client_class = openai.OpenAI
+
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT):
+        self.idle_timeout = idle_timeout
+        self._lock = threading.Lock()
+        # sha256(API 키, base_url) -> (클라이언트, 마지막 사용 시각)
+        self._clients: Dict[str, Tuple[Any, float]] = {}
+
+    @staticmethod
+    def _key(api_key: str, base_url: Optional[str]) -> str:
+        return hashlib.sha256(f'{api_key}\0{base_url or ""}'.encode('utf-8')).hexdigest()
+
+    def get(self, api_key: str, base_url: Optional[str] = None) -> Any:
+        """API 키에 해당하는 클라이언트 반환 (없으면 생성), 오래 쓰지 않은 클라이언트는 정리"""
+        key = self._key(api_key, base_url)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._clients.get(key)
+            client = entry[0] if entry else self.client_class(api_key=api_key, base_url=base_url)
+            self._clients[key] = (client, now)
+            idle = self._pop_idle(now)
+        for idle_client in idle:
+            self._close(idle_client)
+        return client
+
+    def _close(self, client):
+        client.close()
+
+    def _pop_idle(self, now: float):
+        """idle_timeout이 지난 클라이언트를 목록에서 제거하여 반환 (lock 보유 상태에서 호출)"""
+        expired = [k for k, (_, last_used) in self._clients.items() if now - last_used > self.idle_timeout]
+        return [self._clients.pop(k)[0] for k in expired]
+
+    def close_all(self):
+        """모든 클라이언트의 커넥션 풀 정리"""
+        with self._lock:
+            clients = [client for client, _ in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            self._close(client)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._clients)
+
+
+# 프로세스 전역 OpenAI 클라이언트 레지스트리
+openai_clients = OpenAIClientRegistry()
+
+
+def get_openai_client(api_key: str) -> openai.OpenAI:
+    """프로세스 전역 레지스트리에서 API 키별 OpenAI 클라이언트 조회"""
+    return openai_clients.get(api_key)
+
+
+class AsyncOpenAIClientRegistry(OpenAIClientRegistry):
+    """API 키별 AsyncOpenAI 클라이언트 재사용 (백엔드 API 워커의 이벤트 루프에서 사용)"""
+
+    client_class = openai.AsyncOpenAI
+
+    def __init__(self, idle_timeout: float = IDLE_TIMEOUT):
+        super().__init__(idle_timeout)
+        # id(클라이언트) -> 마지막으로 사용한 이벤트 루프 (httpx 연결은 그 루프에 묶여 있음)
+        self._loops: Dict[int, asyncio.AbstractEventLoop] = {}
+        # 진행 중인 close 작업 (참조를 잡아두지 않으면 끝나기 전에 가비지 컬렉션될 수 있음)
+        self._closing: Set[Any] = set()
+
+    def get(self, api_key: str, base_url: Optional[str] = None) -> Any:
+        client = super().get(api_key, base_url)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return client
+        with self._lock:
+            self._loops[id(client)] = loop
+        return client
+
+    def _close(self, client):
+        # AsyncOpenAI.close()는 코루틴이므로 클라이언트의 연결이 묶인 이벤트 루프에서 실행
+        with self._lock:
+            loop = self._loops.pop(id(client), None)
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is None:
+            # 이벤트 루프에서 쓴 적이 없으면 열린 연결도 없으므로 아무 루프에서나 닫아도 됨
+            if running is None:
+                asyncio.run(client.close())
+                return
+            loop = running
+        if loop is running:
+            task = loop.create_task(client.close())
+        elif loop.is_running():
+            task = asyncio.run_coroutine_threadsafe(client.close(), loop)
+        else:
+            # 루프가 이미 끝났으면 연결도 함께 끊겼으므로 닫을 것이 없음
+            return
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+
+
+# 프로세스 전역 AsyncOpenAI 클라이언트 레지스트리
+async_openai_clients = AsyncOpenAIClientRegistry()
+
+
+def get_async_openai_client(api_key: str) -> openai.AsyncOpenAI:
+    """프로세스 전역 레지스트리에서 API 키별 AsyncOpenAI 클라이언트 조회"""
+    return async_openai_clients.get(api_key)
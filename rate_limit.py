@@ -0,0 +1,325 @@
+import asyncio
+import copy
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from metrics import metrics
+
+# API 키별 요청 한도 "이름=초당 요청 수/순간 최대 요청 수" (쉼표로 구분, 목록에 없는 이름은 제한 없음)
+RATE_LIMITS = os.getenv('RATE_LIMITS', 'newsapi=1/5,guardian=1/1,openai=8/20')
+# 대화형 요청이 토큰을 기다리는 최대 시간(초), 넘으면 RateLimitExceeded
+RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', '10'))
+# 백그라운드 요청이 토큰을 기다리는 최대 시간(초)
+RATE_LIMIT_BACKGROUND_MAX_WAIT = float(os.getenv('RATE_LIMIT_BACKGROUND_MAX_WAIT', '300'))
+# 여러 프로세스가 한도를 공유할 SQLite 파일 (비어 있으면 프로세스 안에서만 공유)
+RATE_LIMIT_DB = os.getenv('RATE_LIMIT_DB', '')
+# 백그라운드 요청이 대화형 요청 몫으로 남겨두는 토큰 수
+BACKGROUND_RESERVE = 1.0
+
+INTERACTIVE = 'interactive'
+BACKGROUND = 'background'
+
+# 백그라운드 요청이 대기 중인 대화형 요청에 양보할 때 다시 확인하는 간격(초)
+_YIELD_INTERVAL = 0.05
+
+
+class TokenBucket:
+    """토큰 버킷 속도 제한 (rate개/초, 최대 burst개까지 몰아서 허용)"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0, reserve: float = 0.0) -> float:
+        """토큰을 얻으면 0, 부족하면 기다려야 할 시간(초)을 반환 (이때 토큰은 소비하지 않음)
+
+        reserve만큼은 남겨두고 그 위의 토큰만 사용한다 (낮은 우선순위 요청용).
+        """
+        with self._lock:
+            now = self._clock()
+            self._refill(now)
+            if self._tokens >= tokens + reserve:
+                self._tokens -= tokens
+                return 0.0
+            return (tokens + reserve - self._tokens) / self.rate
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None, reserve: float = 0.0) -> bool:
+        """토큰을 얻을 때까지 대기 (timeout 안에 못 얻으면 False)"""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            wait = self.try_acquire(tokens, reserve)
+            if wait == 0.0:
+                return True
+            if deadline is not None and self._clock() + wait > deadline:
+                return False
+            self._sleep(wait)
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """여러 프로세스가 공유하는 토큰 버킷 (상태는 SQLite 파일, 갱신은 BEGIN IMMEDIATE 트랜잭션)
+
+    프로세스 간에 비교할 수 있도록 벽시계(time.time)를 사용한다.
+    """
+
+    def __init__(self, path: str, key: str, rate: float, burst: Optional[float] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        super().__init__(rate, burst, clock=time.time, sleep=sleep)
+        self.path = path
+        self.key = key
+        self._local = threading.local()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # 트랜잭션은 직접 관리 (isolation_level=None)
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('CREATE TABLE IF NOT EXISTS buckets (key TEXT PRIMARY KEY, tokens REAL NOT NULL, '
+                         'updated REAL NOT NULL) WITHOUT ROWID')
+            self._local.conn = conn
+        return conn
+
+    def try_acquire(self, tokens: float = 1.0, reserve: float = 0.0) -> float:
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = self._clock()
+            row = conn.execute('SELECT tokens, updated FROM buckets WHERE key = ?', (self.key,)).fetchone()
+            available = self.burst if row is None else min(self.burst, row[0] + max(0.0, now - row[1]) * self.rate)
+            if available >= tokens + reserve:
+                available -= tokens
+                wait = 0.0
+            else:
+                wait = (tokens + reserve - available) / self.rate
+            conn.execute(
+                'INSERT INTO buckets (key, tokens, updated) VALUES (?, ?, ?) '
+                'ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated',
+                (self.key, available, now),
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return wait
+
+
+def parse_rate_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """"newsapi=1/5,openai=8/20" -> {'newsapi': (1.0, 5.0), 'openai': (8.0, 20.0)} (버스트 생략 시 초당 요청 수)"""
+    limits = {}
+    for item in spec.split(','):
+        if not item.strip():
+            continue
+        name, _, value = item.partition('=')
+        rate, _, burst = value.partition('/')
+        limits[name.strip()] = (float(rate), float(burst or rate))
+    return limits
+
+
+class RateLimitExceeded(RuntimeError):
+    """최대 대기 시간 안에 요청 한도 토큰을 얻지 못함"""
+
+
+class _KeyState:
+    __slots__ = ('bucket', 'interactive_waiting')
+
+    def __init__(self, bucket: TokenBucket):
+        self.bucket = bucket
+        self.interactive_waiting = 0
+
+
+class KeyedRateLimiter:
+    """프로바이더 + API 키별 토큰 버킷 (대화형 요청 우선, 한도를 넘으면 잠시 줄을 서서 대기)
+
+    백그라운드 요청은 같은 키에 대기 중인 대화형 요청이 있으면 양보하고, 버킷에 토큰을
+    BACKGROUND_RESERVE개 남겨둔다. db_path가 있으면 버킷 상태를 여러 프로세스가 공유한다
+    (대화형 요청 양보는 프로세스 안에서만 적용).
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]], max_wait: float = RATE_LIMIT_MAX_WAIT,
+                 background_max_wait: float = RATE_LIMIT_BACKGROUND_MAX_WAIT, db_path: str = RATE_LIMIT_DB,
+                 maxsize: int = 1024, clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.limits = limits
+        self.max_wait = max_wait
+        self.background_max_wait = background_max_wait
+        self.db_path = db_path
+        self.maxsize = maxsize
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._states: "OrderedDict[Tuple[str, str], _KeyState]" = OrderedDict()
+
+    def _state(self, provider: str, api_key: str) -> Optional[_KeyState]:
+        limit = self.limits.get(provider)
+        if limit is None:
+            return None
+        # API 키 원문은 보관하지 않음
+        key = (provider, hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16])
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                if self.db_path:
+                    bucket = SQLiteTokenBucket(self.db_path, ':'.join(key), *limit)
+                else:
+                    bucket = TokenBucket(*limit, clock=self._clock)
+                state = self._states[key] = _KeyState(bucket)
+                while len(self._states) > self.maxsize:
+                    self._states.popitem(last=False)
+            self._states.move_to_end(key)
+            return state
+
+    def _attempt(self, state: _KeyState, priority: str) -> float:
+        """토큰을 얻으면 0, 아니면 다시 시도하기까지 기다릴 시간(초)"""
+        if priority == INTERACTIVE:
+            return state.bucket.try_acquire()
+        if state.interactive_waiting:
+            return _YIELD_INTERVAL
+        return state.bucket.try_acquire(reserve=min(BACKGROUND_RESERVE, state.bucket.burst - 1))
+
+    def _timeout(self, priority: str, timeout: Optional[float]) -> float:
+        if timeout is not None:
+            return timeout
+        return self.max_wait if priority == INTERACTIVE else self.background_max_wait
+
+    def _finish(self, provider: str, priority: str, waited: float, acquired: bool, timeout: float):
+        metrics.observe('rate_limit_wait_seconds', waited, provider=provider, priority=priority)
+        if not acquired:
+            metrics.inc('rate_limit_timeouts_total', provider=provider, priority=priority)
+            raise RateLimitExceeded(f'{provider} 요청이 많아 {timeout:g}초 안에 보내지 못했습니다. 잠시 후 다시 시도해주세요.')
+
+    def acquire(self, provider: str, api_key: str, priority: str = INTERACTIVE,
+                timeout: Optional[float] = None):
+        """요청 하나를 보낼 토큰을 얻을 때까지 대기 (한도가 없는 프로바이더는 바로 반환)"""
+        state = self._state(provider, api_key)
+        if state is None:
+            return
+        timeout = self._timeout(priority, timeout)
+        start = self._clock()
+        if priority == INTERACTIVE:
+            with self._lock:
+                state.interactive_waiting += 1
+        try:
+            while True:
+                wait = self._attempt(state, priority)
+                if wait == 0.0:
+                    acquired = True
+                    break
+                if self._clock() + wait > start + timeout:
+                    acquired = False
+                    break
+                self._sleep(wait)
+        finally:
+            if priority == INTERACTIVE:
+                with self._lock:
+                    state.interactive_waiting -= 1
+        self._finish(provider, priority, self._clock() - start, acquired, timeout)
+
+    async def aacquire(self, provider: str, api_key: str, priority: str = INTERACTIVE,
+                       timeout: Optional[float] = None):
+        """acquire의 비동기 버전 (이벤트 루프를 막지 않고 대기)"""
+        state = self._state(provider, api_key)
+        if state is None:
+            return
+        timeout = self._timeout(priority, timeout)
+        start = self._clock()
+        if priority == INTERACTIVE:
+            with self._lock:
+                state.interactive_waiting += 1
+        try:
+            while True:
+                wait = self._attempt(state, priority)
+                if wait == 0.0:
+                    acquired = True
+                    break
+                if self._clock() + wait > start + timeout:
+                    acquired = False
+                    break
+                await asyncio.sleep(wait)
+        finally:
+            if priority == INTERACTIVE:
+                with self._lock:
+                    state.interactive_waiting -= 1
+        self._finish(provider, priority, self._clock() - start, acquired, timeout)
+
+
+# 프로세스 전역 요청 한도 (모든 세션, 감시 워커, 백엔드 요청이 공유)
+rate_limiter = KeyedRateLimiter(parse_rate_limits(RATE_LIMITS))
+
+
+class _Call:
+    """진행 중인 호출 하나를 여러 호출자가 기다릴 수 있도록 보관"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """같은 키로 동시에 들어온 호출을 하나로 합침 (먼저 온 호출만 실행)
+
+    결과는 실행한 호출자를 포함해 모두 각자의 사본을 받으므로 고쳐 써도 서로 영향이 없다.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Hashable, "asyncio.Future[Any]"] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            metrics.inc('coalesced_calls_total', kind=self.name)
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return copy.deepcopy(call.value)
+        try:
+            call.value = fn()
+            return copy.deepcopy(call.value)
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """do의 비동기 버전 (같은 이벤트 루프 안의 동시 호출을 합침)"""
+        future = self._async_calls.get(key)
+        if future is not None:
+            metrics.inc('coalesced_calls_total', kind=self.name)
+            return copy.deepcopy(await asyncio.shield(future))
+        future = self._async_calls[key] = asyncio.get_running_loop().create_future()
+        try:
+            value = await fn()
+            future.set_result(value)
+            return copy.deepcopy(value)
+        except BaseException as e:
+            future.set_exception(e)
+            # 기다리는 호출자가 없어도 "exception was never retrieved" 경고가 나지 않게 함
+            future.exception()
+            raise
+        finally:
+            del self._async_calls[key]
@@ -0,0 +1,80 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+# 세션 상태 저장소 (redis://... 이면 Redis, 비어 있으면 프로세스 안 메모리)
+SESSION_STORE_URL = os.getenv('SESSION_STORE_URL', '')
+# 마지막으로 저장한 뒤 이 시간(초)이 지난 세션은 삭제
+SESSION_TTL = int(os.getenv('SESSION_TTL', '86400'))
+SESSION_KEY_PREFIX = 'news-chatbot:session:'
+
+
+class InMemorySessionStore:
+    """프로세스 안 세션 저장소 (TTL + LRU, 외부 저장소와 같게 JSON으로 직렬화하여 보관)"""
+
+    def __init__(self, maxsize: int = 10000, ttl: int = SESSION_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # 세션 id -> (JSON 문자열, 저장 시각)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[1] > self.ttl:
+                del self._entries[session_id]
+                return None
+            self._entries.move_to_end(session_id)
+        return json.loads(entry[0])
+
+    def put(self, session_id: str, state: Dict[str, Any]):
+        data = json.dumps(state, ensure_ascii=False)
+        with self._lock:
+            self._entries[session_id] = (data, time.monotonic())
+            self._entries.move_to_end(session_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._entries.pop(session_id, None)
+
+
+class RedisSessionStore:
+    """Redis 세션 저장소 (여러 API 워커/서버가 같은 세션을 이어서 처리)"""
+
+    def __init__(self, url: str, ttl: int = SESSION_TTL):
+        # redis는 이 저장소를 쓸 때만 필요
+        import redis
+
+        self.ttl = ttl
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        data = self._redis.get(SESSION_KEY_PREFIX + session_id)
+        return json.loads(data) if data is not None else None
+
+    def put(self, session_id: str, state: Dict[str, Any]):
+        self._redis.set(SESSION_KEY_PREFIX + session_id, json.dumps(state, ensure_ascii=False), ex=self.ttl)
+
+    def delete(self, session_id: str):
+        self._redis.delete(SESSION_KEY_PREFIX + session_id)
+
+
+def create_session_store(url: str = SESSION_STORE_URL):
+    """URL에 맞는 세션 저장소 생성 (비어 있으면 메모리 저장소)"""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisSessionStore(url)
+    if url:
+        raise ValueError(f'지원하지 않는 세션 저장소입니다: {url}')
+    return InMemorySessionStore()
+
+
+# 프로세스 전역 세션 저장소
+session_store = create_session_store()
@@ -1,15 +1,15 @@
 import streamlit as st
-import requests
-import openai
 import os
+import time
+import uuid
 from datetime import datetime
 import json
-from typing import List, Dict, Any
-import smtplib
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from email.mime.base import MIMEBase
-from email import encoders
+from typing import List, Dict, Any, Optional
+from backend_client import BACKEND_URL, BackendError, get_backend
+from metrics import METRICS_DEV_PANEL, metrics, start_metrics_server
+
+# 뉴스 목록 한 페이지에 표시할 카드 수
+NEWS_CARDS_PER_PAGE = int(os.getenv('NEWS_CARDS_PER_PAGE', '6'))
 
 # 페이지 설정
 st.set_page_config(
@@ -18,141 +18,63 @@ st.set_page_config(
     layout="wide"
 )
 
-def get_news_from_newsapi(keyword: str, api_key: str) -> List[Dict[str, Any]]:
-    """NewsAPI를 사용하여 뉴스 검색"""
-    try:
-        url = "https://newsapi.org/v2/everything"
-        params = {
-            'q': keyword,
-            'language': 'ko',
-            'sortBy': 'publishedAt',
-            'pageSize': 10,
-            'apiKey': api_key
-        }
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        
-        data = response.json()
-        return data.get('articles', [])
-    
-    except Exception as e:
-        st.error(f"뉴스 검색 중 오류가 발생했습니다: {str(e)}")
-        return []
-
-def get_news_from_guardian(keyword: str, api_key: str) -> List[Dict[str, Any]]:
-    """Guardian API를 사용하여 뉴스 검색 (대체 API)"""
-    try:
-        url = "https://content.guardianapis.com/search"
-        params = {
-            'q': keyword,
-            'page-size': 10,
-            'show-fields': 'thumbnail,trailText,headline',
-            'api-key': api_key
-        }
-        
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        
-        data = response.json()
-        articles = []
-        
-        for item in data.get('response', {}).get('results', []):
-            article = {
-                'title': item.get('webTitle', ''),
-                'description': item.get('fields', {}).get('trailText', ''),
-                'url': item.get('webUrl', ''),
-                'urlToImage': item.get('fields', {}).get('thumbnail', ''),
-                'source': {'name': 'The Guardian'},
-                'publishedAt': item.get('webPublicationDate', '')
-            }
-            articles.append(article)
-        
-        return articles
-    
-    except Exception as e:
-        st.error(f"Guardian API 뉴스 검색 중 오류가 발생했습니다: {str(e)}")
-        return []
-
-def get_mock_news(keyword: str) -> List[Dict[str, Any]]:
-    """API 키가 없을 때 사용할 모의 뉴스 데이터"""
-    mock_articles = [
-        {
-            'title': f'{keyword} 관련 최신 뉴스 1',
-            'description': f'{keyword}에 대한 중요한 소식이 전해졌습니다. 관련 업계에서는 이번 발표가 향후 시장에 큰 영향을 미칠 것으로 예상한다고 밝혔습니다.',
-            'url': 'https://example.com/news1',
-            'urlToImage': 'https://via.placeholder.com/300x200?text=News+1',
-            'source': {'name': '뉴스 소스 1'},
-            'publishedAt': '2024-01-15T10:00:00Z'
-        },
-        {
-            'title': f'{keyword} 관련 최신 뉴스 2',
-            'description': f'{keyword} 분야의 새로운 동향이 발표되었습니다. 전문가들은 이러한 변화가 긍정적인 결과를 가져올 것이라고 전망하고 있습니다.',
-            'url': 'https://example.com/news2',
-            'urlToImage': 'https://via.placeholder.com/300x200?text=News+2',
-            'source': {'name': '뉴스 소스 2'},
-            'publishedAt': '2024-01-15T09:30:00Z'
-        },
-        {
-            'title': f'{keyword} 관련 최신 뉴스 3',
-            'description': f'{keyword}와 관련된 정책 변화가 논의되고 있습니다. 이번 변화는 많은 사람들에게 직접적인 영향을 미칠 것으로 예상됩니다.',
-            'url': 'https://example.com/news3',
-            'urlToImage': 'https://via.placeholder.com/300x200?text=News+3',
-            'source': {'name': '뉴스 소스 3'},
-            'publishedAt': '2024-01-15T09:00:00Z'
-        }
-    ]
-    
-    # 키워드에 따라 10개까지 확장
-    extended_articles = []
-    for i in range(10):
-        article = mock_articles[i % len(mock_articles)].copy()
-        article['title'] = f'{keyword} 관련 최신 뉴스 {i+1}'
-        article['description'] = f'{keyword}에 대한 뉴스 {i+1}번입니다. ' + article['description'][:80] + '...'
-        article['urlToImage'] = f'https://via.placeholder.com/300x200?text=News+{i+1}'
-        extended_articles.append(article)
-    
-    return extended_articles
-
 def truncate_text(text: str, max_length: int = 100) -> str:
     """텍스트를 지정된 길이로 자르기"""
     if len(text) <= max_length:
         return text
     return text[:max_length-3] + "..."
 
+@metrics.timed('news_grid_render')
 def display_news_grid(articles: List[Dict[str, Any]]):
-    """뉴스를 그리드 형태로 표시"""
+    """뉴스를 그리드 형태로 표시 (현재 페이지의 카드만 렌더링)"""
     if not articles:
         st.warning("검색된 뉴스가 없습니다.")
         return
     
+    page_count = (len(articles) + NEWS_CARDS_PER_PAGE - 1) // NEWS_CARDS_PER_PAGE
+    page = min(st.session_state.news_page, page_count - 1)
+    start = page * NEWS_CARDS_PER_PAGE
+    page_articles = articles[start:start + NEWS_CARDS_PER_PAGE]
+    
+    # 현재 페이지의 썸네일을 백엔드에서 한 번에 받음 (디스크 캐시에 있으면 다시 받지 않음)
+    try:
+        thumbnails = get_backend().get_thumbnails([article.get('urlToImage') for article in page_articles])
+    except BackendError:
+        thumbnails = {}
+    
     # 2열 그리드로 뉴스 표시
-    for i in range(0, len(articles), 2):
+    for i in range(0, len(page_articles), 2):
         col1, col2 = st.columns(2)
         
         # 첫 번째 열
-        if i < len(articles):
-            with col1:
-                display_news_card(articles[i], i)
+        with col1:
+            display_news_card(page_articles[i], start + i, thumbnails.get(page_articles[i].get('urlToImage')))
         
         # 두 번째 열
-        if i + 1 < len(articles):
+        if i + 1 < len(page_articles):
             with col2:
-                display_news_card(articles[i + 1], i + 1)
+                display_news_card(page_articles[i + 1], start + i + 1, thumbnails.get(page_articles[i + 1].get('urlToImage')))
+    
+    # 페이지 이동
+    if page_count > 1:
+        prev_col, info_col, next_col = st.columns([1, 2, 1])
+        with prev_col:
+            st.button("◀ 이전", key="news_prev", disabled=page == 0,
+                      on_click=lambda: setattr(st.session_state, 'news_page', page - 1))
+        with info_col:
+            st.caption(f"{page + 1} / {page_count} 페이지 (전체 {len(articles)}개)")
+        with next_col:
+            st.button("다음 ▶", key="news_next", disabled=page >= page_count - 1,
+                      on_click=lambda: setattr(st.session_state, 'news_page', page + 1))
 
-def display_news_card(article: Dict[str, Any], index: int):
+def display_news_card(article: Dict[str, Any], index: int, thumbnail: Optional[bytes] = None):
     """개별 뉴스 카드 표시"""
     with st.container():
         st.markdown("---")
         
-        # 썸네일 이미지
-        if article.get('urlToImage'):
-            try:
-                st.image(article['urlToImage'], width=300)
-            except:
-                st.image('https://via.placeholder.com/300x200?text=No+Image', width=300)
-        else:
-            st.image('https://via.placeholder.com/300x200?text=No+Image', width=300)
+        # 썸네일 이미지 (백엔드가 300px로 줄인 이미지, 받지 못했으면 생략)
+        if thumbnail is not None:
+            st.image(thumbnail, width=300)
         
         # 제목
         st.subheader(article.get('title', '제목 없음'))
@@ -171,148 +93,203 @@ def display_news_card(article: Dict[str, Any], index: int):
             except:
                 st.caption(f"🕒 {published_at}")
         
-        # 내용 요약 (100자)
-        description = article.get('description', '내용 없음')
-        truncated_description = truncate_text(description, 100)
-        st.write(truncated_description)
+        # 내용 요약 (일괄 요약이 있으면 기사별 요약, 없으면 설명 100자)
+        summaries = (st.session_state.news_summary or {}).get('summaries') or []
+        if index < len(summaries) and summaries[index]:
+            st.write(f"📝 {summaries[index]}")
+        else:
+            description = article.get('description', '내용 없음')
+            truncated_description = truncate_text(description, 100)
+            st.write(truncated_description)
         
         # 원문 링크
         if article.get('url'):
             st.markdown(f"[원문 보기]({article['url']})")
 
-def send_news_email(articles: List[Dict[str, Any]], keyword: str, recipient_email: str, sender_email: str, sender_password: str, smtp_server: str = "smtp.gmail.com", smtp_port: int = 587) -> bool:
-    """뉴스 요약을 이메일로 전송"""
-    try:
-        # 이메일 내용 생성
-        subject = f"[뉴스 요약] '{keyword}' 관련 최신 뉴스 {len(articles)}개"
-        
-        # HTML 이메일 템플릿
-        html_content = f"""
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .header {{ background-color: #f4f4f4; padding: 20px; text-align: center; }}
-                .news-item {{ border: 1px solid #ddd; margin: 15px 0; padding: 15px; border-radius: 5px; }}
-                .news-title {{ font-size: 18px; font-weight: bold; color: #2c3e50; margin-bottom: 10px; }}
-                .news-source {{ color: #7f8c8d; font-size: 14px; margin-bottom: 5px; }}
-                .news-date {{ color: #95a5a6; font-size: 12px; margin-bottom: 10px; }}
-                .news-description {{ margin-bottom: 10px; }}
-                .news-link {{ color: #3498db; text-decoration: none; }}
-                .footer {{ background-color: #f4f4f4; padding: 15px; text-align: center; margin-top: 20px; }}
-            </style>
-        </head>
-        <body>
-            <div class="header">
-                <h1>📰 뉴스 요약 리포트</h1>
-                <p>키워드: <strong>{keyword}</strong></p>
-                <p>생성일시: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
-            </div>
-        """
-        
-        # 각 뉴스 아이템 추가
-        for i, article in enumerate(articles, 1):
-            title = article.get('title', '제목 없음')
-            source = article.get('source', {}).get('name', '출처 불명')
-            description = truncate_text(article.get('description', '내용 없음'), 200)
-            url = article.get('url', '#')
-            published_at = article.get('publishedAt', '')
-            
-            # 날짜 포맷팅
-            formatted_date = ''
-            if published_at:
-                try:
-                    date_obj = datetime.fromisoformat(published_at.replace('Z', '+00:00'))
-                    formatted_date = date_obj.strftime('%Y-%m-%d %H:%M')
-                except:
-                    formatted_date = published_at
-            
-            html_content += f"""
-            <div class="news-item">
-                <div class="news-title">{i}. {title}</div>
-                <div class="news-source">📰 출처: {source}</div>
-                <div class="news-date">🕒 {formatted_date}</div>
-                <div class="news-description">{description}</div>
-                <a href="{url}" class="news-link" target="_blank">원문 보기 →</a>
-            </div>
-            """
-        
-        html_content += """
-            <div class="footer">
-                <p>이 뉴스 요약은 뉴스 챗봇에서 자동 생성되었습니다.</p>
-                <p>더 자세한 정보는 각 뉴스의 원문을 확인해주세요.</p>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # 이메일 메시지 생성
-        msg = MIMEMultipart('alternative')
-        msg['From'] = sender_email
-        msg['To'] = recipient_email
-        msg['Subject'] = subject
-        
-        # HTML 파트 추가
-        html_part = MIMEText(html_content, 'html', 'utf-8')
-        msg.attach(html_part)
-        
-        # SMTP 서버 연결 및 이메일 전송
-        server = smtplib.SMTP(smtp_server, smtp_port)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.send_message(msg)
-        server.quit()
-        
-        return True
-        
-    except Exception as e:
-        st.error(f"이메일 전송 중 오류가 발생했습니다: {str(e)}")
-        return False
+def queue_news_email(articles: List[Dict[str, Any]], keyword: str, recipient_emails: List[str], sender_email: str, sender_password: str, summary: Optional[Dict[str, Any]] = None) -> str:
+    """수신자별 뉴스 요약 이메일을 백엔드 발송 큐에 넣고 job id 반환 (일괄 요약이 있으면 요약본으로)"""
+    return get_backend().queue_digest(articles, keyword, recipient_emails, sender_email, sender_password, summary)
+
+@st.fragment(run_every=2)
+def display_email_job_status():
+    """백그라운드 이메일 발송 상태 표시 (이 영역만 주기적으로 갱신, 작업이 끝나면 갱신 중단)"""
+    job = get_backend().job_status(st.session_state.email_job_id)
+    if job is None or job['finished_at'] is not None:
+        # 결과를 저장하고 앱 전체를 다시 그려 이 fragment(주기적 조회)를 더 이상 렌더링하지 않음
+        st.session_state.email_job_id = None
+        st.session_state.email_job_result = job or {'status': 'unknown'}
+        st.rerun()
+    st.info(f"📤 이메일 전송 중... ({job['sent'] + job['failed']}/{job['total']})")
 
-def get_chatbot_response(messages: List[Dict[str, str]], news_context: str) -> str:
-    """OpenAI를 사용한 챗봇 응답 생성"""
+def display_email_job_result(job: Dict[str, Any]):
+    """끝난 이메일 발송 작업의 결과 표시"""
+    if job['status'] == 'done':
+        st.success(f"✅ 뉴스 요약 이메일 {job['sent']}통이 전송되었습니다!")
+    elif job['status'] == 'unknown':
+        st.warning("이메일 발송 상태를 확인할 수 없습니다.")
+    else:
+        st.error(f"❌ 이메일 전송에 실패했습니다. (성공 {job['sent']}통, 실패 {job['failed']}통)")
+        for error in job['errors']:
+            st.caption(error)
+
+def display_metrics_panel():
+    """사이드바 개발자 패널 (구간별 지연 시간 백분위, 카운터, 캐시 통계)"""
+    with st.expander("🛠️ 성능 지표"):
+        if not metrics.enabled:
+            st.caption("METRICS_ENABLED=1로 실행하면 구간별 지연 시간이 수집됩니다.")
+        snapshot = metrics.snapshot()
+        st.caption(
+            f"직전 페이지 실행 {st.session_state.get('page_run_seconds', 0) * 1000:.1f}ms · "
+            f"채팅 패널 {st.session_state.get('chat_panel_seconds', 0) * 1000:.1f}ms"
+        )
+        if snapshot['histograms']:
+            st.dataframe([
+                {
+                    '구간': h['name'] + ''.join(f" {k}={v}" for k, v in h['labels'].items()),
+                    '횟수': h['count'],
+                    'p50 (ms)': round(h['p50'] * 1000, 1),
+                    'p95 (ms)': round(h['p95'] * 1000, 1),
+                    'p99 (ms)': round(h['p99'] * 1000, 1),
+                }
+                for h in snapshot['histograms']
+            ], hide_index=True)
+        if snapshot['counters']:
+            st.dataframe([
+                {'카운터': c['name'] + ''.join(f" {k}={v}" for k, v in c['labels'].items()), '값': c['value']}
+                for c in snapshot['counters']
+            ], hide_index=True)
+        for name, stats in snapshot['collected'].items():
+            st.caption(f"{name}: " + ", ".join(
+                f"{k}={v:.2f}" if isinstance(v, float) else f"{k}={v}" for k, v in stats.items()
+            ))
+
+def get_secret(name: str) -> str:
+    """secrets 또는 환경변수 값 조회 (secrets.toml이 없어도 환경변수로 동작)"""
     try:
-        # API 키 확인
-        api_key = st.secrets.get('OPENAI_API_KEY') or os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            return "OpenAI API 키가 설정되지 않았습니다. 사이드바에서 API 키를 입력하거나 환경변수 OPENAI_API_KEY를 설정해주세요."
-        
-        # OpenAI 클라이언트 초기화
-        client = openai.OpenAI(api_key=api_key)
-        
-        # 시스템 프롬프트 생성
-        system_prompt = f"""당신은 뉴스 분석 전문가입니다. 다음 뉴스 정보를 바탕으로 사용자의 질문에 답변해주세요:
+        value = st.secrets.get(name)
+    except FileNotFoundError:
+        value = None
+    return value or os.getenv(name, '')
+
+def get_openai_api_key() -> str:
+    """secrets 또는 환경변수에서 OpenAI API 키 조회"""
+    return get_secret('OPENAI_API_KEY')
 
-{news_context}
+@st.fragment
+def display_chat_panel(stream_responses: bool):
+    """채팅 패널 (fragment로 분리되어 메시지를 보내도 이 영역만 다시 실행됨)"""
+    panel_start = time.perf_counter()
+    st.markdown("### 💬 뉴스 챗봇")
+    
+    # 채팅 히스토리 영역을 먼저 잡아두고 입력창은 그 아래에 배치
+    chat_container = st.container()
+    prompt = st.chat_input("뉴스에 대해 궁금한 것을 물어보세요...")
+    
+    with chat_container:
+        if not st.session_state.messages and not prompt:
+            with st.chat_message("assistant"):
+                st.write(f"안녕하세요! '{st.session_state.current_keyword}' 관련 뉴스에 대해 궁금한 것이 있으시면 언제든 물어보세요!")
+                # 검색 직후 만든 일괄 요약의 브리핑
+                if st.session_state.news_summary:
+                    st.markdown(f"**📝 브리핑**\n\n{st.session_state.news_summary['brief']}")
+        
+        for message in st.session_state.messages:
+            with st.chat_message(message["role"]):
+                st.write(message["content"])
+        
+        # 사용자 입력 (답변까지 이 자리에서 그리므로 다시 실행할 필요 없음)
+        if prompt:
+            answer_question(prompt, stream_responses)
+        
+        # 마지막 답변의 첫 토큰/전체 응답 시간과 전송한 프롬프트 토큰 수
+        if st.session_state.turn_stats:
+            turn_stats = st.session_state.turn_stats[-1]
+            st.caption(
+                f"⏱️ 첫 토큰 {turn_stats.get('ttft', 0):.2f}초 · 전체 {turn_stats.get('total', 0):.2f}초"
+                + (" · 💾 캐시된 답변" if turn_stats.get('cached')
+                   else f" · 프롬프트 {turn_stats.get('prompt_tokens', 0)}토큰")
+            )
+    
+    # 채팅 패널만 다시 그리는 데 걸린 시간 (전체 페이지 실행 시간과 비교용)
+    st.session_state.chat_panel_seconds = time.perf_counter() - panel_start
+    metrics.observe('chat_panel_run_seconds', st.session_state.chat_panel_seconds)
 
-위 뉴스들을 참고하여 정확하고 유용한 정보를 제공하며, 출처를 명시해주세요. 
-뉴스에 없는 내용에 대해서는 일반적인 지식을 바탕으로 도움이 되는 답변을 해주세요."""
+def load_backend_session(state: Dict[str, Any]):
+    """백엔드 세션 상태를 화면 표시용 session_state에 반영"""
+    st.session_state.news_articles = state['articles']
+    st.session_state.current_keyword = state['keyword']
+    st.session_state.search_errors = state['errors']
+    st.session_state.news_summary = state.get('summary')
+    st.session_state.summary_error = None
+    st.session_state.messages = state['messages']
+    st.session_state.turn_stats = state['turn_stats']
 
-        # 메시지 구성
-        api_messages = [{"role": "system", "content": system_prompt}]
-        api_messages.extend(messages)
-        
-        # OpenAI API 호출
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=api_messages,
-            max_tokens=1000,
-            temperature=0.7
-        )
-        
-        return response.choices[0].message.content
-        
-    except Exception as e:
-        return f"죄송합니다. 응답 생성 중 오류가 발생했습니다: {str(e)}"
+def answer_question(prompt: str, stream_responses: bool):
+    """사용자 질문과 챗봇 답변을 표시 (대화 기록은 백엔드 세션에 저장되고 여기서는 화면용 사본만 갱신)"""
+    backend = get_backend()
+    
+    # 사용자 메시지 표시
+    with st.chat_message("user"):
+        st.write(prompt)
+    
+    # 챗봇 응답 생성 (첫 질문의 캐시된 답변 재사용과 관련 기사 선택은 백엔드에서 처리)
+    with st.chat_message("assistant"):
+        turn_stats = {}
+        try:
+            if stream_responses:
+                response = st.write_stream(
+                    backend.stream_chat(st.session_state.session_id, prompt, get_openai_api_key(), turn_stats)
+                )
+            else:
+                with st.spinner("답변을 생성하고 있습니다..."):
+                    response = backend.chat(st.session_state.session_id, prompt, get_openai_api_key(), turn_stats)
+                    st.write(response)
+        except BackendError as e:
+            turn_stats['error'] = True
+            response = f"죄송합니다. 응답 생성 중 오류가 발생했습니다: {str(e)}"
+            st.write(response)
+    
+    st.session_state.messages.append({"role": "user", "content": prompt})
+    st.session_state.messages.append({"role": "assistant", "content": response})
+    st.session_state.turn_stats.append(turn_stats)
 
 def main():
-    # 세션 상태 초기화
+    page_start = time.perf_counter()
+    
+    # 지표 수집이 켜져 있으면 /metrics 서버를 프로세스당 한 번 시작
+    if metrics.enabled:
+        start_metrics_server()
+    
+    # 백엔드 API 없이 실행할 때 WATCH_CONFIG가 있으면 감시 워커를 이 프로세스에서 실행 (검색 캐시를 미리 채움)
+    if os.getenv('WATCH_CONFIG') and not BACKEND_URL:
+        from watch_worker import start_background_worker
+        start_background_worker()
+    
+    # 세션 상태 초기화 (대화/검색 결과의 원본은 백엔드 세션 저장소에 있음)
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
     if "messages" not in st.session_state:
         st.session_state.messages = []
     if "news_articles" not in st.session_state:
         st.session_state.news_articles = []
     if "current_keyword" not in st.session_state:
         st.session_state.current_keyword = ""
+    if "search_errors" not in st.session_state:
+        st.session_state.search_errors = {}
+    if "news_page" not in st.session_state:
+        st.session_state.news_page = 0
+    if "email_job_id" not in st.session_state:
+        st.session_state.email_job_id = None
+    if "email_job_result" not in st.session_state:
+        st.session_state.email_job_result = None
+    if "news_summary" not in st.session_state:
+        st.session_state.news_summary = None
+    if "summary_error" not in st.session_state:
+        st.session_state.summary_error = None
+    if "summary_pending" not in st.session_state:
+        st.session_state.summary_pending = False
+    if "turn_stats" not in st.session_state:
+        st.session_state.turn_stats = []
     
     # 사이드바
     with st.sidebar:
@@ -325,7 +302,7 @@ def main():
         openai_key = st.text_input(
             "OpenAI API Key:",
             type="password",
-            value=st.secrets.get('OPENAI_API_KEY', '') or os.getenv('OPENAI_API_KEY', ''),
+            value=get_secret('OPENAI_API_KEY'),
             help="챗봇 기능을 위한 OpenAI API 키"
         )
         if openai_key:
@@ -335,10 +312,18 @@ def main():
         news_api_key = st.text_input(
             "NewsAPI Key (선택사항):",
             type="password",
-            value=st.secrets.get('NEWS_API_KEY', '') or os.getenv('NEWS_API_KEY', ''),
+            value=get_secret('NEWS_API_KEY'),
             help="실제 뉴스 검색을 위한 NewsAPI 키 (없으면 모의 데이터 사용)"
         )
         
+        # Guardian API 키
+        guardian_api_key = st.text_input(
+            "Guardian API Key (선택사항):",
+            type="password",
+            value=get_secret('GUARDIAN_API_KEY'),
+            help="The Guardian 뉴스 검색을 위한 API 키"
+        )
+        
         st.divider()
         
         # 이메일 설정
@@ -346,20 +331,21 @@ def main():
         
         sender_email = st.text_input(
             "발신자 이메일:",
-            value=st.secrets.get('SENDER_EMAIL', '') or os.getenv('SENDER_EMAIL', ''),
+            value=get_secret('SENDER_EMAIL'),
             placeholder="your-email@gmail.com"
         )
         
         sender_password = st.text_input(
             "발신자 이메일 비밀번호:",
             type="password",
-            value=st.secrets.get('SENDER_PASSWORD', '') or os.getenv('SENDER_PASSWORD', ''),
+            value=get_secret('SENDER_PASSWORD'),
             help="Gmail의 경우 앱 비밀번호를 사용하세요"
         )
         
         recipient_email = st.text_input(
             "수신자 이메일:",
-            placeholder="recipient@example.com"
+            placeholder="recipient@example.com",
+            help="여러 명에게 보내려면 쉼표로 구분하세요"
         )
         
         st.divider()
@@ -371,46 +357,75 @@ def main():
             placeholder="예: 인공지능, 경제, 스포츠"
         )
         
+        # 여러 소스 동시 검색
+        search_all = st.checkbox(
+            "모든 소스 동시 검색",
+            help="API 키가 있는 모든 뉴스 소스를 동시에 검색하고 중복을 제거하여 최신순으로 합칩니다"
+        )
+        
         # 검색 버튼
         if st.button("🔍 뉴스 검색", use_container_width=True):
             if keyword:
                 with st.spinner("뉴스를 검색하고 있습니다..."):
-                    if news_api_key:
-                        articles = get_news_from_newsapi(keyword, news_api_key)
-                    else:
-                        articles = get_mock_news(keyword)
-                    
-                    st.session_state.news_articles = articles
-                    st.session_state.current_keyword = keyword
-                    st.session_state.messages = []  # 새 검색 시 채팅 초기화
+                    api_keys = {'newsapi': news_api_key, 'guardian': guardian_api_key}
+                    try:
+                        # 새 검색이면 백엔드에서 채팅도 초기화됨
+                        state = get_backend().search(st.session_state.session_id, keyword, api_keys, search_all)
+                    except BackendError as e:
+                        st.error(f"뉴스 검색 중 오류가 발생했습니다: {str(e)}")
+                        state = None
+                if state is not None:
+                    load_backend_session(state)
+                    st.session_state.news_page = 0
+                    # 요약은 검색 결과를 먼저 보여준 뒤 페이지 끝에서 생성
+                    st.session_state.summary_pending = bool(state['articles'] and openai_key)
                     st.rerun()
             else:
                 st.warning("키워드를 입력해주세요.")
         
+        # 스트리밍 응답
+        stream_responses = st.checkbox(
+            "답변 스트리밍",
+            value=True,
+            help="답변을 생성되는 대로 바로 표시합니다"
+        )
+        
         # 채팅 초기화 버튼
         if st.button("💬 채팅 초기화", use_container_width=True):
-            st.session_state.messages = []
-            st.rerun()
+            try:
+                load_backend_session(get_backend().reset_messages(st.session_state.session_id))
+                st.rerun()
+            except BackendError as e:
+                st.error(f"채팅 초기화 중 오류가 발생했습니다: {str(e)}")
         
         st.divider()
         
         # 이메일 전송 버튼
         if st.session_state.news_articles and sender_email and sender_password and recipient_email:
             if st.button("📧 뉴스 요약 이메일 전송", use_container_width=True):
-                with st.spinner("이메일을 전송하고 있습니다..."):
-                    success = send_news_email(
+                recipients = [email.strip() for email in recipient_email.split(',') if email.strip()]
+                st.session_state.email_job_result = None
+                try:
+                    st.session_state.email_job_id = queue_news_email(
                         st.session_state.news_articles,
                         st.session_state.current_keyword,
-                        recipient_email,
+                        recipients,
                         sender_email,
-                        sender_password
+                        sender_password,
+                        summary=st.session_state.news_summary
                     )
-                    if success:
-                        st.success(f"✅ {recipient_email}로 뉴스 요약이 전송되었습니다!")
-                    else:
-                        st.error("❌ 이메일 전송에 실패했습니다.")
+                except BackendError as e:
+                    st.error(f"이메일 전송 요청 중 오류가 발생했습니다: {str(e)}")
+            if st.session_state.email_job_id:
+                display_email_job_status()
+            elif st.session_state.email_job_result:
+                display_email_job_result(st.session_state.email_job_result)
         elif st.session_state.news_articles:
             st.info("📧 이메일 전송을 위해 발신자/수신자 정보를 입력해주세요.")
+        
+        # 개발자용 성능 지표
+        if METRICS_DEV_PANEL:
+            display_metrics_panel()
     
     # 메인 화면
     st.title("📰 뉴스 챗봇")
@@ -423,48 +438,14 @@ def main():
         
         with news_col:
             st.markdown("### 📰 뉴스 목록")
+            for provider_name, error in st.session_state.search_errors.items():
+                st.warning(f"{provider_name} 검색 실패: {error}")
+            if st.session_state.summary_error:
+                st.caption(f"기사 요약을 만들지 못했습니다: {st.session_state.summary_error}")
             display_news_grid(st.session_state.news_articles)
         
         with chat_col:
-            st.markdown("### 💬 뉴스 챗봇")
-            
-            # 채팅 히스토리 표시
-            chat_container = st.container()
-            with chat_container:
-                if not st.session_state.messages:
-                    with st.chat_message("assistant"):
-                        st.write(f"안녕하세요! '{st.session_state.current_keyword}' 관련 뉴스에 대해 궁금한 것이 있으시면 언제든 물어보세요!")
-                
-                for message in st.session_state.messages:
-                    with st.chat_message(message["role"]):
-                        st.write(message["content"])
-            
-            # 사용자 입력
-            if prompt := st.chat_input("뉴스에 대해 궁금한 것을 물어보세요..."):
-                # 사용자 메시지 추가
-                st.session_state.messages.append({"role": "user", "content": prompt})
-                
-                # 사용자 메시지 표시
-                with st.chat_message("user"):
-                    st.write(prompt)
-                
-                # 뉴스 컨텍스트 생성
-                news_context = ""
-                for i, article in enumerate(st.session_state.news_articles):
-                    news_context += f"\n뉴스 {i+1}:\n"
-                    news_context += f"제목: {article.get('title', '')}\n"
-                    news_context += f"출처: {article.get('source', {}).get('name', '')}\n"
-                    news_context += f"내용: {truncate_text(article.get('description', ''), 200)}\n"
-                
-                # 챗봇 응답 생성
-                with st.chat_message("assistant"):
-                    with st.spinner("답변을 생성하고 있습니다..."):
-                        response = get_chatbot_response(st.session_state.messages, news_context)
-                        st.write(response)
-                
-                # 챗봇 응답 추가
-                st.session_state.messages.append({"role": "assistant", "content": response})
-                st.rerun()
+            display_chat_panel(stream_responses)
     
     else:
         st.info("좌측 사이드바에서 관심 키워드를 입력하고 검색 버튼을 눌러주세요.")
@@ -492,8 +473,22 @@ def main():
         3. 생성된 앱 비밀번호를 '발신자 이메일 비밀번호'에 입력
         
         **기타 이메일 서비스:**
-        - 각 서비스의 SMTP 설정을 확인하여 사용
+        - 발송 서버는 서버의 SMTP_SERVER/SMTP_PORT 설정을 따름 (관리자에게 문의)
         """)
+    
+    # 전체 페이지 실행 시간
+    st.session_state.page_run_seconds = time.perf_counter() - page_start
+    metrics.observe('page_run_seconds', st.session_state.page_run_seconds)
+    
+    # 검색 결과를 다 그린 뒤 기사별 요약과 브리핑을 검색당 한 번 생성 (카드, 채팅, 이메일에서 재사용)
+    if st.session_state.summary_pending:
+        with st.spinner("기사를 요약하고 있습니다..."):
+            try:
+                st.session_state.news_summary = get_backend().summarize(st.session_state.session_id, openai_key)
+            except Exception as e:
+                st.session_state.summary_error = str(e)
+        st.session_state.summary_pending = False
+        st.rerun()
 
 if __name__ == "__main__":
     main()
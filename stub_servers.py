@@ -0,0 +1,289 @@
+"""네트워크 없이 성능을 측정하기 위한 로컬 가짜 서버"""
+import json
+import random
+import re
+import socketserver
+import threading
+import time
+from contextlib import contextmanager
+from email import message_from_bytes
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+
+def fake_newsapi_articles(keyword: str, count: int = 10) -> List[Dict[str, Any]]:
+    """NewsAPI /v2/everything 형식의 가짜 기사 목록"""
+    return [
+        {
+            'title': f'{keyword} 관련 테스트 뉴스 {i+1}',
+            'description': f'{keyword}에 대한 테스트 기사 {i+1}번 본문입니다.',
+            'url': f'https://stub.local/newsapi/{i+1}',
+            'urlToImage': '',
+            'source': {'name': 'Stub NewsAPI'},
+            'publishedAt': f'2024-01-15T{10 + i % 10:02d}:00:00Z'
+        }
+        for i in range(count)
+    ]
+
+
+def fake_guardian_results(keyword: str, count: int = 10) -> List[Dict[str, Any]]:
+    """Guardian /search 형식의 가짜 결과 목록"""
+    return [
+        {
+            'webTitle': f'{keyword} stub story {i+1}',
+            'webUrl': f'https://stub.local/guardian/{i+1}',
+            'webPublicationDate': f'2024-01-15T{10 + i % 10:02d}:30:00Z',
+            'fields': {'trailText': f'Stub trail text {i+1} about {keyword}.', 'thumbnail': ''}
+        }
+        for i in range(count)
+    ]
+
+
+def fake_completion_tokens(count: int) -> List[str]:
+    """챗봇 답변을 흉내내는 토큰 목록"""
+    words = ['이번', ' 뉴스에', ' 따르면', ' 관련', ' 업계가', ' 빠르게', ' 변화하고', ' 있습니다.']
+    return [words[i % len(words)] for i in range(count)]
+
+
+def fake_summary_json(article_count: int) -> str:
+    """일괄 요약(JSON 모드) 응답을 흉내내는 JSON 문자열"""
+    return json.dumps({
+        'brief': '테스트 기사들은 관련 업계의 빠른 변화를 다루고 있습니다.',
+        'articles': [{'id': i + 1, 'summary': f'테스트 기사 {i+1}번 요약입니다.'} for i in range(article_count)],
+    }, ensure_ascii=False)
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """NewsAPI/Guardian/OpenAI 엔드포인트를 흉내내는 keep-alive 핸들러"""
+
+    protocol_version = 'HTTP/1.1'
+    # 헤더/본문 분할 전송 시 delayed ACK로 keep-alive 응답이 40ms씩 밀리는 것을 방지
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        # 새 연결마다 TCP+TLS 핸드셰이크 비용을 흉내냄
+        if self.server.connect_latency:
+            time.sleep(self.server.connect_latency)
+        self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, payload: Any, headers: Dict[str, str] = None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        server.requests += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and random.random() < server.error_rate:
+            self._send_json(503, {'status': 'error'}, {'Retry-After': '0'})
+            return
+
+        parsed = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        keyword = query.get('q', '')
+        if parsed.path == '/v2/everything':
+            count = int(query.get('pageSize', 10))
+            articles = fake_newsapi_articles(keyword, count)
+            self._send_json(200, {'status': 'ok', 'totalResults': len(articles), 'articles': articles})
+        elif parsed.path == '/search':
+            count = int(query.get('page-size', 10))
+            self._send_json(200, {'response': {'status': 'ok', 'results': fake_guardian_results(keyword, count)}})
+        else:
+            self._send_json(404, {'status': 'error', 'message': 'not found'})
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(f'{len(data):x}\r\n'.encode('ascii') + data + b'\r\n')
+        self.wfile.flush()
+
+    def _stream_completion(self, tokens: List[str]):
+        """OpenAI chat.completions 스트리밍(SSE) 응답"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for i, token in enumerate(tokens):
+            if i and self.server.chunk_latency:
+                time.sleep(self.server.chunk_latency)
+            chunk = {
+                'id': 'chatcmpl-stub', 'object': 'chat.completion.chunk', 'created': int(time.time()),
+                'model': 'gpt-4o-mini',
+                'choices': [{'index': 0, 'delta': {'content': token}, 'finish_reason': None}]
+            }
+            self._write_chunk(f'data: {json.dumps(chunk, ensure_ascii=False)}\n\n'.encode('utf-8'))
+        self._write_chunk(b'data: [DONE]\n\n')
+        self._write_chunk(b'')
+
+    def do_POST(self):
+        server = self.server
+        server.requests += 1
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if server.latency:
+            time.sleep(server.latency)
+        if server.error_rate and random.random() < server.error_rate:
+            self._send_json(503, {'error': {'message': 'stub error'}}, {'Retry-After': '0'})
+            return
+        if not self.path.endswith('/chat/completions'):
+            self._send_json(404, {'error': {'message': 'not found'}})
+            return
+
+        tokens = fake_completion_tokens(server.reply_tokens)
+        if (body.get('response_format') or {}).get('type') == 'json_object':
+            # 요청 본문의 [번호] 기사 수만큼 요약 생성
+            prompt = body['messages'][-1]['content']
+            tokens = [fake_summary_json(len(re.findall(r'^\[\d+\]', prompt, re.MULTILINE)))]
+        if body.get('stream'):
+            self._stream_completion(tokens)
+            return
+        # 비스트리밍 응답은 모든 토큰이 생성될 때까지 기다린 뒤 반환
+        if server.chunk_latency:
+            time.sleep(server.chunk_latency * (len(tokens) - 1))
+        self._send_json(200, {
+            'id': 'chatcmpl-stub', 'object': 'chat.completion', 'created': int(time.time()),
+            'model': 'gpt-4o-mini',
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': ''.join(tokens)},
+                         'finish_reason': 'stop'}],
+            'usage': {'prompt_tokens': 0, 'completion_tokens': len(tokens), 'total_tokens': len(tokens)}
+        })
+
+
+@contextmanager
+def run_stub_server(latency: float = 0.0, connect_latency: float = 0.0,
+                    error_rate: float = 0.0, chunk_latency: float = 0.0, reply_tokens: int = 50,
+                    handler=StubHandler) -> Iterator[ThreadingHTTPServer]:
+    """백그라운드 스레드에서 가짜 서버 실행 (server.base_url로 접근)
+
+    chunk_latency/reply_tokens는 가짜 OpenAI 답변의 토큰 간격(초)과 토큰 수
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.connect_latency = connect_latency
+    server.error_rate = error_rate
+    server.chunk_latency = chunk_latency
+    server.reply_tokens = reply_tokens
+    server.requests = 0
+    server.connections = 0
+    server.base_url = f'http://127.0.0.1:{server.server_address[1]}'
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class StubSMTPHandler(socketserver.StreamRequestHandler):
+    """STARTTLS/AUTH 없이 메시지를 받아 server.messages에 저장하는 최소 SMTP 핸들러
+
+    server.faults[명령] 목록에 넣은 장애를 해당 명령이 들어올 때마다 하나씩 꺼내 적용한다
+    ('451' 같은 응답 코드는 그 코드로 응답, 'disconnect'는 응답 없이 연결 종료).
+    """
+
+    disable_nagle_algorithm = True
+
+    def reply(self, line: str):
+        self.wfile.write(f'{line}\r\n'.encode('ascii'))
+
+    def inject_fault(self, verb: str) -> Optional[str]:
+        """주입할 장애가 있으면 적용하고 그 내용을 반환"""
+        with self.server.faults_lock:
+            faults = self.server.faults.get(verb)
+            fault = faults.pop(0) if faults else None
+        if fault is not None and fault != 'disconnect':
+            self.reply(f'{fault} Injected stub failure')
+        return fault
+
+    def handle(self):
+        server = self.server
+        server.connections += 1
+        if server.connect_latency:
+            time.sleep(server.connect_latency)
+        self.reply('220 stub.local ESMTP')
+        recipients = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command.split(' ', 1)[0].upper()
+            if verb != 'DATA':
+                fault = self.inject_fault(verb)
+                if fault == 'disconnect':
+                    return
+                if fault is not None:
+                    continue
+            if verb == 'EHLO':
+                self.reply('250-stub.local')
+                self.reply('250 8BITMIME')
+            elif verb in ('HELO', 'NOOP', 'RSET', 'MAIL'):
+                if verb == 'RSET':
+                    recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipients.append(command.split(':', 1)[1].strip(' <>'))
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                lines = []
+                while True:
+                    data = self.rfile.readline()
+                    if not data or data in (b'.\r\n', b'.\n'):
+                        break
+                    lines.append(data[1:] if data.startswith(b'..') else data)
+                if server.latency:
+                    time.sleep(server.latency)
+                fault = self.inject_fault('DATA')
+                if fault == 'disconnect':
+                    return
+                if fault is None:
+                    if server.error_rate and random.random() < server.error_rate:
+                        self.reply('451 Temporary stub failure')
+                    else:
+                        server.messages.append((recipients, message_from_bytes(b''.join(lines))))
+                        self.reply('250 OK queued')
+                recipients = []
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('502 Command not implemented')
+
+
+class _ThreadingTCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+@contextmanager
+def run_stub_smtp_server(latency: float = 0.0, connect_latency: float = 0.0,
+                         error_rate: float = 0.0) -> Iterator[socketserver.ThreadingTCPServer]:
+    """백그라운드 스레드에서 가짜 SMTP 서버 실행 (server.host/server.port, 받은 메일은 server.messages)"""
+    server = _ThreadingTCPServer(('127.0.0.1', 0), StubSMTPHandler)
+    server.latency = latency
+    server.connect_latency = connect_latency
+    server.error_rate = error_rate
+    server.faults = {}
+    server.faults_lock = threading.Lock()
+    server.connections = 0
+    server.messages = []
+    server.host, server.port = server.server_address
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
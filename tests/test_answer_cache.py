@@ -0,0 +1,63 @@
+import numpy as np
+
+from answer_cache import AnswerCache, embed_question, normalize_question, question_terms
+
+
+def similarity(a: str, b: str) -> float:
+    return float(embed_question(normalize_question(a)) @ embed_question(normalize_question(b)))
+
+
+def test_exact_hit_ignores_case_spacing_and_punctuation():
+    cache = AnswerCache()
+    cache.store('set', 'What did Samsung announce?', 'answer', latency=1.5)
+
+    assert cache.lookup('set', '  what did samsung ANNOUNCE ') == 'answer'
+    assert cache.lookup('other-set', 'What did Samsung announce?') is None
+    stats = cache.stats()
+    assert stats['exact_hits'] == 1 and stats['misses'] == 1 and stats['saved_seconds'] == 1.5
+
+
+def test_semantic_tier_is_off_by_default():
+    cache = AnswerCache()
+    cache.store('set', 'What did Samsung announce?', 'answer', latency=1.0)
+
+    assert cache.lookup('set', 'What did Samsung announce today?') is None
+
+
+def test_semantic_tier_hits_above_threshold_and_misses_below():
+    stored, paraphrase = 'What did Samsung announce?', 'What did Samsung announce, please?'
+    score = similarity(stored, paraphrase)
+    assert question_terms(stored) == question_terms(paraphrase)
+    assert 0 < score < 1
+
+    above = AnswerCache(semantic=True, threshold=score - 1e-4)
+    above.store('set', stored, 'answer', latency=1.0)
+    assert above.lookup('set', paraphrase) == 'answer'
+    assert above.stats()['semantic_hits'] == 1
+
+    below = AnswerCache(semantic=True, threshold=score + 1e-4)
+    below.store('set', stored, 'answer', latency=1.0)
+    assert below.lookup('set', paraphrase) is None
+
+
+def test_semantic_tier_requires_same_numbers_and_content_words():
+    cache = AnswerCache(semantic=True, threshold=0.0)
+    cache.store('set', '3번 기사 매출이 증가했나요?', 'up', latency=1.0)
+
+    assert cache.lookup('set', '4번 기사 매출이 증가했나요?') is None
+    assert cache.lookup('set', '3번 기사 매출이 감소했나요?') is None
+    assert cache.lookup('set', '3번 기사 매출이 증가했나요') == 'up'
+
+
+def test_lru_eviction_drops_semantic_index_entries():
+    cache = AnswerCache(maxsize=1, semantic=True, threshold=0.0)
+    cache.store('a', 'first question', 'first', latency=1.0)
+    cache.store('b', 'second question', 'second', latency=1.0)
+
+    assert cache.lookup('a', 'first question') is None
+    assert cache.stats()['evictions'] == 1
+    assert cache.stats()['size'] == 1
+
+
+def test_embedding_is_unit_length():
+    assert np.isclose(np.linalg.norm(embed_question(normalize_question('삼성전자 실적'))), 1.0)
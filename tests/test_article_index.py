@@ -0,0 +1,47 @@
+from article_index import ArticleIndex, referenced_articles, tokenize
+
+
+def article(title, description=''):
+    return {'title': title, 'description': description}
+
+
+ARTICLES = [
+    article('Stock market closes flat', 'Investors wait for earnings.'),
+    article('AI chip demand surges', 'Nvidia and Samsung ramp up AI chip production.'),
+    article('Weather update', 'Rain expected over the weekend.'),
+    article('Chip export rules tighten', 'New rules limit chip exports.'),
+]
+
+
+def test_rank_orders_by_bm25_relevance_and_keeps_ties_in_original_order():
+    index = ArticleIndex(ARTICLES)
+
+    assert index.rank('AI chip') == [1, 3, 0, 2]
+    assert index.rank('no such words') == [0, 1, 2, 3]
+
+
+def test_rare_terms_outweigh_common_ones():
+    index = ArticleIndex(ARTICLES)
+    scores = index.scores('chip weather')
+
+    assert scores[2] > scores[1] > 0 and scores[0] == 0
+
+
+def test_korean_words_match_with_particles_attached():
+    assert '반도' in tokenize('반도체가')
+    index = ArticleIndex([article('금리 인상 발표'), article('반도체 수출이 늘었다'), article('날씨 소식')])
+
+    assert index.rank('반도체는 어떻게 되나요')[0] == 1
+
+
+def test_referenced_articles_follow_mention_order_and_ignore_out_of_range():
+    assert referenced_articles('3번 기사와 뉴스 1, article 9를 비교해줘', size=5) == [2, 0]
+    assert referenced_articles('기사 #2 요약해줘, 2번 말이야', size=5) == [1]
+
+
+def test_select_puts_referenced_articles_first_and_keeps_at_least_them():
+    index = ArticleIndex(ARTICLES)
+
+    assert index.select('AI chip', k=2) == [1, 3]
+    assert index.select('4번 기사와 AI chip', k=2) == [3, 1]
+    assert index.select('1번, 3번 기사와 4번 기사 비교', k=1) == [0, 2, 3]
@@ -0,0 +1,87 @@
+import os
+from datetime import datetime, timezone
+
+import pytest
+
+from article_store import ArticleStore
+
+
+def article(title, url, published='2024-01-15T10:00:00Z', description='', source='Source'):
+    return {'title': title, 'url': url, 'publishedAt': published, 'description': description,
+            'urlToImage': '', 'source': {'name': source}}
+
+
+def timestamp(value: str) -> float:
+    return datetime.fromisoformat(value).replace(tzinfo=timezone.utc).timestamp()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ArticleStore(str(tmp_path / 'articles.db'))
+
+
+def test_database_is_created_on_first_use(tmp_path):
+    path = tmp_path / 'nested' / 'articles.db'
+    store = ArticleStore(str(path))
+    assert not os.path.exists(path)
+
+    assert store.count() == 0
+    assert os.path.exists(path)
+
+
+def test_upsert_dedupes_by_canonical_url_and_updates_fields(store):
+    store.upsert_articles([article('Old title', 'https://www.example.com/a?utm_source=x')])
+    store.upsert_articles([article('New title', 'https://example.com/a/')])
+
+    assert store.count() == 1
+    assert store.search('title')[0]['title'] == 'New title'
+
+
+def test_articles_without_url_are_keyed_by_title(store):
+    assert store.upsert_articles([article('Same story', ''), article('Same story!', ''), article('', '')]) == 2
+    assert store.count() == 1
+
+
+def test_keyword_articles_are_newest_first_within_range(store):
+    store.record_search('newsapi', ' AI  Chips ', [
+        article('Older', 'https://a.com/1', published='2024-01-01T00:00:00Z'),
+        article('Newer', 'https://a.com/2', published='2024-02-01T00:00:00Z'),
+        article('Newest', 'https://a.com/3', published='2024-03-01T00:00:00Z'),
+    ])
+
+    titles = [a['title'] for a in store.keyword_articles('newsapi', 'ai chips')]
+    assert titles == ['Newest', 'Newer', 'Older']
+    in_range = store.keyword_articles('newsapi', 'ai chips', start=timestamp('2024-01-15'), end=timestamp('2024-02-15'))
+    assert [a['title'] for a in in_range] == ['Newer']
+    assert store.newest_published('newsapi', 'AI chips') == '2024-03-01T00:00:00Z'
+    assert store.last_fetched('newsapi', 'ai chips') is not None
+    assert store.keyword_articles('guardian', 'ai chips') == []
+
+
+def test_full_text_search_matches_all_terms_including_korean_substrings(store):
+    store.upsert_articles([
+        article('삼성전자 반도체 실적 발표', 'https://a.com/1', description='메모리 가격 상승'),
+        article('Chip exports tighten', 'https://a.com/2', description='New export rules for AI chips'),
+        article('Weather', 'https://a.com/3', description='Rain over the weekend'),
+    ])
+
+    assert [a['url'] for a in store.search('반도체')] == ['https://a.com/1']
+    assert [a['url'] for a in store.search('export AI')] == ['https://a.com/2']
+    assert store.search('export rain') == []
+    assert store.search('   ') == []
+
+
+def test_full_text_index_follows_updates(store):
+    store.upsert_articles([article('Original headline', 'https://a.com/1')])
+    store.upsert_articles([article('Rewritten headline', 'https://a.com/1')])
+
+    assert store.search('Original') == []
+    assert len(store.search('Rewritten')) == 1
+
+
+def test_summaries_round_trip_and_expire(store):
+    store.put_summary('set', {'brief': 'b', 'articles': {'https://a.com/1': 's'}})
+
+    assert store.get_summary('set') == {'brief': 'b', 'articles': {'https://a.com/1': 's'}}
+    assert store.get_summary('set', max_age=-1) is None
+    assert store.get_summary('missing') is None
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+import article_summary
+from article_store import ArticleStore
+from article_summary import get_summary, parse_summary, summaries_in_order
+from news_cache import TTLCache
+
+
+def make_articles(count):
+    return [{'title': f'T{i}', 'url': f'https://example.com/news/{i}?utm_source=feed'} for i in range(count)]
+
+
+def summary_response(articles):
+    return json.dumps({
+        'brief': '브리핑',
+        'articles': [{'id': i + 1, 'summary': f"summary of {a['title']}"} for i, a in enumerate(articles)],
+    })
+
+
+def test_summaries_follow_each_sessions_article_order():
+    articles = make_articles(3)
+    summary = parse_summary(summary_response(articles), articles)
+
+    reordered = list(reversed(articles))
+    assert summaries_in_order(summary, reordered)['summaries'] == ['summary of T2', 'summary of T1', 'summary of T0']
+
+
+def test_missing_and_invalid_items_become_empty_summaries():
+    articles = make_articles(3)
+    content = json.dumps({'brief': 'b', 'articles': [{'id': 2, 'summary': 's2'}, {'id': 'x'}, {'id': 9, 'summary': 's9'}]})
+
+    assert summaries_in_order(parse_summary(content, articles), articles)['summaries'] == ['', 's2', '']
+
+
+def test_brief_is_required():
+    with pytest.raises(ValueError):
+        parse_summary(json.dumps({'articles': []}), [])
+
+
+def test_reordered_article_set_reuses_summary_with_correct_mapping(monkeypatch, tmp_path):
+    calls = []
+
+    def fake_summarize(articles, keyword, api_key):
+        calls.append(articles)
+        return parse_summary(summary_response(articles), articles)
+
+    monkeypatch.setattr(article_summary, 'summarize_articles', fake_summarize)
+    monkeypatch.setattr(article_summary, 'article_store', ArticleStore(str(tmp_path / 'articles.db')))
+    monkeypatch.setattr(article_summary, 'summary_cache', TTLCache(maxsize=8, ttl=60, stale_ttl=0))
+
+    articles = make_articles(3)
+    first = get_summary('set', articles, 'k', 'key')
+    second = get_summary('set', list(reversed(articles)), 'k', 'key')
+
+    assert len(calls) == 1
+    assert first['summaries'] == ['summary of T0', 'summary of T1', 'summary of T2']
+    assert second['summaries'] == ['summary of T2', 'summary of T1', 'summary of T0']
+
@@ -0,0 +1,55 @@
+from chat_context import SUMMARY_TOKENS, build_news_context, count_message_tokens, fit_messages
+
+
+def conversation(turns, words=40):
+    messages = []
+    for i in range(turns):
+        messages.append({'role': 'user', 'content': f'question {i} ' + 'word ' * words})
+        messages.append({'role': 'assistant', 'content': f'answer {i} ' + 'word ' * words})
+    return messages
+
+
+def test_everything_fits_without_summary():
+    messages = conversation(2)
+    api_messages, used = fit_messages('system', messages, budget=10_000)
+
+    assert api_messages[1:] == messages
+    assert used == sum(count_message_tokens(m) for m in api_messages)
+
+
+def test_budget_drops_oldest_turns_and_summarizes_their_questions():
+    messages = conversation(6)
+    system = {'role': 'system', 'content': 'system'}
+    budget = count_message_tokens(system) + sum(count_message_tokens(m) for m in messages[-4:]) + SUMMARY_TOKENS + 10
+
+    api_messages, used = fit_messages('system', messages, budget=budget)
+
+    assert used <= budget
+    assert api_messages[-1] == messages[-1]
+    assert api_messages[-4:] == messages[-4:]
+    assert api_messages[1]['role'] == 'system'
+    assert '(이전 대화 8개 생략)' in api_messages[1]['content']
+    assert 'question 0' in api_messages[1]['content']
+
+
+def test_newest_turn_is_kept_even_when_it_alone_exceeds_budget():
+    messages = conversation(3)
+    messages.append({'role': 'user', 'content': 'latest ' + 'word ' * 2000})
+
+    api_messages, used = fit_messages('system', messages, budget=50)
+
+    assert api_messages[-1] == messages[-1]
+    assert messages[-2] not in api_messages
+    assert used > 50
+
+
+def test_news_context_stops_at_token_budget_and_keeps_article_numbers():
+    articles = [{'title': f'Title {i}', 'description': 'desc ' * 30, 'source': {'name': 'S'}} for i in range(10)]
+
+    unlimited = build_news_context(articles, max_tokens=None)
+    limited = build_news_context(articles, max_tokens=120)
+    picked = build_news_context(articles, max_tokens=None, indices=[4, 1])
+
+    assert '뉴스 10:' in unlimited
+    assert '뉴스 1:' in limited and '뉴스 10:' not in limited
+    assert picked.index('뉴스 5:') < picked.index('뉴스 2:') and '뉴스 1:' not in picked
@@ -0,0 +1,146 @@
+"""가짜 SMTP 서버(stub_servers)를 상대로 한 EmailQueue / SMTPConnectionPool 테스트"""
+import time
+from email.message import EmailMessage
+
+import pytest
+
+from email_queue import EmailQueue, SMTPConnectionPool
+from stub_servers import run_stub_smtp_server
+
+
+def make_message(recipient: str) -> EmailMessage:
+    message = EmailMessage()
+    message['From'] = 'sender@example.com'
+    message['To'] = recipient
+    message['Subject'] = 'test'
+    message.set_content('hello')
+    return message
+
+
+@pytest.fixture
+def smtp_server():
+    with run_stub_smtp_server() as server:
+        yield server
+
+
+def submit(email_queue: EmailQueue, server, recipients) -> str:
+    return email_queue.submit([make_message(r) for r in recipients], server.host, server.port,
+                              'sender@example.com', '', use_tls=False)
+
+
+def test_job_goes_from_queued_through_sending_to_done():
+    with run_stub_smtp_server(latency=0.2) as server:
+        email_queue = EmailQueue(backoff_base=0.01)
+        job_id = submit(email_queue, server, ['a@example.com', 'b@example.com'])
+        assert email_queue.status(job_id)['status'] in ('queued', 'sending')
+
+        seen = set()
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            job = email_queue.status(job_id)
+            seen.add(job['status'])
+            if job['finished_at'] is not None:
+                break
+            time.sleep(0.01)
+
+    assert 'sending' in seen
+    assert job['status'] == 'done'
+    assert (job['total'], job['sent'], job['failed']) == (2, 2, 0)
+    assert [recipients for recipients, _ in server.messages] == [['a@example.com'], ['b@example.com']]
+    # 한 작업의 메시지는 연결 하나로 전송
+    assert server.connections == 1
+
+
+def test_unknown_job_has_no_status():
+    assert EmailQueue().status('missing') is None
+
+
+def test_temporary_4xx_is_retried_on_same_connection(smtp_server):
+    smtp_server.faults['DATA'] = ['451', '452']
+    email_queue = EmailQueue(backoff_base=0.01)
+    job = email_queue.wait(submit(email_queue, smtp_server, ['a@example.com']), timeout=5)
+
+    assert job['status'] == 'done'
+    assert len(smtp_server.messages) == 1
+    assert smtp_server.connections == 1
+
+
+def test_disconnect_is_retried_on_new_connection(smtp_server):
+    smtp_server.faults['DATA'] = ['disconnect']
+    email_queue = EmailQueue(backoff_base=0.01)
+    job = email_queue.wait(submit(email_queue, smtp_server, ['a@example.com']), timeout=5)
+
+    assert job['status'] == 'done'
+    assert len(smtp_server.messages) == 1
+    assert smtp_server.connections == 2
+
+
+def test_permanent_5xx_is_not_retried(smtp_server):
+    smtp_server.faults['DATA'] = ['550', '550']
+    email_queue = EmailQueue(backoff_base=0.01)
+    job = email_queue.wait(submit(email_queue, smtp_server, ['a@example.com']), timeout=5)
+
+    assert job['status'] == 'failed'
+    assert job['failed'] == 1
+    assert '550' in job['errors'][0]
+    assert smtp_server.faults['DATA'] == ['550']
+
+
+def test_some_failed_messages_make_job_partial(smtp_server):
+    smtp_server.faults['DATA'] = ['550']
+    email_queue = EmailQueue(backoff_base=0.01)
+    job = email_queue.wait(submit(email_queue, smtp_server, ['a@example.com', 'b@example.com']), timeout=5)
+
+    assert job['status'] == 'partial'
+    assert (job['sent'], job['failed']) == (1, 1)
+    assert job['errors'][0].startswith('a@example.com:')
+
+
+def test_job_fails_when_retries_are_exhausted(smtp_server):
+    smtp_server.faults['DATA'] = ['451', '451', '451']
+    email_queue = EmailQueue(max_retries=2, backoff_base=0.01)
+    job = email_queue.wait(submit(email_queue, smtp_server, ['a@example.com']), timeout=5)
+
+    assert job['status'] == 'failed'
+    assert smtp_server.messages == []
+    assert smtp_server.faults['DATA'] == []
+
+
+def test_pool_reuses_connection_that_answers_noop(smtp_server):
+    pool = SMTPConnectionPool(idle_timeout=60)
+    key = (smtp_server.host, smtp_server.port, 'sender@example.com', False)
+
+    first = pool.get(key, '')
+    assert pool.get(key, '') is first
+    assert smtp_server.connections == 1
+    pool.discard(key)
+
+
+def test_pool_reconnects_when_noop_fails(smtp_server):
+    pool = SMTPConnectionPool(idle_timeout=60)
+    key = (smtp_server.host, smtp_server.port, 'sender@example.com', False)
+
+    first = pool.get(key, '')
+    smtp_server.faults['NOOP'] = ['disconnect']
+    second = pool.get(key, '')
+    assert second is not first
+    assert smtp_server.connections == 2
+    assert second.noop()[0] == 250
+    pool.discard(key)
+
+
+def test_pool_closes_idle_connections(smtp_server):
+    pool = SMTPConnectionPool(idle_timeout=0.05)
+    key = (smtp_server.host, smtp_server.port, 'sender@example.com', False)
+
+    first = pool.get(key, '')
+    time.sleep(0.1)
+    pool.close_idle()
+    assert first.sock is None
+    # 유휴 시간이 지난 연결은 NOOP 확인 없이 새로 맺음
+    smtp_server.faults['NOOP'] = ['500']
+    second = pool.get(key, '')
+    assert second is not first
+    assert smtp_server.connections == 2
+    assert smtp_server.faults['NOOP'] == ['500']
+    pool.discard(key)
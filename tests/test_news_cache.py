@@ -0,0 +1,152 @@
+import threading
+import time
+
+import pytest
+
+from news_cache import TTLCache, make_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def cached(cache: TTLCache, key):
+    """통계/LRU 순서에 영향 없이 저장된 값 (없으면 None)"""
+    entry = cache._entries.get(key)
+    return entry[0] if entry is not None else None
+
+
+def wait_until(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not met in time'
+        time.sleep(0.005)
+
+
+def test_make_key_normalizes_keyword_and_params():
+    assert make_key('newsapi', '  AI   News ', language='ko', page=1) == make_key('newsapi', 'ai news', page=1, language='ko')
+
+
+def test_fresh_value_is_served_without_reloading():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, stale_ttl=0, clock=clock)
+    assert cache.get_or_load('k', lambda: 1) == 1
+    clock.now = 9
+    assert cache.get_or_load('k', lambda: 2) == 1
+    assert cache.stats()['hits'] == 1
+
+
+def test_expired_value_is_reloaded_after_stale_window():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, stale_ttl=5, clock=clock)
+    cache.get_or_load('k', lambda: 1)
+    clock.now = 15
+    assert cache.get_or_load('k', lambda: 2) == 2
+
+
+def test_stale_value_is_served_while_one_background_refresh_runs():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, stale_ttl=100, clock=clock)
+    cache.get_or_load('k', lambda: 'old')
+    clock.now = 20
+
+    release = threading.Event()
+    refreshes = []
+
+    def refresh():
+        refreshes.append(1)
+        release.wait(2)
+        return 'new'
+
+    assert cache.get_or_load('k', refresh) == 'old'
+    assert cache.get_or_load('k', refresh) == 'old'
+    release.set()
+    wait_until(lambda: cached(cache, 'k') == 'new')
+    assert refreshes == [1]
+    assert cache.get_or_load('k', refresh) == 'new'
+    assert cache.stats()['stale_hits'] == 2
+
+
+def test_failed_refresh_keeps_stale_value():
+    clock = FakeClock()
+    cache = TTLCache(ttl=10, stale_ttl=100, clock=clock)
+    cache.get_or_load('k', lambda: 'old')
+    clock.now = 20
+
+    def fail():
+        raise RuntimeError('upstream down')
+
+    assert cache.get_or_load('k', fail) == 'old'
+    wait_until(lambda: cache.stats()['refresh_errors'] == 1)
+    assert cached(cache, 'k') == 'old'
+
+
+def test_concurrent_misses_are_coalesced_into_one_load():
+    cache = TTLCache(ttl=60, stale_ttl=0)
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.1)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load('k', load))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ['value'] * 5
+    stats = cache.stats()
+    assert (stats['misses'], stats['coalesced']) == (1, 4)
+
+
+def test_load_error_reaches_all_waiters_and_is_not_cached():
+    cache = TTLCache(ttl=60, stale_ttl=0)
+
+    def fail():
+        time.sleep(0.05)
+        raise ValueError('boom')
+
+    errors = []
+
+    def call():
+        try:
+            cache.get_or_load('k', fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3
+    assert cache.get_or_load('k', lambda: 'ok') == 'ok'
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache(maxsize=2, ttl=60, stale_ttl=0)
+    cache.get_or_load('a', lambda: 1)
+    cache.get_or_load('b', lambda: 2)
+    cache.get_or_load('a', lambda: 1)
+    cache.get_or_load('c', lambda: 3)
+
+    assert cached(cache, 'b') is None
+    assert cached(cache, 'a') == 1
+    assert cache.stats()['evictions'] == 1
+
+
+@pytest.mark.parametrize('key', [None, 'a'])
+def test_invalidate(key):
+    cache = TTLCache()
+    cache.get_or_load('a', lambda: 1)
+    cache.invalidate(key)
+    assert cached(cache, 'a') is None
@@ -0,0 +1,59 @@
+from article_utils import canonical_url, normalize_title, published_timestamp
+from news_providers import merge_articles
+
+
+def article(title, url='', published='2024-01-15T10:00:00Z', source='Source'):
+    return {'title': title, 'url': url, 'publishedAt': published, 'source': {'name': source}}
+
+
+def test_canonical_url_drops_tracking_params_fragment_and_www():
+    assert (canonical_url('http://WWW.Example.com/news/1/?utm_source=x&b=2&a=1#top')
+            == canonical_url('https://example.com/news/1?a=1&b=2'))
+
+
+def test_canonical_url_keeps_meaningful_params():
+    assert canonical_url('https://example.com/view?id=1') != canonical_url('https://example.com/view?id=2')
+
+
+def test_canonical_url_falls_back_to_raw_url_when_malformed():
+    assert canonical_url('  http://[broken/x ') == 'http://[broken/x'
+    assert canonical_url('') == ''
+
+
+def test_normalize_title_strips_source_suffix_and_punctuation():
+    assert normalize_title(article('AI, Chips: Rally! - Reuters', source='Reuters')) == 'ai chips rally'
+
+
+def test_published_timestamp_sorts_invalid_dates_last():
+    assert published_timestamp({'publishedAt': 'not a date'}) == float('-inf')
+    assert published_timestamp({'publishedAt': '2024-01-15T10:00:00'}) == published_timestamp(
+        {'publishedAt': '2024-01-15T10:00:00Z'})
+
+
+def test_merge_dedupes_by_canonical_url_keeping_first_provider():
+    first = article('Chip stocks rally', 'https://www.example.com/a?utm_source=newsapi', source='NewsAPI')
+    second = article('Completely different wording', 'https://example.com/a/', source='Guardian')
+
+    assert merge_articles([[first], [second]]) == [first]
+
+
+def test_merge_dedupes_near_identical_titles():
+    first = article('Samsung unveils new foldable phone - Reuters', 'https://a.com/1', source='Reuters')
+    second = article('Samsung unveils new foldable phone today', 'https://b.com/2')
+
+    assert merge_articles([[first], [second]]) == [first]
+
+
+def test_merge_keeps_titles_that_differ_in_numbers():
+    q1 = article('Samsung Q1 profit 2024 rises', 'https://a.com/1')
+    q2 = article('Samsung Q1 profit 2023 rises', 'https://a.com/2')
+
+    assert len(merge_articles([[q1], [q2]])) == 2
+
+
+def test_merge_sorts_newest_first_and_survives_malformed_urls():
+    old = article('Old story', 'http://[broken/x', published='2024-01-01T00:00:00Z')
+    new = article('New story', 'https://a.com/new', published='2024-02-01T00:00:00Z')
+    undated = article('Undated story', 'https://a.com/undated', published='')
+
+    assert merge_articles([[old, undated], [new]]) == [new, old, undated]
@@ -0,0 +1,70 @@
+import asyncio
+import threading
+
+import pytest
+
+from openai_clients import AsyncOpenAIClientRegistry
+
+
+class FakeAsyncClient:
+    def __init__(self, api_key, base_url=None):
+        self.api_key = api_key
+        self.closed_on = None
+
+    async def close(self):
+        self.closed_on = asyncio.get_running_loop()
+
+
+class FakeRegistry(AsyncOpenAIClientRegistry):
+    client_class = FakeAsyncClient
+
+
+@pytest.fixture
+def background_loop():
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    yield loop
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+async def _get(registry, api_key):
+    return registry.get(api_key)
+
+
+def test_idle_client_is_closed_on_the_loop_that_used_it(background_loop):
+    registry = FakeRegistry(idle_timeout=0)
+    client = asyncio.run_coroutine_threadsafe(_get(registry, 'a'), background_loop).result()
+
+    registry.get('b')
+    for task in list(registry._closing):
+        task.result(timeout=2)
+
+    assert client.closed_on is background_loop
+    assert not registry._closing
+
+
+def test_close_tasks_are_kept_until_done():
+    registry = FakeRegistry()
+
+    async def main():
+        client = registry.get('a')
+        registry.close_all()
+        assert len(registry._closing) == 1
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return client
+
+    client = asyncio.run(main())
+    assert client.closed_on is not None
+    assert not registry._closing
+
+
+def test_client_never_used_in_a_loop_is_closed_directly():
+    registry = FakeRegistry()
+    client = registry.get('a')
+    registry.close_all()
+
+    assert client.closed_on is not None
@@ -0,0 +1,210 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from rate_limit import (BACKGROUND, INTERACTIVE, KeyedRateLimiter, RateLimitExceeded, SingleFlight,
+                        SQLiteTokenBucket, TokenBucket, parse_rate_limits)
+
+
+class FakeClock:
+    """sleep하면 시간이 그만큼 흐르는 가짜 시계"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_limiter(clock: FakeClock, rate: float, burst: float, **kwargs) -> KeyedRateLimiter:
+    return KeyedRateLimiter({'p': (rate, burst)}, clock=clock, sleep=clock.sleep, **kwargs)
+
+
+def test_parse_rate_limits():
+    assert parse_rate_limits('newsapi=1/5, openai=8,') == {'newsapi': (1.0, 5.0), 'openai': (8.0, 8.0)}
+    assert parse_rate_limits('') == {}
+
+
+def test_token_bucket_reserve_keeps_tokens_back():
+    clock = FakeClock()
+    bucket = TokenBucket(1.0, 2.0, clock=clock)
+    assert bucket.try_acquire(reserve=1.0) == 0.0
+    assert bucket.try_acquire(reserve=1.0) == pytest.approx(1.0)
+    assert bucket.try_acquire() == 0.0
+
+
+def test_burst_then_paced_at_rate():
+    clock = FakeClock()
+    limiter = make_limiter(clock, rate=2.0, burst=2.0)
+    for _ in range(4):
+        limiter.acquire('p', 'key')
+    assert clock.sleeps == [pytest.approx(0.5), pytest.approx(0.5)]
+    assert clock.now == pytest.approx(1.0)
+
+
+def test_interactive_request_times_out_instead_of_waiting_past_max_wait():
+    clock = FakeClock()
+    limiter = make_limiter(clock, rate=1.0, burst=1.0, max_wait=0.5)
+    limiter.acquire('p', 'key')
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire('p', 'key')
+    assert clock.sleeps == []
+
+
+def test_background_wait_is_bounded():
+    clock = FakeClock()
+    limiter = make_limiter(clock, rate=0.1, burst=1.0, background_max_wait=5)
+    limiter.acquire('p', 'key', BACKGROUND)
+    with pytest.raises(RateLimitExceeded):
+        limiter.acquire('p', 'key', BACKGROUND)
+
+
+def test_background_leaves_a_token_for_interactive_requests():
+    clock = FakeClock()
+    limiter = make_limiter(clock, rate=1.0, burst=3.0)
+    limiter.acquire('p', 'key', BACKGROUND)
+    limiter.acquire('p', 'key', BACKGROUND)
+    assert clock.sleeps == []
+    limiter.acquire('p', 'key', BACKGROUND)
+    assert clock.sleeps == [pytest.approx(1.0)]
+
+    clock.sleeps.clear()
+    limiter.acquire('p', 'key', INTERACTIVE)
+    assert clock.sleeps == []
+
+
+def test_keys_and_unlisted_providers_are_independent():
+    clock = FakeClock()
+    limiter = make_limiter(clock, rate=1.0, burst=1.0)
+    limiter.acquire('p', 'key-a')
+    limiter.acquire('p', 'key-b')
+    for _ in range(10):
+        limiter.acquire('other', 'key-a')
+    assert clock.sleeps == []
+
+
+def test_waiting_interactive_request_goes_before_background():
+    limiter = KeyedRateLimiter({'p': (10.0, 1.0)}, max_wait=5)
+    limiter.acquire('p', 'key')
+    order = []
+    background = threading.Thread(target=lambda: (limiter.acquire('p', 'key', BACKGROUND), order.append('bg')))
+    interactive = threading.Thread(target=lambda: (limiter.acquire('p', 'key'), order.append('fg')))
+    background.start()
+    time.sleep(0.02)
+    interactive.start()
+    background.join()
+    interactive.join()
+    assert order == ['fg', 'bg']
+
+
+def test_async_acquire_paces_requests():
+    limiter = KeyedRateLimiter({'p': (20.0, 1.0)})
+
+    async def run():
+        start = time.monotonic()
+        for _ in range(3):
+            await limiter.aacquire('p', 'key')
+        return time.monotonic() - start
+
+    assert asyncio.run(run()) >= 0.09
+
+
+def test_sqlite_buckets_are_shared(tmp_path):
+    path = str(tmp_path / 'limits.db')
+    first = KeyedRateLimiter({'p': (0.5, 2.0)}, max_wait=0.1, db_path=path)
+    second = KeyedRateLimiter({'p': (0.5, 2.0)}, max_wait=0.1, db_path=path)
+    first.acquire('p', 'key')
+    second.acquire('p', 'key')
+    with pytest.raises(RateLimitExceeded):
+        first.acquire('p', 'key')
+    # 다른 키는 별도 버킷
+    second.acquire('p', 'other')
+
+
+def test_sqlite_bucket_refills_from_stored_state(tmp_path):
+    path = str(tmp_path / 'limits.db')
+    assert SQLiteTokenBucket(path, 'k', rate=100.0, burst=1.0).try_acquire() == 0.0
+    assert SQLiteTokenBucket(path, 'k', rate=100.0, burst=1.0).try_acquire() > 0.0
+    time.sleep(0.02)
+    assert SQLiteTokenBucket(path, 'k', rate=100.0, burst=1.0).try_acquire() == 0.0
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+    errors = [None] * count
+
+    def run(i):
+        try:
+            results[i] = target()
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_single_flight_runs_once_and_copies_result_for_every_caller():
+    flight = SingleFlight('test')
+    calls = []
+
+    def load():
+        calls.append(1)
+        time.sleep(0.1)
+        return {'articles': [1, 2]}
+
+    results, errors = run_concurrently(5, lambda: flight.do('key', load))
+    assert len(calls) == 1
+    assert errors == [None] * 5
+    assert all(result == {'articles': [1, 2]} for result in results)
+    assert len({id(result) for result in results}) == 5
+
+    results[0]['articles'].append(3)
+    assert results[1] == {'articles': [1, 2]}
+
+
+def test_single_flight_propagates_errors_and_forgets_failed_calls():
+    flight = SingleFlight('test')
+
+    def fail():
+        time.sleep(0.05)
+        raise ValueError('upstream down')
+
+    _, errors = run_concurrently(3, lambda: flight.do('key', fail))
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert flight.do('key', lambda: 'ok') == 'ok'
+
+
+def test_async_single_flight():
+    flight = SingleFlight('test')
+    calls = []
+
+    async def load():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return [1]
+
+    async def fail():
+        await asyncio.sleep(0.05)
+        raise ValueError('boom')
+
+    async def run():
+        results = await asyncio.gather(*[flight.ado('a', load) for _ in range(4)])
+        errors = await asyncio.gather(*[flight.ado('b', fail) for _ in range(3)], return_exceptions=True)
+        return results, errors
+
+    results, errors = asyncio.run(run())
+    assert len(calls) == 1
+    assert results == [[1]] * 4
+    assert len({id(result) for result in results}) == 4
+    assert all(isinstance(error, ValueError) for error in errors)
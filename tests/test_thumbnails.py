@@ -0,0 +1,129 @@
+import io
+import os
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+import thumbnails
+from thumbnails import check_public_url, get_thumbnail, get_thumbnails, placeholder_image
+
+
+@pytest.mark.parametrize('url', [
+    'http://169.254.169.254/latest/meta-data/',
+    'http://127.0.0.1:8080/image.png',
+    'http://10.0.0.5/image.png',
+    'http://[::1]/image.png',
+    'http://[::ffff:192.168.0.1]/image.png',
+    'file:///etc/passwd',
+    'ftp://93.184.216.34/image.png',
+])
+def test_rejects_non_public_urls(url):
+    with pytest.raises(ValueError):
+        check_public_url(url)
+
+
+def test_accepts_public_address():
+    check_public_url('https://93.184.216.34/image.png')
+
+
+@pytest.mark.parametrize('url', ['http://[not-an-ip/image.png', 'http://169.254.169.254/latest/meta-data/'])
+def test_rejected_urls_fall_back_to_placeholder(url):
+    assert get_thumbnail(url) == placeholder_image('No Image')
+
+
+class ImageHandler(BaseHTTPRequestHandler):
+    requests = []
+    delay = 0.0
+
+    def do_GET(self):
+        type(self).requests.append((self.path, self.headers['Host']))
+        time.sleep(self.delay)
+        if self.path.startswith('/redirect'):
+            self.send_response(302)
+            self.send_header('Location', '/image.png')
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if self.path.startswith('/missing'):
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = placeholder_image('remote', 600, 400)
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def image_server(monkeypatch, tmp_path):
+    """images.test 호스트를 검사가 승인한 127.0.0.1로 연결하는 로컬 이미지 서버"""
+    ImageHandler.requests = []
+    ImageHandler.delay = 0.0
+    server = ThreadingHTTPServer(('127.0.0.1', 0), ImageHandler)
+    threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True).start()
+    monkeypatch.setattr(thumbnails, 'THUMBNAIL_CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(thumbnails, 'check_public_url', lambda url: '127.0.0.1')
+    monkeypatch.setattr(thumbnails, '_failures', OrderedDict())
+    yield f'http://images.test:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_connects_to_the_approved_address_and_follows_redirects(image_server):
+    data = get_thumbnail(f'{image_server}/redirect')
+
+    assert Image.open(io.BytesIO(data)).size == (thumbnails.THUMBNAIL_WIDTH, 200)
+    assert ImageHandler.requests == [('/redirect', image_server[7:]), ('/image.png', image_server[7:])]
+
+
+def test_downloaded_thumbnail_is_served_from_disk_cache(image_server):
+    first = get_thumbnail(f'{image_server}/image.png?id=1')
+    second = get_thumbnail(f'{image_server}/image.png?id=1')
+
+    assert first == second
+    assert len(ImageHandler.requests) == 1
+
+
+def test_failed_downloads_are_not_retried_until_ttl_expires(image_server, monkeypatch):
+    url = f'{image_server}/missing.png'
+    assert get_thumbnail(url) == placeholder_image('No Image')
+    assert get_thumbnail(url) == placeholder_image('No Image')
+    assert len(ImageHandler.requests) == 1
+
+    monkeypatch.setattr(thumbnails, 'THUMBNAIL_FAILURE_TTL', 0)
+    get_thumbnail(url)
+    assert len(ImageHandler.requests) == 2
+
+
+def test_slow_downloads_render_as_loading_and_finish_in_background(image_server):
+    ImageHandler.delay = 0.3
+    url = f'{image_server}/image.png?slow=1'
+
+    first = get_thumbnails([url, url, None], timeout=0.01)
+    assert first == {url: placeholder_image('Loading...'), None: placeholder_image('No Image')}
+
+    wait_until = time.monotonic() + 2
+    while thumbnails._read_cached(url) is None:
+        assert time.monotonic() < wait_until, 'background download did not finish'
+        time.sleep(0.01)
+    assert get_thumbnails([url], timeout=0)[url] != placeholder_image('Loading...')
+    assert len(ImageHandler.requests) == 1
+
+
+def test_eviction_removes_url_entries_of_deleted_thumbnails(image_server, monkeypatch):
+    get_thumbnail(f'{image_server}/image.png?id=1')
+    monkeypatch.setattr(thumbnails, 'THUMBNAIL_CACHE_BYTES', 0)
+    thumbnails._evict()
+
+    assert os.listdir(os.path.join(thumbnails.THUMBNAIL_CACHE_DIR, 'blobs')) == []
+    assert os.listdir(os.path.join(thumbnails.THUMBNAIL_CACHE_DIR, 'urls')) == []
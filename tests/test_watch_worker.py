@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+import watch_worker
+from watch_worker import WatchWorker, WatermarkStore
+
+
+class FakeEmailQueue:
+    def __init__(self, status):
+        self.status = status
+        self.submitted = []
+
+    def submit(self, messages, *args, **kwargs):
+        self.submitted.append(messages)
+        return f'job-{len(self.submitted)}'
+
+    def wait(self, job_id, timeout=None):
+        sent = {'done': 1, 'partial': 1, 'failed': 0}[self.status]
+        return {'status': self.status, 'sent': sent, 'failed': 1 - sent, 'errors': []}
+
+
+@pytest.fixture
+def worker(monkeypatch, tmp_path):
+    articles = [{'title': 'Chip news', 'url': 'https://a.com/1', 'publishedAt': '2024-01-15T10:00:00Z',
+                 'source': {'name': 'A'}, 'description': 'd'}]
+    monkeypatch.setattr(watch_worker, 'fetch_new_articles', lambda name, keyword, key, since, priority: articles)
+    monkeypatch.setattr(watch_worker, 'warm_cache', lambda *args, **kwargs: None)
+    watches = [{'keyword': 'chips', 'recipients': ['to@example.com'], 'providers': ['newsapi'], 'interval': 60}]
+    return WatchWorker(watches, WatermarkStore(str(tmp_path / 'state.json')), {'newsapi': 'key'},
+                       sender_email='from@example.com', max_workers=2)
+
+
+@pytest.mark.parametrize('status', ['done', 'partial'])
+def test_watermark_advances_after_mail_is_delivered(worker, monkeypatch, status):
+    monkeypatch.setattr(watch_worker, 'email_queue', FakeEmailQueue(status))
+
+    [result] = worker.run_due(now=0)
+
+    assert result['email']['status'] == status
+    assert worker.store.get('newsapi', 'chips') == '2024-01-15T10:00:00Z'
+    with open(worker.store.path, encoding='utf-8') as f:
+        assert json.load(f) == {'newsapi:chips': '2024-01-15T10:00:00Z'}
+
+
+def test_failed_mail_keeps_watermark_so_next_run_resends(worker, monkeypatch):
+    queue = FakeEmailQueue('failed')
+    monkeypatch.setattr(watch_worker, 'email_queue', queue)
+
+    worker.run_due(now=0)
+    assert worker.store.get('newsapi', 'chips') is None
+
+    queue.status = 'done'
+    worker.run_due(now=60)
+    assert len(queue.submitted) == 2
+    assert worker.store.get('newsapi', 'chips') == '2024-01-15T10:00:00Z'
+
+
+def test_watches_run_only_when_due(worker, monkeypatch):
+    monkeypatch.setattr(watch_worker, 'email_queue', FakeEmailQueue('done'))
+
+    assert len(worker.run_due(now=0)) == 1
+    assert worker.run_due(now=30) == []
+    assert worker.seconds_until_next(now=30) == 30
+
+
+def test_process_lock_lets_only_one_holder_run(tmp_path):
+    state_path = str(tmp_path / 'state.json')
+
+    with watch_worker.process_lock(state_path) as first:
+        with watch_worker.process_lock(state_path, blocking=False) as second:
+            assert first and not second
+    with watch_worker.process_lock(state_path, blocking=False) as third:
+        assert third
@@ -0,0 +1,338 @@
+import hashlib
+import io
+import ipaddress
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import parse_qs, urljoin, urlsplit
+
+import certifi
+import urllib3
+from PIL import Image, ImageDraw
+
+THUMBNAIL_WIDTH = 300
+THUMBNAIL_CACHE_DIR = os.getenv('THUMBNAIL_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'news-chatbot-thumbnails'))
+# 디스크 캐시 최대 크기 (바이트), 넘으면 오래 사용하지 않은 썸네일부터 삭제
+THUMBNAIL_CACHE_BYTES = int(os.getenv('THUMBNAIL_CACHE_MB', '100')) * 1024 * 1024
+# 원본 이미지 최대 다운로드 크기
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+PLACEHOLDER_HOSTS = ('via.placeholder.com', 'placehold.co')
+# 따라가는 최대 리다이렉트 수 (이동할 때마다 주소를 다시 검사)
+MAX_REDIRECTS = 3
+# 이미지 요청 (연결, 읽기) 타임아웃 - 느린 이미지 호스트가 워커를 오래 붙잡지 않도록 짧게
+THUMBNAIL_TIMEOUT = urllib3.Timeout(connect=float(os.getenv('THUMBNAIL_CONNECT_TIMEOUT', '2')),
+                                    read=float(os.getenv('THUMBNAIL_READ_TIMEOUT', '3')))
+# 한 페이지를 그리기 전에 썸네일을 기다리는 최대 시간, 넘으면 자리표시 이미지로 그리고 다운로드는 계속
+THUMBNAIL_RENDER_WAIT = float(os.getenv('THUMBNAIL_RENDER_WAIT', '1'))
+# 실패한 이미지 URL을 다시 시도하지 않는 시간 (초)
+THUMBNAIL_FAILURE_TTL = float(os.getenv('THUMBNAIL_FAILURE_TTL', '600'))
+FAILURE_CACHE_SIZE = 4096
+# 이미지 호스트별 커넥션 풀 수 (프로바이더 API 풀과 분리)
+MAX_IMAGE_POOLS = 32
+REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+_evict_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=6, thread_name_prefix='thumbnails')
+_state_lock = threading.Lock()
+# URL -> 진행 중인 다운로드 (같은 이미지를 여러 페이지/세션이 동시에 요청해도 한 번만 받음)
+_in_flight: Dict[str, Future] = {}
+# URL -> 마지막 실패 시각 (THUMBNAIL_FAILURE_TTL 동안 다시 받지 않음)
+_failures: "OrderedDict[str, float]" = OrderedDict()
+_pools_lock = threading.Lock()
+# (scheme, 호스트, 포트, 검사를 통과한 IP) -> 커넥션 풀
+_pools: "OrderedDict[Tuple[str, str, int, str], urllib3.HTTPConnectionPool]" = OrderedDict()
+
+
+@lru_cache(maxsize=128)
+def placeholder_image(text: str, width: int = THUMBNAIL_WIDTH, height: int = 200) -> bytes:
+    """via.placeholder.com 대신 로컬에서 만든 회색 자리표시 이미지 (PNG)"""
+    image = Image.new('RGB', (width, height), (204, 204, 204))
+    draw = ImageDraw.Draw(image)
+    left, top, right, bottom = draw.textbbox((0, 0), text)
+    draw.text(((width - (right - left)) / 2, (height - (bottom - top)) / 2), text, fill=(102, 102, 102))
+    out = io.BytesIO()
+    image.save(out, format='PNG')
+    return out.getvalue()
+
+
+def _placeholder_from_url(url: str) -> Optional[bytes]:
+    """placeholder 서비스 URL이면 같은 크기/문구의 이미지를 로컬에서 생성"""
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return None
+    if parts.hostname not in PLACEHOLDER_HOSTS:
+        return None
+    text = parse_qs(parts.query).get('text', [''])[0]
+    width, height = THUMBNAIL_WIDTH, 200
+    size = parts.path.strip('/').split('/')[0]
+    if 'x' in size:
+        w, _, h = size.partition('x')
+        if w.isdigit() and h.isdigit():
+            width, height = min(int(w), 1200), min(int(h), 1200)
+    return placeholder_image(text or f'{width}x{height}', width, height)
+
+
+def _url_path(url: str) -> str:
+    return os.path.join(THUMBNAIL_CACHE_DIR, 'urls', hashlib.sha256(url.encode('utf-8')).hexdigest())
+
+
+def _blob_path(content_hash: str) -> str:
+    return os.path.join(THUMBNAIL_CACHE_DIR, 'blobs', f'{content_hash}.jpg')
+
+
+def _write_atomic(path: str, data: bytes):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def _read_cached(url: str) -> Optional[bytes]:
+    """URL -> 내용 해시 -> 썸네일 파일 순으로 조회 (사용 시각 갱신)"""
+    try:
+        with open(_url_path(url), 'r') as f:
+            blob_path = _blob_path(f.read().strip())
+        with open(blob_path, 'rb') as f:
+            data = f.read()
+        os.utime(blob_path)
+        return data
+    except OSError:
+        return None
+
+
+def check_public_url(url: str) -> str:
+    """http(s) URL이고 호스트가 공인 주소로만 해석되는지 확인하고 연결할 주소 반환 (아니면 ValueError)
+
+    이미지 URL은 프로바이더가 준 값을 서버가 직접 요청하므로 내부망, 루프백, 링크 로컬
+    (클라우드 메타데이터) 주소로 요청이 나가지 않도록 막는다. 검사 후 DNS가 다른 주소를
+    돌려주는 경우(DNS rebinding)를 막기 위해 호출자는 반환된 주소로만 연결해야 한다.
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or not parts.hostname:
+        raise ValueError('허용하지 않는 이미지 URL입니다.')
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    addresses = []
+    for *_, sockaddr in socket.getaddrinfo(parts.hostname, port, type=socket.SOCK_STREAM):
+        address = ipaddress.ip_address(sockaddr[0].split('%', 1)[0])
+        if address.version == 6 and address.ipv4_mapped is not None:
+            address = address.ipv4_mapped
+        if not address.is_global:
+            raise ValueError('내부 주소의 이미지는 가져오지 않습니다.')
+        addresses.append(str(address))
+    if not addresses:
+        raise ValueError('이미지 호스트를 찾을 수 없습니다.')
+    return addresses[0]
+
+
+def _pool(scheme: str, hostname: str, port: int, address: str) -> urllib3.HTTPConnectionPool:
+    """검사를 통과한 IP로 직접 연결하는 커넥션 풀 (TLS 인증서/SNI는 원래 호스트 이름으로 검증)"""
+    key = (scheme, hostname, port, address)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is not None:
+            _pools.move_to_end(key)
+            return pool
+        if scheme == 'https':
+            pool = urllib3.HTTPSConnectionPool(address, port, maxsize=2, block=False, retries=False,
+                                               timeout=THUMBNAIL_TIMEOUT, cert_reqs='CERT_REQUIRED',
+                                               ca_certs=certifi.where(), assert_hostname=hostname,
+                                               server_hostname=hostname)
+        else:
+            pool = urllib3.HTTPConnectionPool(address, port, maxsize=2, block=False, retries=False,
+                                              timeout=THUMBNAIL_TIMEOUT)
+        _pools[key] = pool
+        while len(_pools) > MAX_IMAGE_POOLS:
+            _, old = _pools.popitem(last=False)
+            old.close()
+        return pool
+
+
+def _fetch(url: str) -> Tuple[Optional[str], bytes]:
+    """이미지 요청 한 번 (리다이렉트면 (이동할 URL, b''), 아니면 (None, 본문))"""
+    address = check_public_url(url)
+    parts = urlsplit(url)
+    port = parts.port or (443 if parts.scheme == 'https' else 80)
+    path = (parts.path or '/') + (f'?{parts.query}' if parts.query else '')
+    response = _pool(parts.scheme, parts.hostname, port, address).urlopen(
+        'GET', path, headers={'Host': parts.netloc.rpartition('@')[2], 'Accept': 'image/*'},
+        redirect=False, preload_content=False)
+    try:
+        if response.status in REDIRECT_STATUSES and response.headers.get('Location'):
+            response.drain_conn()
+            return urljoin(url, response.headers['Location']), b''
+        if response.status >= 400:
+            response.drain_conn()
+            raise ValueError(f'이미지 요청 실패: HTTP {response.status}')
+        data = response.read(MAX_IMAGE_BYTES + 1, decode_content=True)
+        if len(data) > MAX_IMAGE_BYTES:
+            # 남은 본문을 읽지 않고 연결을 닫음
+            response.close()
+            raise ValueError('이미지가 너무 큽니다.')
+        return None, data
+    finally:
+        response.release_conn()
+
+
+def _download_thumbnail(url: str) -> bytes:
+    """원본 이미지를 받아 가로 THUMBNAIL_WIDTH로 줄인 JPEG 반환"""
+    for _ in range(MAX_REDIRECTS + 1):
+        location, data = _fetch(url)
+        if location is None:
+            break
+        url = location
+    else:
+        raise ValueError('이미지 리다이렉트가 너무 많습니다.')
+    image = Image.open(io.BytesIO(data))
+    image.thumbnail((THUMBNAIL_WIDTH, THUMBNAIL_WIDTH * 4))
+    out = io.BytesIO()
+    image.convert('RGB').save(out, format='JPEG', quality=80, optimize=True)
+    return out.getvalue()
+
+
+def _evict():
+    """디스크 캐시가 최대 크기를 넘으면 오래 사용하지 않은 썸네일부터 삭제"""
+    blob_dir = os.path.join(THUMBNAIL_CACHE_DIR, 'blobs')
+    with _evict_lock:
+        try:
+            entries = [e for e in os.scandir(blob_dir) if e.is_file()]
+        except OSError:
+            return
+        total = sum(e.stat().st_size for e in entries)
+        removed = False
+        for entry in sorted(entries, key=lambda e: e.stat().st_mtime):
+            if total <= THUMBNAIL_CACHE_BYTES:
+                break
+            try:
+                total -= entry.stat().st_size
+                os.remove(entry.path)
+                removed = True
+            except OSError:
+                pass
+        if removed:
+            _remove_dangling_urls()
+
+
+def _remove_dangling_urls():
+    """삭제된 썸네일을 가리키는 URL 항목 삭제 (_evict_lock 보유 상태에서 호출)"""
+    try:
+        entries = [e for e in os.scandir(os.path.join(THUMBNAIL_CACHE_DIR, 'urls')) if e.is_file()]
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            with open(entry.path, 'r') as f:
+                if os.path.exists(_blob_path(f.read().strip())):
+                    continue
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _recently_failed(url: str) -> bool:
+    with _state_lock:
+        failed_at = _failures.get(url)
+        if failed_at is None:
+            return False
+        if time.monotonic() - failed_at < THUMBNAIL_FAILURE_TTL:
+            return True
+        del _failures[url]
+        return False
+
+
+def _record_failure(url: str):
+    with _state_lock:
+        _failures[url] = time.monotonic()
+        _failures.move_to_end(url)
+        while len(_failures) > FAILURE_CACHE_SIZE:
+            _failures.popitem(last=False)
+
+
+def _ready_thumbnail(url: Optional[str]) -> Optional[bytes]:
+    """내려받지 않고 바로 줄 수 있는 썸네일 (자리표시, 디스크 캐시, 최근 실패), 없으면 None"""
+    if not url:
+        return placeholder_image('No Image')
+    placeholder = _placeholder_from_url(url)
+    if placeholder is not None:
+        return placeholder
+    cached = _read_cached(url)
+    if cached is not None:
+        return cached
+    if _recently_failed(url):
+        return placeholder_image('No Image')
+    return None
+
+
+def _load_thumbnail(url: str) -> bytes:
+    """내려받아 디스크 캐시에 저장 (실패하면 기록해두고 자리표시 이미지)"""
+    try:
+        data = _download_thumbnail(url)
+    except Exception:
+        _record_failure(url)
+        return placeholder_image('No Image')
+
+    content_hash = hashlib.sha256(data).hexdigest()
+    try:
+        if not os.path.exists(_blob_path(content_hash)):
+            _write_atomic(_blob_path(content_hash), data)
+        _write_atomic(_url_path(url), content_hash.encode('ascii'))
+        _evict()
+    except OSError:
+        pass
+    return data
+
+
+def _forget(url: str, future: Future):
+    with _state_lock:
+        if _in_flight.get(url) is future:
+            del _in_flight[url]
+
+
+def _submit(url: str) -> Future:
+    """백그라운드 다운로드 시작 (이미 진행 중이면 그 작업을 공유)"""
+    with _state_lock:
+        future = _in_flight.get(url)
+        if future is not None:
+            return future
+        future = _executor.submit(_load_thumbnail, url)
+        _in_flight[url] = future
+    future.add_done_callback(lambda f: _forget(url, f))
+    return future
+
+
+def get_thumbnail(url: Optional[str]) -> bytes:
+    """기사 이미지 썸네일 (처음 한 번만 내려받아 디스크에 저장, 실패하면 자리표시 이미지)"""
+    ready = _ready_thumbnail(url)
+    if ready is not None:
+        return ready
+    return _submit(url).result()
+
+
+def get_thumbnails(urls: Iterable[Optional[str]],
+                   timeout: float = THUMBNAIL_RENDER_WAIT) -> Dict[Optional[str], bytes]:
+    """한 페이지의 썸네일을 동시에 가져옴
+
+    timeout 안에 받지 못한 썸네일은 'Loading...' 자리표시 이미지로 돌려주고 다운로드는
+    백그라운드에서 계속해 다음 렌더링에서 디스크 캐시로 보여준다.
+    """
+    urls = list(dict.fromkeys(urls))
+    thumbnails: Dict[Optional[str], bytes] = {}
+    pending: Dict[str, Future] = {}
+    for url in urls:
+        ready = _ready_thumbnail(url)
+        if ready is not None:
+            thumbnails[url] = ready
+        else:
+            pending[url] = _submit(url)
+    if pending:
+        wait(pending.values(), timeout=timeout)
+    for url, future in pending.items():
+        thumbnails[url] = future.result() if future.done() else placeholder_image('Loading...')
+    return {url: thumbnails[url] for url in urls}
@@ -0,0 +1,291 @@
+"""키워드 감시 워커
+
+streamlit과 별도로 실행되어 등록된 키워드를 주기적으로 검색하고, 마지막으로 본 기사
+이후의 새 기사만 받아 검색 캐시를 채우고 수신자에게 요약 메일을 보낸다.
+
+    $ python watch_worker.py --config watches.json
+    $ python watch_worker.py --config watches.json --once
+"""
+import argparse
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from article_utils import published_timestamp
+from digest import build_digest_message, prepare_digest
+from email_queue import SMTP_PORT, SMTP_SERVER, SMTP_USE_TLS, email_queue
+from news_cache import make_key
+from news_providers import PROVIDERS, fetch_new_articles, merge_articles, warm_cache
+from rate_limit import BACKGROUND
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+WATCH_CONFIG = os.getenv('WATCH_CONFIG', 'watches.json')
+WATCH_STATE = os.getenv('WATCH_STATE', 'watch_state.json')
+# 키워드별 기본 검색 주기 (초)
+WATCH_INTERVAL = float(os.getenv('WATCH_INTERVAL', '900'))
+WATCH_MAX_WORKERS = int(os.getenv('WATCH_MAX_WORKERS', '4'))
+# 다른 프로세스가 감시 워커를 실행 중일 때 잠금을 다시 시도하는 간격 (초)
+LOCK_POLL_INTERVAL = 5.0
+
+# 프로바이더 이름 -> API 키 환경변수
+PROVIDER_KEY_ENV = {
+    'newsapi': 'NEWS_API_KEY',
+    'guardian': 'GUARDIAN_API_KEY',
+}
+
+# 스크립트로 실행해도 앱 안에서 실행할 때와 같은 이름을 쓰도록 고정
+logger = logging.getLogger('watch_worker')
+
+
+def load_watches(path: str) -> List[Dict[str, Any]]:
+    """감시 목록 읽기 ([{keyword, recipients, providers?, interval?}, ...])"""
+    with open(path, 'r', encoding='utf-8') as f:
+        watches = json.load(f)
+    for watch in watches:
+        if not watch.get('keyword'):
+            raise ValueError(f'keyword가 없는 항목이 있습니다: {watch}')
+        watch.setdefault('recipients', [])
+        watch.setdefault('providers', list(PROVIDERS))
+        watch.setdefault('interval', WATCH_INTERVAL)
+    return watches
+
+
+class WatermarkStore:
+    """프로바이더/키워드별로 마지막으로 본 publishedAt을 JSON 파일에 보관"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._marks: Dict[str, str] = json.load(f)
+        except FileNotFoundError:
+            self._marks = {}
+
+    @staticmethod
+    def _key(provider: str, keyword: str) -> str:
+        _, normalized_keyword, _ = make_key(provider, keyword)
+        return f'{provider}:{normalized_keyword}'
+
+    def get(self, provider: str, keyword: str) -> Optional[str]:
+        with self._lock:
+            return self._marks.get(self._key(provider, keyword))
+
+    def advance(self, provider: str, keyword: str, articles: List[Dict[str, Any]]):
+        """기사 중 가장 최근 publishedAt으로 갱신 (뒤로 가지는 않음)"""
+        newest = max(articles, key=published_timestamp, default=None)
+        if newest is None or published_timestamp(newest) == float('-inf'):
+            return
+        key = self._key(provider, keyword)
+        with self._lock:
+            current = self._marks.get(key)
+            if current is None or published_timestamp(newest) > published_timestamp({'publishedAt': current}):
+                self._marks[key] = newest['publishedAt']
+
+    def save(self):
+        """임시 파일에 쓴 뒤 교체 (중간에 종료돼도 이전 파일은 온전히 남음)"""
+        with self._lock:
+            data = json.dumps(self._marks, ensure_ascii=False, indent=2)
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, self.path)
+
+
+class WatchWorker:
+    """감시 키워드를 주기마다 검색하고 새 기사 요약을 메일로 보냄"""
+
+    def __init__(self, watches: List[Dict[str, Any]], store: WatermarkStore, api_keys: Dict[str, str],
+                 sender_email: str = '', sender_password: str = '', smtp_server: str = SMTP_SERVER,
+                 smtp_port: int = SMTP_PORT, use_tls: bool = SMTP_USE_TLS, max_workers: int = WATCH_MAX_WORKERS):
+        self.watches = watches
+        self.store = store
+        self.api_keys = api_keys
+        self.sender_email = sender_email
+        self.sender_password = sender_password
+        self.smtp_server = smtp_server
+        self.smtp_port = smtp_port
+        self.use_tls = use_tls
+        # 프로바이더 조회용과 키워드 단위 작업용 스레드 풀 (키워드 작업이 조회를 기다리므로 분리)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='watch')
+        self._runner = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='watch-run')
+        self._next_run = [0.0] * len(watches)
+
+    def _fetch(self, provider: str, keyword: str) -> List[Dict[str, Any]]:
+        """워터마크 이후 기사만 조회하고 검색 캐시에 반영"""
+        since = self.store.get(provider, keyword)
+        # 요청 속도는 API 키별 한도(RATE_LIMITS)를 사용자 검색과 나눠 쓰며, 대화형 요청에 양보
+        articles = fetch_new_articles(provider, keyword, self.api_keys[provider], since, priority=BACKGROUND)
+        warm_cache(provider, keyword, articles, complete=since is None)
+        return articles
+
+    def run_watch(self, watch: Dict[str, Any]) -> Dict[str, Any]:
+        """키워드 하나 처리: 프로바이더 동시 조회 -> 새 기사 요약 메일 발송 대기 -> 워터마크 갱신"""
+        keyword = watch['keyword']
+        providers = [name for name in watch['providers'] if name in PROVIDERS and self.api_keys.get(name)]
+        futures = {name: self._executor.submit(self._fetch, name, keyword) for name in providers}
+
+        fetched = {}
+        errors = {}
+        for name, future in futures.items():
+            try:
+                fetched[name] = future.result()
+            except Exception as e:
+                errors[name] = str(e)
+        new_articles = merge_articles(fetched.values())
+
+        job_id = None
+        job = None
+        if new_articles and watch['recipients'] and self.sender_email:
+            prepared = prepare_digest(new_articles, keyword)
+            messages = [build_digest_message(prepared, recipient, self.sender_email)
+                        for recipient in watch['recipients']]
+            job_id = email_queue.submit(messages, self.smtp_server, self.smtp_port, self.sender_email,
+                                        self.sender_password, use_tls=self.use_tls)
+            # 재시도까지 끝날 때까지 기다림 (메일마다 재시도 횟수와 백오프가 제한되어 있어 반드시 끝남)
+            job = email_queue.wait(job_id)
+
+        # 메일이 한 통도 나가지 못했으면 워터마크를 그대로 두어 다음 주기에 같은 기사로 다시 보냄
+        # (일부 수신자만 실패한 경우 다시 보내면 받은 수신자에게 중복되므로 오류만 남기고 진행)
+        if job is None or job['status'] != 'failed':
+            for name, articles in fetched.items():
+                self.store.advance(name, keyword, articles)
+        return {'keyword': keyword, 'new': len(new_articles), 'errors': errors, 'job_id': job_id, 'email': job}
+
+    def run_due(self, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """주기가 돌아온 키워드를 동시에 처리하고 워터마크 저장"""
+        now = time.monotonic() if now is None else now
+        due = [i for i, next_run in enumerate(self._next_run) if next_run <= now]
+        for i in due:
+            self._next_run[i] = now + float(self.watches[i]['interval'])
+        results = list(self._runner.map(lambda i: self.run_watch(self.watches[i]), due))
+        if due:
+            self.store.save()
+        return results
+
+    def seconds_until_next(self, now: Optional[float] = None) -> float:
+        now = time.monotonic() if now is None else now
+        return max(0.0, min(self._next_run, default=WATCH_INTERVAL) - now)
+
+    def run_forever(self, stop: Optional[threading.Event] = None):
+        """stop이 설정될 때까지 주기적으로 실행"""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            for result in self.run_due():
+                failed = result['errors'] or (result['email'] or {}).get('failed')
+                logger.log(logging.WARNING if failed else logging.INFO, _format_result(result))
+            stop.wait(self.seconds_until_next())
+
+
+def _format_result(result: Dict[str, Any]) -> str:
+    line = f"[{result['keyword']}] 새 기사 {result['new']}개"
+    job = result['email']
+    if job is not None:
+        line += f", 메일 {job['status']} (성공 {job['sent']}통, 실패 {job['failed']}통)"
+        for error in job['errors']:
+            line += f"\n  메일 오류: {error}"
+    for name, error in result['errors'].items():
+        line += f"\n  {name} 오류: {error}"
+    return line
+
+
+def worker_from_env(watches: List[Dict[str, Any]], state_path: str) -> WatchWorker:
+    """API 키/SMTP 설정을 환경변수에서 읽어 워커 생성"""
+    return WatchWorker(
+        watches,
+        WatermarkStore(state_path),
+        api_keys={name: os.getenv(env, '') for name, env in PROVIDER_KEY_ENV.items()},
+        sender_email=os.getenv('SENDER_EMAIL', ''),
+        sender_password=os.getenv('SENDER_PASSWORD', ''),
+    )
+
+
+def _try_lock(lock_file) -> bool:
+    try:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+@contextmanager
+def process_lock(state_path: str, blocking: bool = True) -> Iterator[bool]:
+    """<state>.lock 파일 잠금 (같은 워터마크 파일을 쓰는 감시 워커는 한 프로세스에서만 실행)
+
+    blocking이면 잠금을 얻을 때까지 기다리고, 아니면 다른 프로세스가 잡고 있을 때 False를 준다.
+    잠금은 블록을 벗어나거나 프로세스가 끝나면 풀린다.
+    """
+    with open(f'{state_path}.lock', 'a') as lock_file:
+        acquired = _try_lock(lock_file)
+        while not acquired and blocking:
+            time.sleep(LOCK_POLL_INTERVAL)
+            acquired = _try_lock(lock_file)
+        yield acquired
+
+
+def _run_background(watches: List[Dict[str, Any]], state_path: str):
+    with process_lock(state_path):
+        # 워터마크는 잠금을 얻은 뒤에 읽어야 먼저 실행하던 프로세스가 저장한 값을 이어받음
+        logger.info('감시 워커 시작 (%s)', state_path)
+        worker_from_env(watches, state_path).run_forever()
+
+
+_background_lock = threading.Lock()
+_background_thread: Optional[threading.Thread] = None
+
+
+def start_background_worker(config_path: str = WATCH_CONFIG, state_path: str = WATCH_STATE) -> threading.Thread:
+    """프로세스당 한 번 데몬 스레드로 워커 시작 (streamlit 프로세스 안에서 돌리면 검색 캐시를 공유)
+
+    uvicorn 워커나 streamlit 프로세스가 여럿이어도 process_lock을 잡은 한 프로세스만 실행하고,
+    나머지는 기다리다가 그 프로세스가 끝나면 이어받는다.
+    """
+    global _background_thread
+    with _background_lock:
+        if _background_thread is None:
+            watches = load_watches(config_path)
+            _background_thread = threading.Thread(target=_run_background, args=(watches, state_path),
+                                                  name='watch-worker', daemon=True)
+            _background_thread.start()
+    return _background_thread
+
+
+def main():
+    parser = argparse.ArgumentParser(description='감시 키워드 뉴스 수집 및 요약 메일 발송')
+    parser.add_argument('--config', default=WATCH_CONFIG, help='감시 목록 JSON 파일')
+    parser.add_argument('--state', default=WATCH_STATE, help='워터마크 저장 파일')
+    parser.add_argument('--once', action='store_true', help='한 번만 실행하고 종료')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(message)s')
+    watches = load_watches(args.config)
+    # 앱/백엔드 프로세스 안의 워커와 같은 워터마크 파일을 동시에 쓰지 않도록 잠금
+    with process_lock(args.state, blocking=not args.once) as acquired:
+        if not acquired:
+            parser.exit(1, f'다른 프로세스가 감시 워커를 실행 중입니다 ({args.state}.lock)\n')
+        worker = worker_from_env(watches, args.state)
+        if not args.once:
+            worker.run_forever()
+            return
+
+        for result in worker.run_due():
+            print(_format_result(result), flush=True)
+
+
+if __name__ == '__main__':
+    main()